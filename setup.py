@@ -74,6 +74,7 @@ setup(
      license='LSOSL - LUCIT Synergetic Open Source License',
      install_requires=['aiohttp', 'lucit-licensing-python>=1.8.2', 'Cython>=3.0.10', 'requests>=2.32.3',
                        'unicorn-binance-websocket-api>=2.8.1', 'unicorn-binance-rest-api>=2.6.1'],
+     extras_require={'numpy': ['numpy']},
      keywords='binance, depth cache',
      project_urls={
          'Documentation': 'https://unicorn-binance-local-depth-cache.docs.lucit.tech',
@@ -90,7 +91,7 @@ setup(
      packages=find_packages(exclude=[f"dev/{source_dir}"], include=[source_dir]),
      ext_modules=cythonize(extensions, compiler_directives={'language_level': "3"}),
      python_requires='>=3.8.0',
-     package_data={'': ['*.so', '*.dll', '*.py', '*.pyd', '*.pyi']},
+     package_data={'': ['*.so', '*.dll', '*.py', '*.pxd', '*.pyd', '*.pyi']},
      include_package_data=True,
      classifiers=[
          "Development Status :: 5 - Production/Stable",
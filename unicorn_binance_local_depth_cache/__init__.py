@@ -3,5 +3,9 @@
 # ¯\_(ツ)_/¯
 
 from .manager import BinanceLocalDepthCacheManager
+from .mmap_book import MmapBookPublisher, MmapBookReader
+from .recorder import DepthStreamRecorder, DepthStreamReader
+from .sharded_manager import ShardedDepthCacheManager
+from .shared_book import BookBuffer, BookPublisher, SharedBookPublisher, SharedBookReader
 from .exceptions import *
 
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/depth_cache.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+
+from .order_book import OrderBookSide
+from .sequence_lock import SequenceLock
+from collections import deque
+from typing import Any, Iterator, List, Optional, Tuple
+
+
+class DepthCache(object):
+    """
+    The state of one DepthCache: both sides of the order book, the synchronization state and the `SequenceLock` that
+    coordinates the writer with the readers.
+
+    The state is stored in slots, so the manager reads and writes plain attributes per received depth update.
+
+    For backwards compatibility the object behaves like the former dict of a DepthCache: the attributes can be read
+    and written with `depth_cache['last_update_id']`, `get()`, `keys()`, `items()` and `in`.
+
+    :param market: The market symbol in lower case
+    :type market: str
+    :param refresh_interval: The refresh interval in seconds
+    :type refresh_interval: int or None
+    :param priority: Snapshots of DepthCaches with a higher priority are downloaded first.
+    :type priority: int
+    :param desired_depth: Number of levels per side the DepthCache must provide
+    :type desired_depth: int or None
+    :param snapshot_limit: The `limit` of the snapshot and the number of levels that are kept per side
+    :type snapshot_limit: int
+    :param read_cache_size: Number of cached `select()` results per side
+    :type read_cache_size: int
+    :param init_buffer_size: Maximum number of depth updates that are buffered during the snapshot download
+    :type init_buffer_size: int
+    """
+    __slots__ = ('asks', 'best_ask', 'best_bid', 'bids', 'desired_depth', 'init_buffer', 'is_synchronized',
+                 'last_refresh_time', 'last_update_id', 'last_update_time', 'market', 'mid_price', 'priority',
+                 'read_cache_size', 'refresh_interval', 'refresh_request', 'sequence_lock', 'snapshot_limit', 'spread',
+                 'stop_request', 'stream_status', 'tick_size')
+
+    def __init__(self,
+                 market: str = None,
+                 refresh_interval: Optional[int] = None,
+                 priority: int = 0,
+                 desired_depth: Optional[int] = None,
+                 snapshot_limit: int = 1000,
+                 read_cache_size: int = 0,
+                 init_buffer_size: int = 1000):
+        self.asks: OrderBookSide = OrderBookSide(reverse=False, cache_size=read_cache_size)
+        self.best_ask: Optional[list] = None
+        self.best_bid: Optional[list] = None
+        self.bids: OrderBookSide = OrderBookSide(reverse=True, cache_size=read_cache_size)
+        self.desired_depth: Optional[int] = desired_depth
+        self.init_buffer: deque = deque(maxlen=init_buffer_size)
+        self.is_synchronized: bool = False
+        self.last_refresh_time: Optional[int] = None
+        self.last_update_id: Optional[int] = None
+        self.last_update_time: Optional[int] = None
+        self.market: str = market
+        self.mid_price: Optional[float] = None
+        self.priority: int = priority
+        self.read_cache_size: int = read_cache_size
+        self.refresh_interval: Optional[int] = refresh_interval
+        self.refresh_request: bool = True
+        self.sequence_lock: SequenceLock = SequenceLock()
+        self.snapshot_limit: int = snapshot_limit
+        self.spread: Optional[float] = None
+        self.stop_request: bool = False
+        self.stream_status: Optional[str] = None
+        self.tick_size: Optional[str] = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        return (f"DepthCache(market={self.market}, is_synchronized={self.is_synchronized}, "
+                f"last_update_id={self.last_update_id})")
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get an attribute like `dict.get()`.
+
+        :param key: Name of the attribute
+        :type key: str
+        :param default: Returned if the attribute does not exist
+        :type default: any
+        :return: any
+        """
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """
+        Get all attributes as `(name, value)` tuples like `dict.items()`.
+
+        :return: list
+        """
+        return [(key, getattr(self, key)) for key in self.__slots__]
+
+    def keys(self) -> Tuple[str, ...]:
+        """
+        Get the names of all attributes like `dict.keys()`.
+
+        :return: tuple
+        """
+        return self.__slots__
+
+    def reset(self, tick_size: Optional[str] = None) -> None:
+        """
+        Replace both sides with empty ones. Must be called within a write of the `SequenceLock`.
+
+        :param tick_size: The `tickSize` of the new sides
+        :type tick_size: str or None
+        :return: None
+        """
+        self.asks = OrderBookSide(reverse=False, tick_size=tick_size, cache_size=self.read_cache_size)
+        self.bids = OrderBookSide(reverse=True, tick_size=tick_size, cache_size=self.read_cache_size)
+        self.best_ask = None
+        self.best_bid = None
+        self.mid_price = None
+        self.spread = None
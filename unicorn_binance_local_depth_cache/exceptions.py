@@ -66,3 +66,26 @@ class DepthCacheNotFound(Exception):
         else:
             self.message = f"The depth_cache for market '{market}' does not exist!"
         super().__init__(self.message)
+
+
+class DepthCacheShardFailed(Exception):
+    """
+    Exception raised when a shard of the `ShardedDepthCacheManager` could not be started or has stopped unexpectedly.
+    """
+    def __init__(self, shard_id=None, reason=None):
+        if shard_id is None:
+            self.message = f"No shard is running"
+        else:
+            self.message = f"The shard {shard_id} is not running"
+        self.message += "!" if reason is None else f": {reason}"
+        super().__init__(self.message)
+
+
+class BookBufferStalled(Exception):
+    """
+    Exception raised when a published book can not be read, because its writer did not finish a write in time.
+    """
+    def __init__(self, timeout=None):
+        self.message = f"The book has not been released by its writer within {timeout} seconds, the writer has " \
+                       f"probably stopped during a write!"
+        super().__init__(self.message)
@@ -22,14 +22,22 @@
 from .cluster import Cluster
 from .exceptions import *
 from .licensing_manager import LucitLicensingManager, NoValidatedLucitLicense
+from .order_book import OrderBookSide
+from .recorder import DepthStreamRecorder
+from .depth_cache import DepthCache
+from .snapshot_scheduler import SnapshotScheduler
+from .sync_strategies import SyncStrategy, get_sync_strategy
+from .warm_start import WarmStartStore
+from functools import partial
 from requests import ConnectionError
 from unicorn_binance_rest_api import BinanceRestApiManager, BinanceAPIException, AlreadyStoppedError
 from unicorn_binance_websocket_api import BinanceWebSocketApiManager
 from operator import itemgetter
-from typing import Optional, Union, Generator, Dict, List
+from typing import Optional, Union, Dict, List
 import cython
 import logging
 import platform
+import queue
 import requests
 import time
 import threading
@@ -51,20 +59,58 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         - https://binance-docs.github.io/apidocs/spot/en/#how-to-manage-a-local-order-book-correctly
         - https://binance-docs.github.io/apidocs/futures/en/#diff-book-depth-streams
 
-    :param exchange: Select binance.com, binance.com-testnet, binance.com-futures, binance.com-futures-testnet
-                     (default: binance.com)
+    :param exchange: Select binance.com, binance.com-testnet, binance.com-futures, binance.com-futures-testnet,
+                     binance.com-coin_futures, binance.us (default: binance.com)
     :type exchange: str
     :param default_refresh_interval: The default refresh interval in seconds, default is None. The DepthCache is reset
                                      and reinitialized at this interval.
     :type default_refresh_interval: int
-    :param init_interval: Only one request to the Binance REST API is permitted to all DepthCaches.
+    :param init_interval: Minimum time in seconds between two batches of market subscriptions.
     :type init_interval: float (seconds)
-    :param init_time_window: Only one request to the Binance REST API is permitted per DepthCache in this time window
-                             (specified in seconds).
+    :param init_time_window: Only one snapshot request to the Binance REST API is permitted per DepthCache in this time
+                             window (specified in seconds).
     :type init_time_window: int (seconds)
-    :param high_performance: If True, access to the depth snapshots via REST in the INIT process is not regulated.
-                             Be careful!
+    :param high_performance: If True, the request weight and `init_time_window` are ignored when scheduling the
+                             snapshots of the DepthCaches. Be careful!
     :type high_performance:  bool
+    :param max_concurrent_snapshots: Maximum number of snapshots that are downloaded via REST at the same time. Default
+                                     is 8.
+    :type max_concurrent_snapshots:  int
+    :param snapshot_weight_limit: Request weight per minute that is available for snapshots. Snapshots are only
+                                  started if this budget and the used weight reported by the Binance API leave room
+                                  for them. Default is None (half of the request weight limit of the exchange).
+    :type snapshot_weight_limit:  int
+    :param use_price_ticks: If True, the prices of the DepthCaches are stored as integer tick counts based on the
+                            `tickSize` of the symbol from the `exchangeInfo` endpoint instead of float values. Markets
+                            without a known `tickSize` fall back to float prices.
+    :type use_price_ticks:  bool
+    :param read_cache_size: Number of `get_asks()` and `get_bids()` results that are cached per DepthCache side until
+                            the next update of the side. The least recently used result gets evicted first. Cached
+                            results are shared between all callers and must not be modified! Default is 0 (disabled).
+    :type read_cache_size:  int
+    :param init_buffer_size: Maximum number of depth updates per DepthCache that are buffered while the snapshot is
+                             downloaded. They are replayed as soon as the snapshot is applied, so the DepthCache does
+                             not need another snapshot if the first update after the snapshot arrived during the
+                             download. If more updates are received, the oldest get dropped. Default is 1000.
+    :type init_buffer_size:  int
+    :param book_publisher: Publishes every DepthCache after each update, e.g. a `SharedBookPublisher` to share the
+                           books with other processes. It must provide the methods `publish(depth_cache)`, which is
+                           called within the write of the DepthCache, `remove(market)` and `close()`. Default is None.
+    :type book_publisher:  SharedBookPublisher
+    :param warm_start_directory: If provided, the books of the synchronized DepthCaches are stored in this directory
+                                 when the manager stops (and every `warm_start_save_interval` seconds). The first
+                                 initialization of a DepthCache after the start of the manager uses the stored book
+                                 that has been found in this directory instead of a REST snapshot, if the first depth
+                                 update continues the `last_update_id` of the stored book. Otherwise and for all later
+                                 initializations the REST snapshot is downloaded as usual. Default is None (disabled).
+    :type warm_start_directory:  str
+    :param warm_start_save_interval: Interval in seconds to store the books into the `warm_start_directory`. Default
+                                     is None (only when the manager stops).
+    :type warm_start_save_interval:  int
+    :param depth_stream_recorder: Records every received depth update and every REST snapshot, e.g. a
+                                  `DepthStreamRecorder` to replay the streams later. It gets started by the manager
+                                  if it is not running yet and stopped by `stop_manager()`. Default is None.
+    :type depth_stream_recorder:  DepthStreamRecorder
     :param auto_data_cleanup_stopped_streams: The parameter "auto_data_cleanup_stopped_streams=True" can be used to
                                               inform the UBWA instance that all remaining data of a stopped stream
                                               should be automatically and completely deleted.
@@ -115,9 +161,18 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                  default_refresh_interval: int = None,
                  depth_cache_update_interval: int = None,
                  high_performance: bool = False,
+                 use_price_ticks: bool = False,
+                 read_cache_size: int = 0,
+                 init_buffer_size: int = 1000,
+                 book_publisher=None,
+                 warm_start_directory: Optional[str] = None,
+                 warm_start_save_interval: Optional[int] = None,
+                 depth_stream_recorder: Optional[DepthStreamRecorder] = None,
                  auto_data_cleanup_stopped_streams: bool = False,
                  init_interval: float = 4.0,
                  init_time_window: int = 5,
+                 max_concurrent_snapshots: int = 8,
+                 snapshot_weight_limit: Optional[int] = None,
                  websocket_close_timeout: int = 2,
                  websocket_ping_interval: int = 10,
                  websocket_ping_timeout: int = 20,
@@ -136,15 +191,41 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         logger.info(f"New instance of {self.get_user_agent()}-{'compiled' if cython.compiled else 'source'} on "
                     f"{str(platform.system())} {str(platform.release())} for exchange {exchange} started ...")
         self.exchange = exchange
+        self.sync_strategy: SyncStrategy = get_sync_strategy(exchange=self.exchange)
+        if self.sync_strategy is None:
+            raise ValueError(f"Parameter 'exchange' has a wrong value: {exchange}")
         self.dc_streams = {}
         self.dc_streams_lock = threading.Lock()
-        self.depth_caches: dict = {}
+        self.dc_stream_of_market: Dict[str, str] = {}
+        self.dc_stream_of_stream_id: Dict[str, str] = {}
+        self.pending_resubscriptions: set = set()
+        self.subscription_requests: queue.Queue = queue.Queue()
+        self.depth_caches: Dict[str, DepthCache] = {}
         self.depth_cache_update_interval = depth_cache_update_interval
         self.default_refresh_interval = default_refresh_interval
         self.high_performance = high_performance
+        self.use_price_ticks = use_price_ticks
+        self.read_cache_size = read_cache_size
+        self.init_buffer_size = init_buffer_size
+        self.book_publisher = book_publisher
+        self.warm_start_save_interval = warm_start_save_interval
+        if warm_start_directory is not None:
+            self.warm_start_store: Optional[WarmStartStore] = WarmStartStore(directory=warm_start_directory)
+            self.warm_start_markets: set = self.warm_start_store.get_markets()
+        else:
+            self.warm_start_store = None
+            self.warm_start_markets = set()
+        self.warm_starts: set = set()
+        self.depth_stream_recorder = depth_stream_recorder
+        if self.depth_stream_recorder is not None and self.depth_stream_recorder.is_alive() is False:
+            self.depth_stream_recorder.start()
+        self.tick_sizes: Optional[Dict[str, str]] = None
+        self.tick_sizes_lock = threading.Lock()
         self.auto_data_cleanup_stopped_streams = auto_data_cleanup_stopped_streams
         self.init_interval = init_interval
         self.init_time_window = init_time_window
+        self.max_concurrent_snapshots = max_concurrent_snapshots
+        self.snapshot_weight_limit = snapshot_weight_limit or self.sync_strategy.weight_limit // 2
         self.websocket_close_timeout = websocket_close_timeout
         self.websocket_ping_interval = websocket_ping_interval
         self.websocket_ping_timeout = websocket_ping_timeout
@@ -153,8 +234,6 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         self.ubdcc_port = ubdcc_port
         self.last_update_check_github: dict = {'timestamp': time.time(), 'status': {'tag_name': None}}
         self.stop_request: bool = False
-        self.threading_lock_ask: dict = {}
-        self.threading_lock_bid: dict = {}
         self.lucit_api_secret = lucit_api_secret
         self.lucit_license_ini = lucit_license_ini
         self.lucit_license_profile = lucit_license_profile
@@ -206,8 +285,14 @@ class BinanceLocalDepthCacheManager(threading.Thread):
 
         if self.high_performance is True:
             logger.info(f"Using `high_performance` ...")
-        self._gen_get_init_slot = self._generator_get_init_slot()
-        next(self._gen_get_init_slot)
+        self.snapshot_scheduler = SnapshotScheduler(
+            snapshot_function=self._init_depth_cache,
+            get_used_weight=partial(self.ubra.get_used_weight, cached=True),
+            weight_limit=None if self.high_performance is True else self.snapshot_weight_limit,
+            max_concurrent_snapshots=self.max_concurrent_snapshots,
+            market_interval=0.0 if self.high_performance is True else self.init_time_window
+        )
+        self.snapshot_scheduler.start()
 
         if warn_on_update is True and self.is_update_available() is True:
             update_msg = (f"Release {self.name}_{self.get_latest_version()} is available, please consider updating! "
@@ -217,6 +302,10 @@ class BinanceLocalDepthCacheManager(threading.Thread):
 
         self.thread_manage_depthcaches = threading.Thread(target=self._manage_depthcaches)
         self.thread_manage_depthcaches.start()
+        if self.warm_start_store is not None and self.warm_start_save_interval is not None:
+            self.thread_save_warm_start_books = threading.Thread(target=self._save_warm_start_books_periodically,
+                                                                 daemon=True)
+            self.thread_save_warm_start_books.start()
 
     def __enter__(self):
         logger.debug(f"Entering 'with-context' ...")
@@ -234,29 +323,36 @@ class BinanceLocalDepthCacheManager(threading.Thread):
 
         :param market: Specify the market for the used DepthCache
         :type market: str
-        :param unsubscribe: If True the market will get unsubscribed from the web stream.
+        :param unsubscribe: If True the market will get unsubscribed from the web stream and subscribed again. The
+                            new snapshot is requested after the subscription.
         :type unsubscribe: bool
 
-        :return: bool
+        :return: bool (True if the market is queued to get subscribed again)
         """
         if market is None:
             raise ValueError("Parameter 'market' is missing!")
-        self.depth_caches[market]['is_synchronized'] = False
-        self.depth_caches[market]['refresh_request'] = True
-        self.depth_caches[market]['last_update_id'] = None
+        dc_stream = None
         if unsubscribe is True:
-            with self.dc_streams_lock:
-                for dc_stream in self.dc_streams:
-                    if market in self.dc_streams[dc_stream]['markets']:
-                        self.ubwa.unsubscribe_from_stream(stream_id=self.dc_streams[dc_stream]['stream_id'],
-                                                          markets=market)
-                        self.dc_streams[dc_stream]['subscribed_markets'].remove(market)
-                        return True
+            dc_stream = self.get_dc_stream_id(market=market)
+            if dc_stream is not None:
+                self.pending_resubscriptions.add(market)
+        self.depth_caches[market].is_synchronized = False
+        self.depth_caches[market].refresh_request = True
+        if self.book_publisher is not None:
+            with self.depth_caches[market].sequence_lock:
+                self._publish_book(depth_cache=self.depth_caches[market])
+        self.depth_caches[market].last_update_id = None
+        self.depth_caches[market].init_buffer.clear()
+        if dc_stream is not None:
+            self.subscription_requests.put(("resubscribe", dc_stream, market))
+            return True
         return False
 
     def _add_depthcache(self,
                         market: str = None,
-                        refresh_interval: int = None) -> bool:
+                        refresh_interval: int = None,
+                        priority: int = 0,
+                        desired_depth: int = None) -> bool:
         """
         Add a DepthCache to the depth_caches stack.
 
@@ -266,23 +362,24 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         `BinanceLocalDepthCache <https://unicorn-binance-local-depth-cache.docs.lucit.tech/unicorn_binance_local_depth_cache.html?highlight=default_refresh_interval#unicorn_binance_local_depth_cache.manager.BinanceLocalDepthCacheManager>`__.
         The DepthCaches is reset and reinitialized at this interval.
         :type refresh_interval: int
+        :param priority: Snapshots of DepthCaches with a higher priority are downloaded first.
+        :type priority: int
+        :param desired_depth: Number of levels per side the DepthCache must provide, None for 1000.
+        :type desired_depth: int
         :return: bool
         """
         logger.debug(f"BinanceLocalDepthCacheManager._add_depthcache() - Adding new entry for market '{market}' ...")
         if market is not None:
             market = market.lower()
-            self.depth_caches[market] = {'asks': {},
-                                         'bids': {},
-                                         'is_synchronized': False,
-                                         'last_refresh_time': None,
-                                         'last_update_id': None,
-                                         'market': market,
-                                         'refresh_interval': refresh_interval or self.default_refresh_interval,
-                                         'refresh_request': True,
-                                         'stop_request': False,
-                                         'stream_status': None}
-            self.threading_lock_ask[market] = threading.Lock()
-            self.threading_lock_bid[market] = threading.Lock()
+            self.depth_caches[market] = DepthCache(
+                market=market,
+                refresh_interval=refresh_interval or self.default_refresh_interval,
+                priority=priority,
+                desired_depth=desired_depth,
+                snapshot_limit=self.sync_strategy.get_snapshot_limit(desired_depth),
+                read_cache_size=self.read_cache_size,
+                init_buffer_size=self.init_buffer_size
+            )
             logger.debug(f"BinanceLocalDepthCacheManager._add_depthcache() - Added new entry for market '{market}'!")
             return True
         else:
@@ -308,27 +405,28 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             channel = f"depth@{self.depth_cache_update_interval}ms"
         for market in markets:
             market = market.lower()
-            dc_stream = self.get_dc_stream_id()
-            if dc_stream is None:
-                uuid = self.ubwa.get_new_uuid_id()
-                with self.dc_streams_lock:
-                    self.dc_streams[uuid] = {"id": uuid,
-                                             "channel": channel,
-                                             "markets": [market, ],
-                                             "last_restart": None,
-                                             "restarts": None,
-                                             "status": "STARTING",
-                                             "stream_id": None,
-                                             "subscribed_markets": []}
-                return True
-            else:
-                with self.dc_streams_lock:
-                    self.dc_streams[dc_stream]['markets'].append(market)
-                return True
+            with self.dc_streams_lock:
+                dc_stream = self.dc_stream_of_market.get(market)
+                if dc_stream is None:
+                    dc_stream = self._get_free_dc_stream()
+                if dc_stream is None:
+                    dc_stream = self.ubwa.get_new_uuid_id()
+                    self.dc_streams[dc_stream] = {"id": dc_stream,
+                                                  "channel": channel,
+                                                  "markets": set(),
+                                                  "last_restart": None,
+                                                  "restarts": None,
+                                                  "status": "STARTING",
+                                                  "stream_id": None,
+                                                  "subscribed_markets": set()}
+                self.dc_streams[dc_stream]['markets'].add(market)
+                self.dc_stream_of_market[market] = dc_stream
+            self.subscription_requests.put(("subscribe", dc_stream, market))
+        return True
 
     def _add_ask(self, ask: list = None, market: str = None) -> bool:
         """
-        Add, update or delete an ask of a specific DepthCache.
+        Add, update or delete an ask of a specific DepthCache and update its top of book.
 
         :param ask: Add 'asks' to the DepthCache
         :type ask: list
@@ -340,16 +438,15 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             logger.debug(f"BinanceLocalDepthCacheManager._add_ask() - Parameter `ask` and `market` are mandatory!")
             return False
         market = market.lower()
-        self.depth_caches[market]['asks'][ask[0]] = float(ask[1])
-        if float(ask[1]) == 0.0:
-            logger.debug(f"BinanceLocalDepthCacheManager._add_ask() - Deleting depth position {ask[0]} on ask "
-                         f"side for market '{market}'")
-            del self.depth_caches[market]['asks'][ask[0]]
+        depth_cache = self.depth_caches[market]
+        with depth_cache.sequence_lock:
+            depth_cache.asks.apply_levels([ask])
+            self._update_top_of_book(market=market)
         return True
 
     def _add_bid(self, bid: list = None, market: str = None) -> bool:
         """
-        Add a bid to a specific DepthCache.
+        Add, update or delete a bid of a specific DepthCache and update its top of book.
 
         :param bid: Add bids to the DepthCache
         :type bid: list
@@ -361,14 +458,17 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             logger.debug(f"BinanceLocalDepthCacheManager._add_bid() - Parameter `bid` and `market` are mandatory!")
             return False
         market = market.lower()
-        self.depth_caches[market]['bids'][bid[0]] = float(bid[1])
-        if float(bid[1]) == 0.0:
-            logger.debug(f"BinanceLocalDepthCacheManager._add_bid() - Deleting depth position {bid[0]} on bid "
-                         f"side for market '{market}'")
-            del self.depth_caches[market]['bids'][bid[0]]
+        depth_cache = self.depth_caches[market]
+        with depth_cache.sequence_lock:
+            depth_cache.bids.apply_levels([bid])
+            self._update_top_of_book(market=market)
         return True
 
-    def _apply_updates(self, asks: list = None, bids: list = None, market: str = None) -> bool:
+    def _apply_updates(self,
+                       asks: list = None,
+                       bids: list = None,
+                       market: str = None,
+                       last_update_id: int = None) -> bool:
         """
         Apply updates to a specific DepthCache.
 
@@ -378,6 +478,9 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         :type bids: list
         :param market: Specify the market symbol for the used DepthCache
         :type market: str
+        :param last_update_id: If provided, the `last_update_id` of the DepthCache is set within the same write, so
+                               readers see it together with the levels it belongs to.
+        :type last_update_id: int
         :return: bool
         """
         if asks is None or bids is None or market is None:
@@ -385,20 +488,49 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                          f"mandatory!")
             return False
         market = market.lower()
-        logger.debug(f"BinanceLocalDepthCacheManager._apply_updates() - Applying updates to the DepthCache with "
-                     f"market {market}")
-        with self.threading_lock_ask[market]:
-            for ask in asks:
-                self._add_ask(ask, market=market)
-            if self.is_depth_cache_synchronized(market=market):
-                self._clear_orphaned_depthcache_items(market=market, side="asks")
-        with self.threading_lock_bid[market]:
-            for bid in bids:
-                self._add_bid(bid, market=market)
-            if self.is_depth_cache_synchronized(market=market):
-                self._clear_orphaned_depthcache_items(market=market, side="bids")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"BinanceLocalDepthCacheManager._apply_updates() - Applying updates to the DepthCache with "
+                         f"market {market}")
+        depth_cache = self.depth_caches[market]
+        with depth_cache.sequence_lock:
+            depth_cache.asks.apply_levels(asks)
+            if depth_cache.is_synchronized is True:
+                self._clear_orphaned_depthcache_items(market=market, side="asks",
+                                                      limit_count=depth_cache.snapshot_limit)
+            depth_cache.bids.apply_levels(bids)
+            if depth_cache.is_synchronized is True:
+                self._clear_orphaned_depthcache_items(market=market, side="bids",
+                                                      limit_count=depth_cache.snapshot_limit)
+            self._update_top_of_book(market=market)
+            if last_update_id is not None:
+                depth_cache.last_update_id = last_update_id
+            if self.book_publisher is not None:
+                self._publish_book(depth_cache=depth_cache)
         return True
 
+    def _update_top_of_book(self, market: str = None) -> None:
+        """
+        Update the best ask, best bid, mid price and spread of a DepthCache.
+
+        Both sides are kept sorted, so the best levels are the first entries and no side needs to be sorted, even if
+        the former best level has just been deleted. Must be called within a write of the `SequenceLock`.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :return: None
+        """
+        depth_cache = self.depth_caches[market]
+        best_ask = depth_cache.asks.get_best()
+        best_bid = depth_cache.bids.get_best()
+        depth_cache.best_ask = best_ask
+        depth_cache.best_bid = best_bid
+        if best_ask is None or best_bid is None:
+            depth_cache.mid_price = None
+            depth_cache.spread = None
+        else:
+            depth_cache.mid_price = (best_ask[0] + best_bid[0]) / 2
+            depth_cache.spread = best_ask[0] - best_bid[0]
+
     def _get_order_book_from_rest(self, market: str = None) -> Optional[dict]:
         """
         Get the order_book snapshot via REST of the chosen market.
@@ -411,14 +543,9 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             market = market.lower()
         logger.info(f"Taking snapshot for market '{market}'!")
         try:
-            if self.exchange == "binance.com" \
-                    or self.exchange == "binance.com-testnet" \
-                    or self.exchange == "binance.us":
-                order_book = self.ubra.get_order_book(symbol=market.upper(), limit=1000)
-            elif self.exchange == "binance.com-futures" or self.exchange == "binance.com-futures-testnet":
-                order_book = self.ubra.futures_order_book(symbol=market.upper(), limit=1000)
-            else:
-                return None
+            order_book = self.sync_strategy.get_order_book(ubra=self.ubra,
+                                                           symbol=market.upper(),
+                                                           limit=self.depth_caches[market].snapshot_limit)
         except BinanceAPIException as error_msg:
             logger.error(f"BinanceLocalDepthCacheManager._get_order_book_from_rest() - Can not download "
                          f"order_book snapshot for the depth_cache with market {market} - BinanceAPIException "
@@ -443,34 +570,47 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                      f"order_book snapshot for the depth_cache with market {market}")
         return order_book
 
-    def _generator_get_init_slot(self) -> Generator[str, str, None]:
+    def _get_tick_size(self, market: str = None) -> Optional[str]:
         """
-        Get a free init slot.
+        Get the `tickSize` of the `PRICE_FILTER` of a market.
 
-        The generator controls the INIT processes for DepthCaches. Only a total of 1 INIT signal is issued per
-        `init_interval` for all markets, and only once per depth cache in `self.init_time_window`.
+        The `exchangeInfo` is downloaded once with the first call and reloaded if a market is unknown.
 
-        :return: str "INIT" or "DROP"
+        :param market: Specify the market symbol
+        :type market: str
+        :return: str or None
         """
-        last_yield_time: Dict[str, float] = {}
-        last_global_yield_time: float = 0.0
-        lock = threading.Lock()
-
-        while True:
-            id_received = yield
-            with (lock):
-                current_time = time.time()
-                if id_received not in last_yield_time \
-                        or current_time - last_yield_time[id_received] >= self.init_time_window:
-                    last_yield_time[id_received] = current_time
-
-                    if current_time - last_global_yield_time >= self.init_interval:
-                        last_global_yield_time = current_time
-                        yield "INIT"
-                    else:
-                        yield "DROP"
-                else:
-                    yield "DROP"
+        if market is None:
+            return None
+        symbol = market.upper()
+        with self.tick_sizes_lock:
+            if self.tick_sizes is None or symbol not in self.tick_sizes:
+                try:
+                    exchange_info = self.sync_strategy.get_exchange_info(ubra=self.ubra)
+                except BinanceAPIException as error_msg:
+                    logger.error(f"BinanceLocalDepthCacheManager._get_tick_size() - Can not download exchangeInfo - "
+                                 f"BinanceAPIException - error_msg: {error_msg}")
+                    return None
+                except AlreadyStoppedError as error_msg:
+                    logger.debug(f"BinanceLocalDepthCacheManager._get_tick_size() - AlreadyStoppedError - "
+                                 f"error_msg: {error_msg}")
+                    return None
+                except (requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout) as error_msg:
+                    logger.error(f"BinanceLocalDepthCacheManager._get_tick_size() - Can not download exchangeInfo - "
+                                 f"error_msg: {error_msg}")
+                    return None
+                tick_sizes = {}
+                for symbol_info in exchange_info.get('symbols', []):
+                    for symbol_filter in symbol_info.get('filters', []):
+                        if symbol_filter.get('filterType') == "PRICE_FILTER":
+                            tick_sizes[symbol_info['symbol']] = symbol_filter['tickSize']
+                self.tick_sizes = tick_sizes
+            tick_size = self.tick_sizes.get(symbol)
+        if tick_size is None or float(tick_size) == 0.0:
+            logger.warning(f"BinanceLocalDepthCacheManager._get_tick_size() - No `tickSize` available for market "
+                           f"'{market}', using float prices!")
+            return None
+        return tick_size
 
     def _init_depth_cache(self, market: str = None) -> bool:
         """
@@ -485,34 +625,82 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             return False
         if market is not None:
             market = market.lower()
+        if market in self.warm_start_markets:
+            self.warm_start_markets.discard(market)
+            if self._init_depth_cache_from_warm_start(market=market) is True:
+                return True
+        if market in self.warm_starts:
+            # The stored book did not match the depth stream, it is outdated
+            self.warm_starts.discard(market)
+            self.warm_start_store.delete(market=market)
         try:
             order_book = self._get_order_book_from_rest(market=market)
         except ConnectionError as error_msg:
             logger.error(f"BinanceLocalDepthCacheManager._init_depth_cache(market={market}) - ConnectionError: "
                          f"{error_msg}")
-            self.depth_caches[market]['refresh_request'] = True
+            self.depth_caches[market].refresh_request = True
             return False
         if order_book is None:
             logger.info(f"BinanceLocalDepthCacheManager._init_depth_cache(market={market}) - Can not get order_book!")
-            self.depth_caches[market]['refresh_request'] = True
+            self.depth_caches[market].refresh_request = True
             return False
-        self._reset_depth_cache(market=market)
-        self.depth_caches[market]['last_refresh_time'] = int(time.time())
-        self.depth_caches[market]['last_update_time'] = int(time.time())
+        if self.is_stop_request(market=market) is True:
+            # The DepthCache has been stopped during the download
+            return False
+        if self.use_price_ticks is True:
+            self.depth_caches[market].tick_size = self._get_tick_size(market=market)
         try:
-            self.depth_caches[market]['last_update_id'] = int(order_book['lastUpdateId'])
+            last_update_id = int(order_book['lastUpdateId'])
         except TypeError as error_msg:
             logger.error(f"BinanceLocalDepthCacheManager._init_depth_cache(market={market}) - TypeError: {error_msg}")
-            self.depth_caches[market]['refresh_request'] = True
+            self.depth_caches[market].refresh_request = True
             return False
         except KeyError as error_msg:
             logger.error(f"BinanceLocalDepthCacheManager._init_depth_cache(market={market}) - KeyError: {error_msg}")
-            self.depth_caches[market]['refresh_request'] = True
+            self.depth_caches[market].refresh_request = True
             return False
-        self._apply_updates(asks=order_book['asks'], bids=order_book['bids'], market=market)
+        if self.depth_stream_recorder is not None:
+            self.depth_stream_recorder.record(market=market, kind="snapshot", data=order_book)
+        self._reset_depth_cache(market=market)
+        self.depth_caches[market].last_refresh_time = int(time.time())
+        self.depth_caches[market].last_update_time = int(time.time())
+        # The `last_update_id` is set together with the levels, the buffered depth updates are replayed as soon as
+        # it is available.
+        self._apply_updates(asks=order_book['asks'], bids=order_book['bids'], market=market,
+                            last_update_id=last_update_id)
         logger.debug(f"BinanceLocalDepthCacheManager._init_depth_cache(market={market}) - Finished initialization!")
         return True
 
+    def _init_depth_cache_from_warm_start(self, market: str = None) -> bool:
+        """
+        Initialise the DepthCache with its stored book from the `warm_start_directory` instead of a REST snapshot.
+
+        Runs in a worker of the `SnapshotScheduler` like a REST snapshot, so the depth updates that are received in
+        the meantime are buffered and replayed. The stored book is used only for the first initialization after the
+        start of the manager. Its file is kept until it gets replaced by the next save, or deleted before the REST
+        snapshot if the depth updates do not continue its `last_update_id`.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :return: bool (False if there is no valid stored book)
+        """
+        book = self.warm_start_store.load(market=market)
+        if book is None:
+            return False
+        depth_cache = self.depth_caches[market]
+        if self.use_price_ticks is True:
+            depth_cache.tick_size = self._get_tick_size(market=market)
+        self._reset_depth_cache(market=market)
+        depth_cache.last_refresh_time = int(time.time())
+        depth_cache.last_update_time = int(time.time())
+        # The stream validates the book as soon as its `last_update_id` is set
+        self.warm_starts.add(market)
+        self._apply_updates(asks=book['asks'], bids=book['bids'], market=market,
+                            last_update_id=book['last_update_id'])
+        logger.info(f"BinanceLocalDepthCacheManager._init_depth_cache_from_warm_start(market={market}) - Loaded the "
+                    f"stored book with last_update_id {book['last_update_id']} from {time.ctime(book['timestamp'])}")
+        return True
+
     async def _manage_depth_cache_async(self, stream_id=None) -> None:
         """
         Process depth stream_data and manage the depth cache data.
@@ -530,23 +718,31 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                      f"processing data from stream `{self.ubwa.get_stream_label(stream_id=stream_id)}`")
         while self.ubwa.is_stop_request(stream_id=stream_id) is False:
             stream_data = await self.ubwa.get_stream_data_from_asyncio_queue(stream_id=stream_id)
-            # Filter and proof requests
-            if "'error':" in str(stream_data):
-                logger.error(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
-                             f"Received system error message: {stream_data}")
-                self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                continue
-            elif "'result':" in str(stream_data):
-                logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
-                             f"Received system result message: {stream_data}")
+            # Debug messages are only formatted if they get logged
+            debug = logger.isEnabledFor(logging.DEBUG)
+            # Filter and proof requests - depth updates are the only messages with a `data` key, so the check does
+            # not depend on the size of the payload.
+            if type(stream_data) is not dict or "data" not in stream_data:
+                if type(stream_data) is dict and "error" in stream_data:
+                    logger.error(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
+                                 f"Received system error message: {stream_data}")
+                elif type(stream_data) is dict and "result" in stream_data:
+                    if debug:
+                        logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id="
+                                     f"{stream_id}) - Received system result message: {stream_data}")
+                else:
+                    logger.error(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
+                                 f"Received unexpected message: {stream_data}")
                 self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
                 continue
             market = str(stream_data['stream'].split('@')[0]).lower()
-            logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - Extracted "
-                         f"market from stream data: {market}")
-            if self.is_stop_request(market=market) is True:
+            if debug:
                 logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
-                             f"depth_cache for market {market} is stopping!")
+                             f"Extracted market from stream data: {market}")
+            if self.is_stop_request(market=market) is True:
+                if debug:
+                    logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
+                                 f"depth_cache for market {market} is stopping!")
                 self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
                 continue
             if self.depth_caches.get(market) is None:
@@ -554,77 +750,42 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                              f"`depth_cache` for {market} does not exists!")
                 self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
                 continue
-            if self.depth_caches[market]['refresh_request'] is True:
-                logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - Caught "
-                             f"refresh_request for depth_cache with market {market} ...")
-                self.depth_caches[market]['is_synchronized'] = False
-                if self._gen_get_init_slot.send(market) == "INIT" or self.high_performance is True:
+            if self.depth_stream_recorder is not None:
+                self.depth_stream_recorder.record(market=market, kind="depth", data=stream_data['data'])
+            depth_cache = self.depth_caches[market]
+            if depth_cache.refresh_request is True:
+                if debug:
                     logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
-                                 f"Depth init for {market} started at {time.time()}!")
-                    try:
-                        current_weight = self.ubra.get_used_weight()
-                    except BinanceAPIException as error_msg:
-                        logger.error(f"BinanceLocalDepthCacheManager._manage_depth_cache_async() - Can not get used "
-                                     f"weight for market {market} - BinanceAPIException - error_msg: {error_msg}")
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                    except AlreadyStoppedError as error_msg:
-                        logger.debug(
-                            f"BinanceLocalDepthCacheManager._manage_depth_cache_async() - Can not get used "
-                            f"weight for market {market} - AlreadyStoppedError - error_msg: {error_msg}")
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                    except requests.exceptions.ConnectionError as error_msg:
-                        logger.error(
-                            f"BinanceLocalDepthCacheManager._manage_depth_cache_async() - Can not get used "
-                            f"weight for market {market} - requests.exceptions.ConnectionError - "
-                            f"error_msg: {error_msg}")
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                    except requests.exceptions.ReadTimeout as error_msg:
-                        logger.error(
-                            f"BinanceLocalDepthCacheManager._manage_depth_cache_async() - Can not get used "
-                            f"weight for market {market} - requests.exceptions.ReadTimeout - error_msg: {error_msg}")
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                    if current_weight['weight'] > 2200 or current_weight['status_code'] != 200:
-                        logger.warning(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id})"
-                                       f" - The used weight ({current_weight['weight']}) of the Binance API is to high "
-                                       f"or the status_code {current_weight['status_code']} != 200, market {market} is "
-                                       f"waiting a few seconds ...")
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                    logger.info(f"Taking snapshot for market '{market}'! Current weight level is {current_weight}!")
-                    self.depth_caches[market]['refresh_request'] = False
-                    self.depth_caches[market]['last_update_id'] = None
-                    thread = threading.Thread(target=self._init_depth_cache, args=(market,))
-                    thread.start()
+                                 f"Caught refresh_request for depth_cache with market {market} ...")
+                if market in self.pending_resubscriptions:
+                    # The snapshot is requested with the first update after the market got subscribed again
+                    self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
+                    continue
+                depth_cache.is_synchronized = False
+                depth_cache.init_buffer.clear()
+                depth_cache.refresh_request = False
+                depth_cache.last_update_id = None
+                if market in self.warm_start_markets:
+                    # The stored book is loaded instead of downloading a snapshot
+                    weight = 0
+                else:
+                    weight = self.sync_strategy.get_snapshot_weight(limit=depth_cache.snapshot_limit)
+                self.snapshot_scheduler.request(market=market, weight=weight, priority=depth_cache.priority)
 
             # Processing depth data
-            if self.depth_caches[market]['is_synchronized'] is True:
+            if depth_cache.is_synchronized is True:
                 # Regular updates
                 # Gap detection
-                if self.exchange == "binance.com" \
-                        or self.exchange == "binance.com-testnet" \
-                        or self.exchange == "binance.us":
-                    if stream_data['data']['U'] != self.depth_caches[market]['last_update_id']+1:
-                        logger.error(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) "
-                                     f"- There is a gap between the last and the penultimate update ID, the depth_cache"
-                                     f" `{market}` is no longer correct and must be reinitialized")
-                        self.set_resync_request(market=market)
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                elif self.exchange == "binance.com-futures" or self.exchange == "binance.com-futures-testnet":
-                    if stream_data['data']['pu'] != self.depth_caches[market]['last_update_id']:
-                        logger.error(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) "
-                                     f"- There is a gap between the last and the penultimate update ID, the depth_cache"
-                                     f" `{market}` is no longer correct and must be reinitialized")
-                        self.set_resync_request(market=market)
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                if self.depth_caches[market]['refresh_interval'] is not None:
-                    if self.depth_caches[market]['last_refresh_time'] < int(time.time()) - \
-                            self.depth_caches[market]['refresh_interval']:
+                if self.sync_strategy.has_gap(stream_data['data'], depth_cache.last_update_id):
+                    logger.error(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) "
+                                 f"- There is a gap between the last and the penultimate update ID, the depth_cache "
+                                 f"`{market}` is no longer correct and must be reinitialized")
+                    self.set_resync_request(market=market)
+                    self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
+                    continue
+                if depth_cache.refresh_interval is not None:
+                    if depth_cache.last_refresh_time < int(time.time()) - \
+                            depth_cache.refresh_interval:
                         logger.info(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) "
                                     f"- The refresh interval has been exceeded, start new initialization for "
                                     f"depth_cache `{market}`")
@@ -632,125 +793,146 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                         self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
                         continue
                 # Apply updates
-                logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
-                             f"Applying regular depth update to the depth_cache with market {market} - update_id: "
-                             f"{stream_data['data']['U']} - {stream_data['data']['u']}")
-                self._apply_updates(asks=stream_data['data']['a'], bids=stream_data['data']['b'], market=market)
-                self.depth_caches[market]['last_update_id'] = int(stream_data['data']['u'])
-                self.depth_caches[market]['last_update_time'] = int(time.time())
+                if debug:
+                    logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
+                                 f"Applying regular depth update to the depth_cache with market {market} - update_id: "
+                                 f"{stream_data['data']['U']} - {stream_data['data']['u']}")
+                self._apply_updates(asks=stream_data['data']['a'],
+                                    bids=stream_data['data']['b'],
+                                    market=market,
+                                    last_update_id=int(stream_data['data']['u']))
+                depth_cache.last_update_time = int(time.time())
                 self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
                 continue
             else:
                 logger.info(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - Init "
                             f"depth cache of market {market}")
-                if self.depth_caches[market]['last_update_id'] is None:
-                    logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
-                                 f"Dropping outdated depth update of the cache with market {market}! Reason: "
-                                 f"`last_update_id` is None")
+                if depth_cache.last_update_id is None:
+                    if depth_cache.refresh_request is False:
+                        # The snapshot is downloading, keep the update to replay it as soon as the snapshot is applied
+                        if debug:
+                            logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id="
+                                         f"{stream_id}) - Buffering depth update of the cache with market {market}! "
+                                         f"Reason: `last_update_id` is None")
+                        depth_cache.init_buffer.append(stream_data['data'])
+                    elif debug:
+                        logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id="
+                                     f"{stream_id}) - Dropping outdated depth update of the cache with market "
+                                     f"{market}! Reason: `last_update_id` is None")
                     self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
                     continue
-                if self.exchange == "binance.com" \
-                        or self.exchange == "binance.com-testnet" \
-                        or self.exchange == "binance.us":
-                    if int(stream_data['data']['u']) <= self.depth_caches[market]['last_update_id']:
-                        # Drop it
-                        logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) "
-                                     f"- Dropping outdated depth update of the cache with market {market}! Reason: "
-                                     f"{stream_data['data']['u']} <= {self.depth_caches[market]['last_update_id']}")
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                    if int(stream_data['data']['U']) <= self.depth_caches[market]['last_update_id'] + 1 \
-                            <= int(stream_data['data']['u']):
-                        # The first processed event should have U <= lastUpdateId+1 AND u >= lastUpdateId+1.
-                        self._apply_updates(asks=stream_data['data']['a'], bids=stream_data['data']['b'], market=market)
-                        logger.info(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) -"
-                                    f" Finished initialization of the cache with market {market} (Spot)")
-                        # Init (refresh) finished
-                        last_sync_time = time.time()
-                        self.depth_caches[market]['last_update_id'] = int(stream_data['data']['u'])
-                        self.depth_caches[market]['last_update_time'] = int(last_sync_time)
-                        self.depth_caches[market]['last_refresh_time'] = int(last_sync_time)
-                        self.depth_caches[market]['is_synchronized'] = True
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                elif self.exchange == "binance.com-futures" or self.exchange == "binance.com-futures-testnet":
-                    if int(stream_data['data']['u']) < int(self.depth_caches[market]['last_update_id']):
-                        # Drop it
-                        logger.debug(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) -"
-                                     f" Dropping outdated depth update of the cache with market {market}! Reason: "
-                                     f"{stream_data['data']['u']} <= {self.depth_caches[market]['last_update_id']}")
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                    if int(stream_data['data']['U']) <= self.depth_caches[market]['last_update_id'] \
-                            <= int(stream_data['data']['u']):
-                        # The first processed event should have U <= lastUpdateId AND u >= lastUpdateId
-                        self._apply_updates(asks=stream_data['data']['a'], bids=stream_data['data']['b'], market=market)
-                        logger.info(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
-                                    f"Finished initialization of the cache with market {market} (Futures)")
-                        # Init (refresh) finished
-                        last_sync_time = time.time()
-                        self.depth_caches[market]['last_update_id'] = int(stream_data['data']['u'])
-                        self.depth_caches[market]['last_update_time'] = int(last_sync_time)
-                        self.depth_caches[market]['is_synchronized'] = True
-                        self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
-                        continue
-                logger.info(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - Set "
-                            f"refresh_request for depth_cache with market {market}")
-                self.set_resync_request(market=market)
+                init_buffer = depth_cache.init_buffer
+                if len(init_buffer) > 0:
+                    init_buffer.append(stream_data['data'])
+                    updates = list(init_buffer)
+                    init_buffer.clear()
+                else:
+                    updates = [stream_data['data']]
+                if self._replay_depth_updates(market=market, updates=updates, stream_id=stream_id) is False:
+                    logger.info(f"BinanceLocalDepthCacheManager._manage_depth_cache_async(stream_id={stream_id}) - "
+                                f"Set refresh_request for depth_cache with market {market}")
+                    # A stored book that does not match the stream only needs a REST snapshot
+                    self.set_resync_request(market=market, unsubscribe=market not in self.warm_starts)
+                elif self.warm_starts and depth_cache.is_synchronized is True:
+                    # The depth updates continue the stored book, its file gets replaced with the next save
+                    self.warm_starts.discard(market)
                 self.ubwa.asyncio_queue_task_done(stream_id=stream_id)
                 continue
 
     def _manage_depthcaches(self) -> None:
         """
-        Observe DepthCaches and manage them.
+        Process the queued subscription requests of the DepthCaches.
+
+        The thread sleeps until a request is queued. All requests that are queued at this time are processed as one
+        batch, so any number of markets is subscribed with one call per stream. Two batches are at least
+        `init_interval` seconds apart to respect the message rate limits of the Binance websocket API.
 
         :return: None
         """
         logger.debug(f"BinanceLocalDepthCacheManager._manage_depthcaches() started!")
         while self.stop_request is False:
-            wait_time = 1
-            # Unsubscribe markets
-            with self.dc_streams_lock:
-                for dc_stream in self.dc_streams:
-                    for market in self.dc_streams[dc_stream]['subscribed_markets']:
-                        if market not in self.dc_streams[dc_stream]['markets']:
-                            logger.debug(f"BinanceLocalDepthCacheManager._manage_depthcaches() - Unsubscribing "
-                                         f"{market} ...")
-                            self.ubwa.unsubscribe_from_stream(stream_id=self.dc_streams[dc_stream]['stream_id'],
-                                                              markets=market)
-                            self.dc_streams[dc_stream]['subscribed_markets'].remove(market)
-            # Subscribe markets
-            break_loops = False
-            with self.dc_streams_lock:
-                for dc_stream in self.dc_streams:
-                    for market in self.dc_streams[dc_stream]['markets']:
-                        if market not in self.dc_streams[dc_stream]['subscribed_markets']:
-                            logger.debug(f"BinanceLocalDepthCacheManager._manage_depthcaches() - Subscribing "
-                                         f"{market} ...")
-                            if self.dc_streams[dc_stream]['stream_id'] is None:
-                                stream_id = self.ubwa.create_stream(
-                                    channels=self.dc_streams[dc_stream]['channel'],
-                                    markets=market,
-                                    stream_label=f"ubldc_depth_{int(time.time())}",
-                                    output="dict",
-                                    process_asyncio_queue=self._manage_depth_cache_async
-                                )
-                                self.dc_streams[dc_stream]['stream_id'] = stream_id
-                                if self.dc_streams[dc_stream]['restarts'] is None:
-                                    self.dc_streams[dc_stream]['restarts'] = 0
-                                else:
-                                    self.dc_streams[dc_stream]['restarts'] += 1
-                                    self.dc_streams[dc_stream]['last_restart'] = time.time()
-                            else:
-                                self.ubwa.subscribe_to_stream(stream_id=self.dc_streams[dc_stream]['stream_id'],
-                                                              markets=market)
-                            self.dc_streams[dc_stream]['subscribed_markets'].append(market)
-                            break_loops = True
-                            wait_time = self.init_interval
-                            break
-                    if break_loops:
-                        break
-            time.sleep(wait_time)
+            subscription_batch = [self.subscription_requests.get()]
+            while True:
+                try:
+                    subscription_batch.append(self.subscription_requests.get_nowait())
+                except queue.Empty:
+                    break
+            if self.stop_request is True:
+                break
+            self._process_subscription_requests(subscription_batch=subscription_batch)
+            time.sleep(self.init_interval)
+
+    def _save_warm_start_books_periodically(self) -> None:
+        """
+        Store the books into the `warm_start_directory` every `warm_start_save_interval` seconds.
+
+        :return: None
+        """
+        while self.stop_request is False:
+            time.sleep(self.warm_start_save_interval)
+            if self.stop_request is False:
+                self.save_warm_start_books()
+
+    def _process_subscription_requests(self, subscription_batch: list = None) -> None:
+        """
+        Subscribe and unsubscribe the markets of a batch of subscription requests.
+
+        A request is a tuple `(action, dc_stream, market)` with the action 'subscribe', 'unsubscribe' or
+        'resubscribe'. All unsubscriptions of a stream are sent with one call before all subscriptions of the stream
+        are sent with one call.
+
+        :param subscription_batch: The subscription requests
+        :type subscription_batch: list
+        :return: None
+        """
+        subscriptions: Dict[str, List[str]] = {}
+        unsubscriptions: Dict[str, List[str]] = {}
+        with self.dc_streams_lock:
+            for request in subscription_batch:
+                if request is None:
+                    continue
+                action, dc_stream, market = request
+                if dc_stream not in self.dc_streams:
+                    continue
+                if action == "unsubscribe" or action == "resubscribe":
+                    if market in self.dc_streams[dc_stream]['subscribed_markets']:
+                        self.dc_streams[dc_stream]['subscribed_markets'].discard(market)
+                        unsubscriptions.setdefault(dc_stream, []).append(market)
+                if action == "subscribe" or action == "resubscribe":
+                    if market in self.dc_streams[dc_stream]['markets'] \
+                            and market not in self.dc_streams[dc_stream]['subscribed_markets']:
+                        self.dc_streams[dc_stream]['subscribed_markets'].add(market)
+                        subscriptions.setdefault(dc_stream, []).append(market)
+            for dc_stream, markets in unsubscriptions.items():
+                if self.dc_streams[dc_stream]['stream_id'] is not None:
+                    logger.debug(f"BinanceLocalDepthCacheManager._process_subscription_requests() - Unsubscribing "
+                                 f"{markets} ...")
+                    self.ubwa.unsubscribe_from_stream(stream_id=self.dc_streams[dc_stream]['stream_id'],
+                                                      markets=markets)
+            for dc_stream, markets in subscriptions.items():
+                logger.debug(f"BinanceLocalDepthCacheManager._process_subscription_requests() - Subscribing "
+                             f"{markets} ...")
+                if self.dc_streams[dc_stream]['stream_id'] is None:
+                    stream_id = self.ubwa.create_stream(
+                        channels=self.dc_streams[dc_stream]['channel'],
+                        markets=markets,
+                        stream_label=f"ubldc_depth_{int(time.time())}",
+                        output="dict",
+                        process_asyncio_queue=self._manage_depth_cache_async
+                    )
+                    self.dc_streams[dc_stream]['stream_id'] = stream_id
+                    self.dc_stream_of_stream_id[stream_id] = dc_stream
+                    if self.dc_streams[dc_stream]['restarts'] is None:
+                        self.dc_streams[dc_stream]['restarts'] = 0
+                    else:
+                        self.dc_streams[dc_stream]['restarts'] += 1
+                        self.dc_streams[dc_stream]['last_restart'] = time.time()
+                else:
+                    self.ubwa.subscribe_to_stream(stream_id=self.dc_streams[dc_stream]['stream_id'],
+                                                  markets=markets)
+        for request in subscription_batch:
+            if request is not None and request[0] == "resubscribe":
+                self.pending_resubscriptions.discard(request[2])
 
     def _process_stream_signals(self, signal_type=None, stream_id=None, data_record=None, error_msg=None) -> None:
         """
@@ -761,11 +943,14 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         logger.debug(f"BinanceLocalDepthCacheManager._process_stream_signals() - received stream_signal: "
                      f"{signal_type} - {stream_id} - {data_record} - {error_msg}")
 
-        dc_stream_id = None
+        # `create_stream()` is called within the lock, so the signal of a new stream waits here until its stream_id
+        # has been indexed
         with self.dc_streams_lock:
-            for dc_stream in self.dc_streams:
-                if self.dc_streams[dc_stream]['stream_id'] == stream_id:
-                    dc_stream_id = dc_stream
+            dc_stream_id = self.dc_stream_of_stream_id.get(stream_id)
+        if dc_stream_id is None and signal_type != "CONNECT" and signal_type != "STOP":
+            logger.debug(f"BinanceLocalDepthCacheManager._process_stream_signals(stream_id={stream_id}) - Ignoring "
+                         f"stream_signal {signal_type} of a stream that has been replaced or stopped")
+            return
 
         if signal_type == "CONNECT":
             logger.debug(f"BinanceLocalDepthCacheManager._process_stream_signals(stream_id={stream_id}) - Received "
@@ -777,10 +962,13 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             self.ubwa.stop_stream(stream_id=stream_id)
             with self.dc_streams_lock:
                 self.dc_streams[dc_stream_id]['status'] = "DISCONNECTED"
-                self.dc_streams[dc_stream_id]['subscribed_markets'] = []
+                self.dc_streams[dc_stream_id]['subscribed_markets'] = set()
                 self.dc_streams[dc_stream_id]['stream_id'] = None
-            for market in self.dc_streams[dc_stream_id]['markets']:
+                self.dc_stream_of_stream_id.pop(stream_id, None)
+                markets = list(self.dc_streams[dc_stream_id]['markets'])
+            for market in markets:
                 self.set_resync_request(market=market, unsubscribe=False)
+                self.subscription_requests.put(("subscribe", dc_stream_id, market))
         elif signal_type == "FIRST_RECEIVED_DATA":
             logger.debug(f"BinanceLocalDepthCacheManager._process_stream_signals(stream_id={stream_id}) - Received "
                          f"stream_signal {signal_type} - Setting stream_status to `RUNNING`")
@@ -795,6 +983,66 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             with self.dc_streams_lock:
                 self.dc_streams[dc_stream_id]['status'] = signal_type
 
+    def _publish_book(self, depth_cache: DepthCache = None) -> None:
+        """
+        Publish a DepthCache with the `book_publisher`. Must be called within a write of the `SequenceLock`.
+
+        :param depth_cache: The DepthCache
+        :type depth_cache: DepthCache
+        :return: None
+        """
+        try:
+            self.book_publisher.publish(depth_cache)
+        except Exception as error_msg:
+            logger.error(f"BinanceLocalDepthCacheManager._publish_book() - Can not publish the DepthCache of market "
+                         f"{depth_cache.market}: {error_msg}")
+
+    def _replay_depth_updates(self, market: str = None, updates: list = None, stream_id=None) -> bool:
+        """
+        Synchronize a DepthCache whose snapshot has been applied with the depth updates received since the snapshot
+        download was started.
+
+        Outdated updates are dropped, the first update must overlap the `lastUpdateId` of the snapshot and every
+        following update must continue the previous one.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :param updates: The `data` of the depth updates in the order they have been received
+        :type updates: list
+        :param stream_id: ID of the UBWA stream
+        :type stream_id: str
+        :return: bool (False if the DepthCache must be reinitialized)
+        """
+        depth_cache = self.depth_caches[market]
+        for data in updates:
+            if depth_cache.is_synchronized is True:
+                if self.sync_strategy.has_gap(data, depth_cache.last_update_id):
+                    logger.error(f"BinanceLocalDepthCacheManager._replay_depth_updates(stream_id={stream_id}) - There "
+                                 f"is a gap between the last and the penultimate update ID, the depth_cache `{market}` "
+                                 f"is no longer correct and must be reinitialized")
+                    return False
+            elif self.sync_strategy.is_outdated(data, depth_cache.last_update_id):
+                # Drop it
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"BinanceLocalDepthCacheManager._replay_depth_updates(stream_id={stream_id}) - "
+                                 f"Dropping outdated depth update of the cache with market {market}! Reason: "
+                                 f"{data['u']} is outdated by {depth_cache.last_update_id}")
+                continue
+            elif not self.sync_strategy.is_first_event(data, depth_cache.last_update_id):
+                return False
+            self._apply_updates(asks=data['a'], bids=data['b'], market=market, last_update_id=int(data['u']))
+            depth_cache.last_update_time = int(time.time())
+            if depth_cache.is_synchronized is False:
+                logger.info(f"BinanceLocalDepthCacheManager._replay_depth_updates(stream_id={stream_id}) - Finished "
+                            f"initialization of the cache with market {market} ({self.sync_strategy.name})")
+                # Init (refresh) finished
+                depth_cache.last_refresh_time = int(time.time())
+                depth_cache.is_synchronized = True
+                if self.book_publisher is not None:
+                    with depth_cache.sequence_lock:
+                        self._publish_book(depth_cache=depth_cache)
+        return True
+
     def _reset_depth_cache(self, market: str = None) -> bool:
         """
         Reset a DepthCache (delete all asks and bids)
@@ -807,22 +1055,24 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             market = market.lower()
         logger.debug(f"BinanceLocalDepthCacheManager._reset_depth_cache() - deleting all bids and ask of depth_cache "
                      f"with market {market}")
-        with self.threading_lock_ask[market]:
-            self.depth_caches[market]['asks'] = {}
-        with self.threading_lock_bid[market]:
-            self.depth_caches[market]['bids'] = {}
+        depth_cache = self.depth_caches[market]
+        with depth_cache.sequence_lock:
+            depth_cache.reset(tick_size=depth_cache.tick_size)
         return True
 
     @staticmethod
-    def _select_from_depthcache(items: dict,
+    def _select_from_depthcache(items: Union[OrderBookSide, dict],
                                 limit_count: int = None,
                                 reverse: bool = False,
                                 threshold_volume: float = None) -> list:
         """
         Returns filtered asks or bids by limit_count and/or threshold_volume
 
+        An `OrderBookSide` is already sorted, so only the requested levels are read and `reverse` is ignored. A plain
+        dict gets sorted completely.
+
         :param items: asks or bids
-        :type items: dict
+        :type items: OrderBookSide or dict
         :param limit_count: List elements threshold to trim the result.
         :type limit_count: int or None (0 is nothing, None is everything)
         :param reverse: False is regular, True is reversed
@@ -831,7 +1081,10 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         :type threshold_volume: float
         :return: list
         """
-        logger.debug(f"BinanceLocalDepthCacheManager._select_from_depthcache() - Starting ...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"BinanceLocalDepthCacheManager._select_from_depthcache() - Starting ...")
+        if isinstance(items, OrderBookSide):
+            return items.select(limit_count=limit_count, threshold_volume=threshold_volume)
         sorted_items = [[float(price), float(quantity)] for price, quantity in list(items.items())]
         sorted_items = sorted(sorted_items, key=itemgetter(0), reverse=reverse)
         if threshold_volume is None:
@@ -854,6 +1107,8 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         """
         Clears asks or bids - Remove orphaned elements len() > limit_count
 
+        The side is kept sorted, so only the levels that got pushed out by the last update are removed.
+
         :param market: One market
         :type market: str
         :param side: 'asks' or 'bids'
@@ -862,30 +1117,24 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         :type limit_count: int or None (0 is nothing, None is everything)
         :return: bool
         """
-        logger.debug(f"BinanceLocalDepthCacheManager._clear_orphaned_depthcache_items() - Starting ...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"BinanceLocalDepthCacheManager._clear_orphaned_depthcache_items() - Starting ...")
         if market is None or side is None:
             raise ValueError('Missing mandatory parameter: market, side')
-        if side == "asks":
-            reverse = False
-        elif side == "bids":
-            reverse = True
-        else:
+        if side != "asks" and side != "bids":
             raise ValueError(f"Parameter 'side' has a wrong value: {side}")
-        try:
-            sorted_items = [[price, float(quantity)] for price, quantity in list(self.depth_caches[market][side].items())]
-            orphaned_items = sorted(sorted_items, key=itemgetter(0), reverse=reverse)[limit_count:]
-        except DepthCacheOutOfSync:
-            return True
-        for item in orphaned_items:
-            try:
-                del self.depth_caches[market][side][str(item[0])]
-            except KeyError as error_msg:
-                print(f"KeyError: {str(item[0])}, {self.depth_caches}")
-                logger.debug(f"BinanceLocalDepthCacheManager._clear_orphaned_depthcache_items() - "
-                             f"KeyError: {error_msg}")
+        orphaned_count = getattr(self.depth_caches[market], side).trim(limit_count=limit_count)
+        if orphaned_count > 0:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"BinanceLocalDepthCacheManager._clear_orphaned_depthcache_items() - Removed "
+                             f"{orphaned_count} orphaned {side} of market '{market}'")
         return True
 
-    def create_depthcache(self, markets: Union[str, List[str], None] = None, refresh_interval: int = None) -> bool:
+    def create_depthcache(self,
+                          markets: Union[str, List[str], None] = None,
+                          refresh_interval: int = None,
+                          priority: int = 0,
+                          desired_depth: int = None) -> bool:
         """
         Create one or more DepthCaches!
 
@@ -895,6 +1144,14 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                                  `BinanceLocalDepthCache <https://unicorn-binance-local-depth-cache.docs.lucit.tech/unicorn_binance_local_depth_cache.html?highlight=default_refresh_interval#unicorn_binance_local_depth_cache.manager.BinanceLocalDepthCacheManager>`__.
                                  The DepthCache is reset and reinitialized at this interval.
         :type refresh_interval: int
+        :param priority: Snapshots of DepthCaches with a higher priority are downloaded first, e.g. after a
+                         reconnect. Default is 0.
+        :type priority: int
+        :param desired_depth: Number of levels per side the DepthCache must provide. The snapshot is downloaded with
+                              the cheapest `limit` that covers it and the DepthCache keeps the `limit` levels of the
+                              snapshot, the additional levels of the same weight refill the desired levels if better
+                              levels are removed. Default is None (1000 levels).
+        :type desired_depth: int
 
         :return: bool
         """
@@ -902,10 +1159,12 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             return False
         if type(markets) is list:
             for market in markets:
-                self._add_depthcache(market=market, refresh_interval=refresh_interval)
+                self._add_depthcache(market=market, refresh_interval=refresh_interval, priority=priority,
+                                     desired_depth=desired_depth)
                 self._add_depthcache_to_dc_stream_list(markets=market)
         else:
-            self._add_depthcache(market=markets, refresh_interval=refresh_interval)
+            self._add_depthcache(market=markets, refresh_interval=refresh_interval, priority=priority,
+                                 desired_depth=desired_depth)
             self._add_depthcache_to_dc_stream_list(markets=markets)
         return True
 
@@ -935,12 +1194,45 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         if market is not None:
             market = market.lower()
         try:
-            with self.threading_lock_ask[market]:
-                return self._get_book_side(market=market,
-                                           limit_count=limit_count,
-                                           reverse=False,
-                                           side="asks",
-                                           threshold_volume=threshold_volume)
+            return self.depth_caches[market].sequence_lock.read(self._get_book_side,
+                                                                market=market,
+                                                                limit_count=limit_count,
+                                                                reverse=False,
+                                                                side="asks",
+                                                                threshold_volume=threshold_volume)
+        except KeyError:
+            raise DepthCacheNotFound(market=market)
+
+    def get_asks_array(self,
+                       market: str = None,
+                       limit_count: int = None,
+                       threshold_volume: float = None,
+                       price_ticks: bool = False) -> tuple:
+        """
+        Get the current asks as a tuple of two contiguous NumPy arrays `(prices, quantities)`.
+
+        Requires `numpy <https://pypi.org/project/numpy/>`__, which is installed with the extra `numpy`:
+        `pip install unicorn-binance-local-depth-cache[numpy]`.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param threshold_volume: Volume threshold to trim the result.
+        :type threshold_volume: float or None (0 is nothing, None is everything)
+        :param price_ticks: If True, the prices are returned as int64 tick counts. Requires `use_price_ticks=True`.
+        :type price_ticks: bool
+        :return: tuple (numpy.ndarray, numpy.ndarray)
+        """
+        if market is not None:
+            market = market.lower()
+        try:
+            return self.depth_caches[market].sequence_lock.read(self._get_book_side_arrays,
+                                                                market=market,
+                                                                limit_count=limit_count,
+                                                                price_ticks=price_ticks,
+                                                                side="asks",
+                                                                threshold_volume=threshold_volume)
         except KeyError:
             raise DepthCacheNotFound(market=market)
 
@@ -962,15 +1254,179 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         if market is not None:
             market = market.lower()
         try:
-            with self.threading_lock_bid[market]:
-                return self._get_book_side(market=market,
-                                           limit_count=limit_count,
-                                           reverse=True,
-                                           side="bids",
-                                           threshold_volume=threshold_volume)
+            return self.depth_caches[market].sequence_lock.read(self._get_book_side,
+                                                                market=market,
+                                                                limit_count=limit_count,
+                                                                reverse=True,
+                                                                side="bids",
+                                                                threshold_volume=threshold_volume)
+        except KeyError:
+            raise DepthCacheNotFound(market=market)
+
+    def get_bids_array(self,
+                       market: str = None,
+                       limit_count: int = None,
+                       threshold_volume: float = None,
+                       price_ticks: bool = False) -> tuple:
+        """
+        Get the current bids as a tuple of two contiguous NumPy arrays `(prices, quantities)`.
+
+        Requires `numpy <https://pypi.org/project/numpy/>`__, which is installed with the extra `numpy`:
+        `pip install unicorn-binance-local-depth-cache[numpy]`.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param threshold_volume: Volume threshold to trim the result.
+        :type threshold_volume: float or None (0 is nothing, None is everything)
+        :param price_ticks: If True, the prices are returned as int64 tick counts. Requires `use_price_ticks=True`.
+        :type price_ticks: bool
+        :return: tuple (numpy.ndarray, numpy.ndarray)
+        """
+        if market is not None:
+            market = market.lower()
+        try:
+            return self.depth_caches[market].sequence_lock.read(self._get_book_side_arrays,
+                                                                market=market,
+                                                                limit_count=limit_count,
+                                                                price_ticks=price_ticks,
+                                                                side="bids",
+                                                                threshold_volume=threshold_volume)
+        except KeyError:
+            raise DepthCacheNotFound(market=market)
+
+    def get_book_arrays(self,
+                        market: str = None,
+                        limit_count: int = None,
+                        threshold_volume: float = None,
+                        price_ticks: bool = False) -> dict:
+        """
+        Get the current asks and bids as contiguous NumPy arrays from one consistent view together with the
+        `last_update_id` they reflect.
+
+        Requires `numpy <https://pypi.org/project/numpy/>`__, which is installed with the extra `numpy`:
+        `pip install unicorn-binance-local-depth-cache[numpy]`.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param threshold_volume: Volume threshold to trim the result.
+        :type threshold_volume: float or None (0 is nothing, None is everything)
+        :param price_ticks: If True, the prices are returned as int64 tick counts. Requires `use_price_ticks=True`.
+        :type price_ticks: bool
+        :return: dict `{'asks': (prices, quantities), 'bids': (prices, quantities), 'last_update_id': int}`
+        """
+        if market is not None:
+            market = market.lower()
+        try:
+            return self.depth_caches[market].sequence_lock.read(self._get_book,
+                                                                market=market,
+                                                                arrays=True,
+                                                                limit_count=limit_count,
+                                                                price_ticks=price_ticks,
+                                                                threshold_volume=threshold_volume)
         except KeyError:
             raise DepthCacheNotFound(market=market)
 
+    def get_book(self,
+                 market: str = None,
+                 limit_count: int = None,
+                 threshold_volume: float = None) -> dict:
+        """
+        Get the current asks and bids of a DepthCache from one consistent view together with the `last_update_id` they
+        reflect.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :param limit_count: List elements threshold to trim the result per side.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param threshold_volume: Volume threshold to trim the result per side.
+        :type threshold_volume: float or None (0 is nothing, None is everything)
+        :return: dict `{'asks': list, 'bids': list, 'last_update_id': int}`
+        """
+        if market is not None:
+            market = market.lower()
+        try:
+            return self.depth_caches[market].sequence_lock.read(self._get_book,
+                                                                market=market,
+                                                                limit_count=limit_count,
+                                                                threshold_volume=threshold_volume)
+        except KeyError:
+            raise DepthCacheNotFound(market=market)
+
+    def get_best_bid_ask(self, market: str = None) -> dict:
+        """
+        Get the best ask, the best bid, the mid price and the spread of a DepthCache from one consistent view together
+        with the `last_update_id` they reflect.
+
+        The values are maintained with every update of the DepthCache, so this does not read or sort the sides.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :return: dict `{'best_ask': [price, quantity] or None, 'best_bid': [price, quantity] or None,
+                 'last_update_id': int, 'mid_price': float or None, 'spread': float or None}`
+        """
+        if market is not None:
+            market = market.lower()
+        try:
+            return self.depth_caches[market].sequence_lock.read(self._get_best_bid_ask, market=market)
+        except KeyError:
+            raise DepthCacheNotFound(market=market)
+
+    def _get_best_bid_ask(self, market: str = None) -> dict:
+        """
+        Get the best ask and the best bid of a DepthCache.
+
+        :param market: Specify the market symbol for the used DepthCache.
+        :type market: str
+        :return: dict
+        """
+        self._verify_depth_cache(market=market)
+        depth_cache = self.depth_caches[market]
+        return {'best_ask': depth_cache.best_ask,
+                'best_bid': depth_cache.best_bid,
+                'last_update_id': depth_cache.last_update_id,
+                'mid_price': depth_cache.mid_price,
+                'spread': depth_cache.spread}
+
+    def _get_book(self,
+                  market: str = None,
+                  arrays: bool = False,
+                  limit_count: int = None,
+                  price_ticks: bool = False,
+                  threshold_volume: float = None) -> dict:
+        """
+        Get the current asks and bids of a DepthCache together with its `last_update_id`.
+
+        :param market: Specify the market symbol for the used DepthCache.
+        :type market: str
+        :param arrays: If True, the sides are returned as NumPy arrays `(prices, quantities)` instead of lists.
+        :type arrays: bool
+        :param limit_count: List elements threshold to trim the result per side.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param price_ticks: If True, the prices of the arrays are returned as int64 tick counts.
+        :type price_ticks: bool
+        :param threshold_volume: Volume threshold to trim the result per side.
+        :type threshold_volume: float or None (0 is nothing, None is everything)
+        :return: dict
+        """
+        self._verify_depth_cache(market=market)
+        if arrays is True:
+            return {'asks': self.depth_caches[market].asks.select_arrays(limit_count=limit_count,
+                                                                         threshold_volume=threshold_volume,
+                                                                         price_ticks=price_ticks),
+                    'bids': self.depth_caches[market].bids.select_arrays(limit_count=limit_count,
+                                                                         threshold_volume=threshold_volume,
+                                                                         price_ticks=price_ticks),
+                    'last_update_id': self.depth_caches[market].last_update_id}
+        return {'asks': self.depth_caches[market].asks.select(limit_count=limit_count,
+                                                              threshold_volume=threshold_volume),
+                'bids': self.depth_caches[market].bids.select(limit_count=limit_count,
+                                                              threshold_volume=threshold_volume),
+                'last_update_id': self.depth_caches[market].last_update_id}
+
     def _get_book_side(self,
                        market: str = None,
                        limit_count: int = None,
@@ -994,6 +1450,63 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         """
         if side is None:
             raise ValueError("Side must be specified.")
+        self._verify_depth_cache(market=market)
+        return self._select_from_depthcache(items=getattr(self.depth_caches[market], side),
+                                            limit_count=limit_count,
+                                            reverse=reverse,
+                                            threshold_volume=threshold_volume)
+
+    def _get_book_side_arrays(self,
+                              market: str = None,
+                              limit_count: int = None,
+                              price_ticks: bool = False,
+                              side: str = None,
+                              threshold_volume: float = None) -> tuple:
+        """
+        Get the current asks or bids as a tuple of two contiguous NumPy arrays `(prices, quantities)`.
+
+        :param market: Specify the market symbol for the used DepthCache.
+        :type market: str
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param price_ticks: If True, the prices are returned as int64 tick counts.
+        :type price_ticks: bool
+        :param side: asks or bids
+        :type side: str
+        :param threshold_volume: Volume threshold to trim the result.
+        :type threshold_volume: float or None (0 is nothing, None is everything)
+        :return: tuple (numpy.ndarray, numpy.ndarray)
+        """
+        if side is None:
+            raise ValueError("Side must be specified.")
+        self._verify_depth_cache(market=market)
+        return getattr(self.depth_caches[market], side).select_arrays(limit_count=limit_count,
+                                                                      threshold_volume=threshold_volume,
+                                                                      price_ticks=price_ticks)
+
+    @staticmethod
+    def _get_warm_start_book(depth_cache: DepthCache = None) -> Optional[dict]:
+        """
+        Get all levels of a synchronized DepthCache together with its `last_update_id`.
+
+        :param depth_cache: The DepthCache
+        :type depth_cache: DepthCache
+        :return: dict or None (if the DepthCache is not synchronized)
+        """
+        if depth_cache.is_synchronized is False:
+            return None
+        return {'asks': depth_cache.asks.select(),
+                'bids': depth_cache.bids.select(),
+                'last_update_id': depth_cache.last_update_id}
+
+    def _verify_depth_cache(self, market: str = None) -> None:
+        """
+        Verify that a DepthCache exists, is synchronized and not stopped.
+
+        :param market: Specify the market symbol for the used DepthCache.
+        :type market: str
+        :return: None
+        """
         if market is None:
             raise DepthCacheNotFound(market=market)
         try:
@@ -1006,10 +1519,6 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                 raise DepthCacheAlreadyStopped(market=market)
         except KeyError:
             raise DepthCacheNotFound(market=market)
-        return self._select_from_depthcache(items=self.depth_caches[market][side],
-                                            limit_count=limit_count,
-                                            reverse=reverse,
-                                            threshold_volume=threshold_volume)
 
     @staticmethod
     def get_latest_release_info() -> Optional[dict]:
@@ -1058,7 +1567,7 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         logger.debug(f"BinanceLocalDepthCacheManager.get_list_of_depthcaches() - Create and then return the list")
         depth_cache_list = []
         for depth_cache in self.depth_caches:
-            if self.depth_caches[depth_cache]['stop_request'] is False:
+            if self.depth_caches[depth_cache].stop_request is False:
                 depth_cache_list.append(depth_cache)
         return depth_cache_list
 
@@ -1070,6 +1579,30 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                        f"'get_list_of_depthcaches()' instead!")
         return self.get_list_of_depthcaches()
 
+    def get_snapshot_metrics(self) -> dict:
+        """
+        Get the metrics of the snapshot downloads.
+
+        :return: dict
+
+        .. code-block:: python
+
+            {'cancelled': 0,
+             'completed': 12,
+             'duration_avg': 0.21,
+             'duration_max': 0.43,
+             'duration_total': 2.52,
+             'failed': 0,
+             'pending': 3,
+             'requested': 15,
+             'running': 0,
+             'started': 12,
+             'weight_available': 2400.0,
+             'weight_limit': 3000,
+             'weight_used': 600}
+        """
+        return self.snapshot_scheduler.get_metrics()
+
     def get_ubra_manager(self) -> BinanceRestApiManager:
         """
         Get the used BinanceRestApiManager() instance of BinanceLocalDepthCacheManager()
@@ -1110,11 +1643,12 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             raise DepthCacheNotFound(market=market)
         market = market.lower()
         try:
-            status = self.depth_caches[market]['is_synchronized']
+            status = self.depth_caches[market].is_synchronized
         except KeyError:
             raise DepthCacheNotFound(market=market)
-        logger.debug(f"BinanceLocalDepthCacheManager.is_depth_cache_synchronized() - Returning the status: "
-                     f"{status}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"BinanceLocalDepthCacheManager.is_depth_cache_synchronized() - Returning the status: "
+                         f"{status}")
         return status
 
     def is_stop_request(self, market: str = None) -> bool:
@@ -1128,7 +1662,9 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         """
         if market is not None:
             market = market.lower()
-        logger.debug(f"BinanceLocalDepthCacheManager.is_stop_request() - Returning the status for market '{market}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"BinanceLocalDepthCacheManager.is_stop_request() - Returning the status for market "
+                         f"'{market}'")
         if market is None:
             if self.stop_request is False:
                 return False
@@ -1136,7 +1672,7 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                 return True
         else:
             try:
-                if self.stop_request is False and self.depth_caches[market]['stop_request'] is False:
+                if self.stop_request is False and self.depth_caches[market].stop_request is False:
                     return False
                 else:
                     return True
@@ -1147,21 +1683,26 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         """
         Get the stream_id of the corresponding stream.
 
+        :param market: The market, if None the id of a stream with free subscription slots is returned.
+        :type market: str
         :return: stream_id (str) or None
         """
-        if len(self.dc_streams) == 0:
-            return None
         if market is not None:
-            with self.dc_streams_lock:
-                for dc_stream in self.dc_streams:
-                    if market in self.dc_streams[dc_stream]['markets']:
-                        return dc_stream
-        else:
-            with self.dc_streams_lock:
-                for dc_stream in self.dc_streams:
-                    if self.ubwa.get_limit_of_subscriptions_per_stream() - len(self.dc_streams[dc_stream]['markets']) > 0:
-                        return dc_stream
-            return None
+            return self.dc_stream_of_market.get(market.lower())
+        with self.dc_streams_lock:
+            return self._get_free_dc_stream()
+
+    def _get_free_dc_stream(self) -> Optional[str]:
+        """
+        Get the id of a stream with free subscription slots. The caller must hold `dc_streams_lock`.
+
+        :return: stream_id (str) or None
+        """
+        limit = self.ubwa.get_limit_of_subscriptions_per_stream()
+        for dc_stream in self.dc_streams:
+            if limit - len(self.dc_streams[dc_stream]['markets']) > 0:
+                return dc_stream
+        return None
 
     def is_update_available(self) -> bool:
         """
@@ -1253,6 +1794,44 @@ class BinanceLocalDepthCacheManager(threading.Thread):
                                        footer=footer,
                                        title=title)
 
+    def save_warm_start_books(self, markets: Optional[Union[str, list]] = None) -> int:
+        """
+        Store the books of synchronized DepthCaches into the `warm_start_directory`.
+
+        :param markets: Specify the market symbols of the DepthCaches, default is all DepthCaches.
+        :type markets: str or list
+        :return: int (number of stored books)
+        """
+        if self.warm_start_store is None:
+            logger.error(f"BinanceLocalDepthCacheManager.save_warm_start_books() - Parameter `warm_start_directory` "
+                         f"is not set!")
+            return 0
+        if markets is None:
+            markets = list(self.depth_caches)
+        elif isinstance(markets, str):
+            markets = [markets, ]
+        saved = 0
+        for market in markets:
+            market = market.lower()
+            depth_cache = self.depth_caches.get(market)
+            if depth_cache is None or depth_cache.stop_request is True:
+                continue
+            book = depth_cache.sequence_lock.read(self._get_warm_start_book, depth_cache=depth_cache)
+            if book is None:
+                continue
+            try:
+                self.warm_start_store.save(market=market,
+                                           last_update_id=book['last_update_id'],
+                                           asks=book['asks'],
+                                           bids=book['bids'])
+            except OSError as error_msg:
+                logger.error(f"BinanceLocalDepthCacheManager.save_warm_start_books() - Can not store the book of "
+                             f"market {market}: {error_msg}")
+                continue
+            saved += 1
+        logger.info(f"BinanceLocalDepthCacheManager.save_warm_start_books() - Stored {saved} books")
+        return saved
+
     def set_refresh_request(self, markets: Optional[Union[str, list]] = None) -> bool:
         """
         Set refresh requests for one or more DepthCaches!
@@ -1270,7 +1849,7 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             market = market.lower()
             logger.info(f"BinanceLocalDepthCacheManager.set_refresh_request() - Set refresh request for "
                         f"depth_cache {market}")
-            self.depth_caches[market]['refresh_request'] = True
+            self.depth_caches[market].refresh_request = True
         return True
 
     def stop_depthcache(self, markets: Optional[Union[str, list]] = None) -> bool:
@@ -1291,24 +1870,20 @@ class BinanceLocalDepthCacheManager(threading.Thread):
             logger.info(f"BinanceLocalDepthCacheManager.stop_depthcache() - Setting stop_request for "
                         f"DepthCache `{market}`, stop its stream and clear the stream_buffer")
             try:
-                self.depth_caches[market]['stop_request'] = True
+                self.depth_caches[market].stop_request = True
             except KeyError:
                 raise DepthCacheNotFound(market=market)
-            dc_stream = self.get_dc_stream_id(market=market)
-            if dc_stream is not None and self.dc_streams[dc_stream]['stream_id'] is not None:
-                self.ubwa.unsubscribe_from_stream(stream_id=self.dc_streams[dc_stream]['stream_id'], markets=market)
-                with self.dc_streams_lock:
-                    try:
-                        self.dc_streams[dc_stream]['markets'].remove(market)
-                    except ValueError:
-                        logger.debug(f"ValueError: '{market}' not in 'self.dc_streams[dc_stream]['markets']'")
-                    try:
-                        self.dc_streams[dc_stream]['subscribed_markets'].remove(market)
-                    except ValueError:
-                        logger.debug(f"ValueError: '{market}' not in "
-                                     f"'self.dc_streams[dc_stream]['subscribed_markets']'")
-            self.depth_caches[market]['asks'] = {}
-            self.depth_caches[market]['bids'] = {}
+            self.snapshot_scheduler.cancel(market=market)
+            with self.dc_streams_lock:
+                dc_stream = self.dc_stream_of_market.pop(market, None)
+                if dc_stream is not None:
+                    self.dc_streams[dc_stream]['markets'].discard(market)
+            if dc_stream is not None:
+                self.subscription_requests.put(("unsubscribe", dc_stream, market))
+            with self.depth_caches[market].sequence_lock:
+                self.depth_caches[market].reset()
+                if self.book_publisher is not None:
+                    self.book_publisher.remove(market=market)
         return True
 
     def stop_depth_cache(self, markets: Optional[Union[str, list]] = None) -> bool:
@@ -1327,6 +1902,14 @@ class BinanceLocalDepthCacheManager(threading.Thread):
         """
         logger.debug(f"BinanceLocalDepthCacheManager.stop_manager() - Stop initiated!")
         self.stop_request = True
+        self.subscription_requests.put(None)
+        self.snapshot_scheduler.stop()
+        if self.warm_start_store is not None:
+            self.save_warm_start_books()
+        if self.book_publisher is not None:
+            self.book_publisher.close()
+        if self.depth_stream_recorder is not None:
+            self.depth_stream_recorder.stop()
         self.ubra.stop_manager()
         self.ubwa.stop_manager()
         if close_api_session is True:
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/mmap_book.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+
+from .shared_book import BookBuffer, BookPublisher
+from typing import Dict, Optional
+import mmap
+import os
+import struct
+
+
+class MmapBookPublisher(BookPublisher):
+    """
+    Publishes the DepthCaches of a `BinanceLocalDepthCacheManager` into memory-mapped files, use it as
+    `book_publisher` of the manager.
+
+    Every market is written to the file `<directory>/<market>.book` in the fixed layout of `BookBuffer`, so consumers
+    on the same host can map the file and read the books without serialization, in Python with `MmapBookReader` and
+    in any other language by following the layout and the sequence protocol that is documented in `shared_book.py`.
+
+    If a DepthCache is stopped or the publisher is closed, the file is kept and its book is marked as not
+    synchronized.
+
+    :param directory: The directory of the files, it gets created if it does not exist.
+    :type directory: str
+    :param depth: Number of levels per side that are published
+    :type depth: int
+    """
+    def __init__(self, directory: str = None, depth: int = 100):
+        if directory is None:
+            raise ValueError("Parameter 'directory' is missing!")
+        super().__init__(depth=depth)
+        self.directory = directory
+        self.mmaps: Dict[str, mmap.mmap] = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _close_book(self, market: str = None) -> None:
+        """
+        Mark the book of a market as not synchronized and unmap its file.
+
+        :param market: The market
+        :type market: str
+        :return: None
+        """
+        mapped_file = self.mmaps.pop(market)
+        book = BookBuffer(buffer=mapped_file, depth=self.depth)
+        book.write(market=market, is_synchronized=False)
+        mapped_file.close()
+
+    def _open_book(self, market: str = None) -> BookBuffer:
+        """
+        Map the file of a market, it gets created if needed.
+
+        A file with a different size (another `depth`) is not resized, because readers that have mapped it would get
+        wrong offsets or a SIGBUS. Its book is marked as not synchronized and the file is replaced by a new one, so
+        existing mappings stay valid.
+
+        :param market: The market
+        :type market: str
+        :return: BookBuffer
+        """
+        path = self.get_path(market=market)
+        size = BookBuffer.get_size(depth=self.depth)
+        try:
+            file_descriptor = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            file_descriptor = None
+        if file_descriptor is not None and os.fstat(file_descriptor).st_size != size:
+            try:
+                self._retire_file(file_descriptor=file_descriptor, market=market)
+            finally:
+                os.close(file_descriptor)
+            file_descriptor = None
+        if file_descriptor is None:
+            temp_path = f"{path}.tmp"
+            file_descriptor = os.open(temp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.ftruncate(file_descriptor, size)
+                os.replace(temp_path, path)
+            except OSError:
+                os.close(file_descriptor)
+                raise
+        try:
+            mapped_file = mmap.mmap(file_descriptor, size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(file_descriptor)
+        self.mmaps[market] = mapped_file
+        return BookBuffer(buffer=mapped_file, depth=self.depth)
+
+    @staticmethod
+    def _retire_file(file_descriptor: int = None, market: str = None) -> None:
+        """
+        Mark the book of a file that is going to be replaced as not synchronized for its remaining readers.
+
+        :param file_descriptor: File descriptor of the file, opened for reading and writing
+        :type file_descriptor: int
+        :param market: The market
+        :type market: str
+        :return: None
+        """
+        if os.fstat(file_descriptor).st_size == 0:
+            return
+        mapped_file = mmap.mmap(file_descriptor, 0, access=mmap.ACCESS_WRITE)
+        try:
+            BookBuffer(buffer=mapped_file).write(market=market, is_synchronized=False)
+        except (ValueError, struct.error):
+            # Not an initialized book
+            pass
+        finally:
+            mapped_file.close()
+
+    def get_path(self, market: str = None) -> str:
+        """
+        Get the path of the file of a market.
+
+        :param market: The market
+        :type market: str
+        :return: str
+        """
+        return os.path.join(self.directory, f"{market}.book")
+
+
+class MmapBookReader(object):
+    """
+    Reads a book that is published into a memory-mapped file by a `MmapBookPublisher`, without any lock.
+
+    :param path: Path of the file, e.g. `MmapBookPublisher.get_path(market)`
+    :type path: str
+    """
+    def __init__(self, path: str = None):
+        if path is None:
+            raise ValueError("Parameter 'path' is missing!")
+        self.path = path
+        with open(path, "rb") as file:
+            self.mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.book = BookBuffer(buffer=self.mapped_file)
+
+    def __enter__(self) -> "MmapBookReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, error_traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmap the file.
+
+        :return: None
+        """
+        self.book = None
+        self.mapped_file.close()
+
+    def read(self, limit_count: Optional[int] = None) -> Optional[dict]:
+        """
+        Get a consistent copy of the book, see `BookBuffer.read()`.
+
+        :param limit_count: Number of levels per side, None is everything.
+        :type limit_count: int or None
+        :return: dict or None
+        """
+        return self.book.read(limit_count=limit_count)
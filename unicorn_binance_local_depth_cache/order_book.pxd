@@ -0,0 +1,55 @@
+# cython: language_level=3
+#
+# File: unicorn_binance_local_depth_cache/order_book.pxd
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+#
+# Augmenting declarations of `order_book.py`: `setup.py` cythonizes the module together with this file, so the compiled
+# wheels build `OrderBookSide` as an extension type with C typed attributes and C level calls between its methods. The
+# `.py` file stays the pure Python implementation that is used if the package is not compiled.
+
+cimport cython
+
+
+cdef class OrderBookSide:
+    cdef public object cache
+    cdef public Py_ssize_t cache_size
+    cdef public Py_ssize_t cache_version
+    cdef public list keys
+    cdef public dict levels
+    cdef public bint reverse
+    cdef public object tick_decimals
+    cdef public object tick_size
+    cdef public Py_ssize_t version
+    cdef public list volumes
+    cdef public Py_ssize_t volumes_version
+
+    cpdef object _to_key(self, object price)
+    cpdef object _to_price(self, object key)
+    @cython.locals(keys=list, levels=dict)
+    cpdef Py_ssize_t apply_levels(self, object updates)
+    cpdef void clear(self)
+    @cython.locals(count=Py_ssize_t)
+    cpdef Py_ssize_t _get_threshold_count(self, double threshold_volume)
+    @cython.locals(total_volume=double, levels=dict, volumes=list)
+    cpdef void _index_volumes(self)
+    cpdef list _select_keys(self, object limit_count=*, object threshold_volume=*)
+    cpdef object get_best(self)
+    cpdef list items(self)
+    @cython.locals(orphaned_count=Py_ssize_t, levels=dict)
+    cpdef Py_ssize_t trim(self, Py_ssize_t limit_count=*)
+    @cython.locals(levels=dict, keys=list, result=list, sign=double)
+    cpdef list select(self, object limit_count=*, object threshold_volume=*)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/order_book.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+#
+# cython: annotation_typing=False
+
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class OrderBookSide(object):
+    """
+    One side (asks or bids) of a DepthCache that is kept sorted while updates are applied.
+
+    The levels are stored in a dict (sort key -> quantity) and the sort keys in an ascending list, best price first.
+    The sort key of an ask is its price, the sort key of a bid is its negative price. This way reading the best
+    `limit_count` levels is a slice of the list and does not need to sort the whole side.
+
+    Every change increments `version`. The accumulated volumes (price * quantity) of the levels are indexed lazily
+    per `version`, so a `threshold_volume` query is a binary search as long as the side does not change.
+
+    If a `tick_size` is provided, the sort keys are integer tick counts instead of floats. Keys are then exact, no
+    matter how the price string of an update is formatted, and comparisons and lookups run on ints. The price strings
+    are still parsed with `float()` and rounded to the nearest tick, so parsing costs the same as with float keys.
+
+    With a `cache_size` greater than 0 the results of `select()` are cached per query until the next change of the
+    side. At most `cache_size` queries are cached, the least recently used query gets evicted first. Cached results
+    are shared between all callers and must not be modified!
+
+    An `OrderBookSide` must be changed by only one writer at a time, reads can run in parallel. A read that overlaps a
+    write can get an inconsistent result, so they are coordinated by the `SequenceLock` of the DepthCache.
+
+    For backwards compatibility the object behaves like the former `{price: quantity}` dict: it supports `len()`,
+    `in`, iteration over the prices, `items()`, item access, item assignment and `del`.
+
+    :param reverse: False for asks (ascending prices), True for bids (descending prices)
+    :type reverse: bool
+    :param tick_size: The `tickSize` of the `PRICE_FILTER` of the symbol, e.g. '0.01000000'. Default is None (float
+                      keys).
+    :type tick_size: str or None
+    :param cache_size: Number of cached `select()` results. Default is 0 (disabled).
+    :type cache_size: int
+    """
+    __slots__ = ('cache', 'cache_size', 'cache_version', 'keys', 'levels', 'reverse', 'tick_decimals', 'tick_size',
+                 'version', 'volumes', 'volumes_version')
+
+    def __init__(self, reverse: bool = False, tick_size: Optional[str] = None, cache_size: int = 0):
+        self.cache: OrderedDict = OrderedDict()
+        self.cache_size: int = cache_size
+        self.cache_version: int = 0
+        self.keys: List[Union[float, int]] = []
+        self.levels: Dict[Union[float, int], float] = {}
+        self.reverse: bool = reverse
+        self.version: int = 0
+        self.volumes: List[float] = []
+        self.volumes_version: int = -1
+        if tick_size is None:
+            self.tick_decimals: Optional[int] = None
+            self.tick_size: Optional[float] = None
+        else:
+            tick = Decimal(tick_size).normalize()
+            if tick <= 0:
+                raise ValueError(f"Parameter 'tick_size' has a wrong value: {tick_size}")
+            self.tick_decimals = max(0, -tick.as_tuple().exponent)
+            self.tick_size = float(tick)
+
+    def __contains__(self, price: Union[str, float]) -> bool:
+        return self._to_key(price) in self.levels
+
+    def __delitem__(self, price: Union[str, float]) -> None:
+        key = self._to_key(price)
+        del self.levels[key]
+        del self.keys[bisect_left(self.keys, key)]
+        self.version += 1
+
+    def __getitem__(self, price: Union[str, float]) -> float:
+        return self.levels[self._to_key(price)]
+
+    def __iter__(self) -> Iterator[float]:
+        for key in self.keys:
+            yield self._to_price(key)
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def __repr__(self) -> str:
+        return f"OrderBookSide(reverse={self.reverse}, tick_size={self.tick_size}, levels={len(self.levels)})"
+
+    def __setitem__(self, price: Union[str, float], quantity: float) -> None:
+        key = self._to_key(price)
+        if key not in self.levels:
+            insort(self.keys, key)
+        self.levels[key] = quantity
+        self.version += 1
+
+    def _to_key(self, price: Union[str, float]) -> Union[float, int]:
+        """
+        Convert a price into the sort key of this side.
+
+        :param price: The price as str or float
+        :type price: str or float
+        :return: float or int (tick count)
+        """
+        if self.tick_size is None:
+            key = float(price)
+        else:
+            key = round(float(price) / self.tick_size)
+        if self.reverse is True:
+            return -key
+        return key
+
+    def _to_price(self, key: Union[float, int]) -> float:
+        """
+        Convert a sort key of this side back into its price.
+
+        :param key: The sort key
+        :type key: float or int (tick count)
+        :return: float
+        """
+        if self.reverse is True:
+            key = -key
+        if self.tick_size is None:
+            return key
+        return round(key * self.tick_size, self.tick_decimals)
+
+    def apply_levels(self, updates: list) -> int:
+        """
+        Apply the levels of a depth update or snapshot, e.g. `[["0.0024", "10"], ["0.0023", "0"]]`.
+
+        The quantity of every level is parsed once, a quantity of 0 deletes the level and every other quantity
+        inserts or replaces it. Deleting a level that does not exist is ignored.
+
+        :param updates: List of `[price, quantity]` levels
+        :type updates: list
+        :return: int (number of applied levels)
+        """
+        keys = self.keys
+        levels = self.levels
+        to_key = self._to_key
+        for price, quantity in updates:
+            key = to_key(price)
+            quantity = float(quantity)
+            if quantity == 0.0:
+                if levels.pop(key, None) is not None:
+                    del keys[bisect_left(keys, key)]
+            else:
+                if key not in levels:
+                    insort(keys, key)
+                levels[key] = quantity
+        if updates:
+            self.version += 1
+        return len(updates)
+
+    def clear(self) -> None:
+        """
+        Delete all levels.
+
+        :return: None
+        """
+        self.keys = []
+        self.levels = {}
+        self.version += 1
+
+    def _get_threshold_count(self, threshold_volume: float) -> int:
+        """
+        Get the number of best levels whose accumulated volume (price * quantity) stays within `threshold_volume`.
+
+        The best level is always counted.
+
+        :param threshold_volume: Volume threshold
+        :type threshold_volume: float
+        :return: int
+        """
+        if self.volumes_version != self.version:
+            self._index_volumes()
+        count = bisect_right(self.volumes, threshold_volume)
+        if count == 0 and len(self.volumes) > 0:
+            return 1
+        return count
+
+    def _index_volumes(self) -> None:
+        """
+        Rebuild the accumulated volumes (price * quantity) of all levels, best price first.
+
+        :return: None
+        """
+        version = self.version
+        levels = self.levels
+        to_price = self._to_price
+        total_volume: float = 0.0
+        volumes: List[float] = []
+        for key in self.keys:
+            total_volume += to_price(key) * levels[key]
+            volumes.append(total_volume)
+        self.volumes = volumes
+        self.volumes_version = version
+
+    def _select_keys(self, limit_count: Optional[int] = None, threshold_volume: Optional[float] = None) -> list:
+        """
+        Get the sort keys of the best levels, filtered by `limit_count` and/or `threshold_volume`.
+
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param threshold_volume: Volume threshold to trim the result
+        :type threshold_volume: float or None (0 is nothing, None is everything)
+        :return: list
+        """
+        if threshold_volume is None:
+            return self.keys[:limit_count]
+        return self.keys[:self._get_threshold_count(threshold_volume)][:limit_count]
+
+    def get_best(self) -> Optional[list]:
+        """
+        Get the best level as `[price, quantity]`.
+
+        :return: list or None (if the side is empty)
+        """
+        try:
+            key = self.keys[0]
+            return [self._to_price(key), self.levels[key]]
+        except IndexError:
+            return None
+
+    def items(self) -> List[Tuple[float, float]]:
+        """
+        Get all levels as `(price, quantity)` tuples, best price first.
+
+        :return: list
+        """
+        return [(self._to_price(key), self.levels[key]) for key in self.keys]
+
+    def trim(self, limit_count: int = 1000) -> int:
+        """
+        Remove the orphaned levels behind the best `limit_count` levels.
+
+        Only the levels that exceed the limit are touched, so the costs depend on the number of removed levels and
+        not on the size of the side.
+
+        :param limit_count: Number of levels to keep.
+        :type limit_count: int
+        :return: int (number of removed levels)
+        """
+        orphaned_count = len(self.keys) - limit_count
+        if orphaned_count <= 0:
+            return 0
+        levels = self.levels
+        for key in self.keys[limit_count:]:
+            del levels[key]
+        del self.keys[limit_count:]
+        self.version += 1
+        return orphaned_count
+
+    def select(self, limit_count: Optional[int] = None, threshold_volume: Optional[float] = None) -> List[list]:
+        """
+        Get the best levels as `[price, quantity]` lists, filtered by `limit_count` and/or `threshold_volume`.
+
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param threshold_volume: Volume threshold to trim the result
+        :type threshold_volume: float or None (0 is nothing, None is everything)
+        :return: list
+        """
+        if self.cache_size > 0:
+            # Parallel readers can replace and trim the cache at any time, so this works on a local reference and
+            # tolerates keys that have just been evicted.
+            version = self.version
+            cache = self.cache
+            if self.cache_version != version:
+                cache = OrderedDict()
+                self.cache = cache
+                self.cache_version = version
+            query = (limit_count, threshold_volume)
+            result = cache.get(query)
+            if result is not None:
+                try:
+                    cache.move_to_end(query)
+                except KeyError:
+                    pass
+                return result
+        levels = self.levels
+        keys = self._select_keys(limit_count=limit_count, threshold_volume=threshold_volume)
+        if self.tick_size is None:
+            sign = -1.0 if self.reverse is True else 1.0
+            result = [[sign * key, levels[key]] for key in keys]
+        else:
+            to_price = self._to_price
+            result = [[to_price(key), levels[key]] for key in keys]
+        if self.cache_size > 0:
+            cache[query] = result
+            while len(cache) > self.cache_size:
+                try:
+                    cache.popitem(last=False)
+                except KeyError:
+                    break
+        return result
+
+    def select_arrays(self,
+                      limit_count: Optional[int] = None,
+                      threshold_volume: Optional[float] = None,
+                      price_ticks: bool = False) -> tuple:
+        """
+        Get the best levels as a tuple of two contiguous NumPy arrays `(prices, quantities)`, filtered by
+        `limit_count` and/or `threshold_volume`.
+
+        Requires `numpy <https://pypi.org/project/numpy/>`__, which is installed with the extra `numpy`:
+        `pip install unicorn-binance-local-depth-cache[numpy]`.
+
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param threshold_volume: Volume threshold to trim the result
+        :type threshold_volume: float or None (0 is nothing, None is everything)
+        :param price_ticks: If True, the prices are returned as int64 tick counts instead of float64. Only available
+                            if the side has a `tick_size`.
+        :type price_ticks: bool
+        :return: tuple (numpy.ndarray, numpy.ndarray)
+        """
+        if numpy is None:
+            raise ImportError("The array API requires `numpy`, please install it: "
+                              "`pip install unicorn-binance-local-depth-cache[numpy]`")
+        if price_ticks is True and self.tick_size is None:
+            raise ValueError("Parameter 'price_ticks' requires an OrderBookSide with a `tick_size`!")
+        levels = self.levels
+        keys = self._select_keys(limit_count=limit_count, threshold_volume=threshold_volume)
+        quantities = numpy.fromiter((levels[key] for key in keys), dtype=numpy.float64, count=len(keys))
+        if self.tick_size is None:
+            prices = numpy.array(keys, dtype=numpy.float64)
+        else:
+            prices = numpy.array(keys, dtype=numpy.int64)
+        if self.reverse is True:
+            numpy.negative(prices, out=prices)
+        if self.tick_size is not None and price_ticks is False:
+            prices = numpy.round(prices * self.tick_size, self.tick_decimals)
+        return prices, quantities
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/recorder.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+
+from bisect import bisect_left
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger("unicorn_binance_local_depth_cache")
+
+# A recording is a sequence of frames, every frame holds a compressed batch of records:
+#   frame header: magic b"UBRF" (4s), codec (uint8), padding (3 bytes), record count (uint32), payload size
+#                 (uint32), timestamp of the first and of the last record (2 x float64)
+#   record: kind (uint8, 0: depth update, 1: snapshot), timestamp (float64), size (uint32), JSON data
+# The index file `<recording>.idx` holds one entry per frame: offset (uint64), first and last timestamp (2 x float64),
+# record count (uint32).
+CODECS = {'none': 0, 'zlib': 1, 'zstd': 2, 'lz4': 3}
+FRAME_HEADER = struct.Struct("<4sB3xIIdd")
+FRAME_MAGIC = b"UBRF"
+INDEX_ENTRY = struct.Struct("<QddI")
+RECORD_HEADER = struct.Struct("<BdI")
+RECORD_KINDS = ("depth", "snapshot")
+
+
+def _compress(codec: int = 0, data: bytes = None) -> bytes:
+    """
+    Compress a payload.
+
+    :param codec: The codec id
+    :type codec: int
+    :param data: The payload
+    :type data: bytes
+    :return: bytes
+    """
+    if codec == CODECS['zstd']:
+        return zstandard.ZstdCompressor().compress(data)
+    if codec == CODECS['lz4']:
+        return lz4_frame.compress(data)
+    if codec == CODECS['zlib']:
+        return zlib.compress(data)
+    return data
+
+
+def _decompress(codec: int = 0, data: bytes = None) -> bytes:
+    """
+    Decompress a payload.
+
+    :param codec: The codec id
+    :type codec: int
+    :param data: The payload
+    :type data: bytes
+    :return: bytes
+    """
+    if codec == CODECS['zstd']:
+        if zstandard is None:
+            raise ImportError("The recording is compressed with zstd, please install it: `pip install zstandard`")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == CODECS['lz4']:
+        if lz4_frame is None:
+            raise ImportError("The recording is compressed with lz4, please install it: `pip install lz4`")
+        return lz4_frame.decompress(data)
+    if codec == CODECS['zlib']:
+        return zlib.decompress(data)
+    return data
+
+
+class DepthStreamRecorder(threading.Thread):
+    """
+    Records the depth updates and REST snapshots of the DepthCaches, use it as `depth_stream_recorder` of a
+    `BinanceLocalDepthCacheManager`.
+
+    `record()` only puts the received data into a queue, a writer thread serializes, compresses and writes it, so
+    recording does not slow down the DepthCaches. If the queue is full, records get dropped and counted in `dropped`.
+
+    Every market is recorded per UTC day into the append-only file `<directory>/<market>/<YYYY-MM-DD>.ubr`. The
+    records are written in compressed frames of up to `frame_size` records or `flush_interval` seconds, together
+    with an index file of the frames for fast seeking, see `DepthStreamReader`. Only the files of the current day of
+    every market are kept open.
+
+    If a frame can not be written (e.g. the disk is full), its records are dropped and counted in `dropped`, the
+    recorder keeps running and retries with the next frame.
+
+    :param directory: The directory of the recordings, it gets created if it does not exist.
+    :type directory: str
+    :param compression: 'zstd' (requires `zstandard`), 'lz4' (requires `lz4`), 'zlib' or 'none'. Default is None
+                        (zstd, lz4 or zlib, whichever is available first).
+    :type compression: str or None
+    :param frame_size: Maximum number of records per frame
+    :type frame_size: int
+    :param flush_interval: Maximum time in seconds a record stays in memory before it is written
+    :type flush_interval: float
+    :param queue_size: Maximum number of records in the queue
+    :type queue_size: int
+    """
+    def __init__(self,
+                 directory: str = None,
+                 compression: Optional[str] = None,
+                 frame_size: int = 1000,
+                 flush_interval: float = 1.0,
+                 queue_size: int = 100000):
+        super().__init__(name="DepthStreamRecorder", daemon=True)
+        if directory is None:
+            raise ValueError("Parameter 'directory' is missing!")
+        if compression is None:
+            if zstandard is not None:
+                compression = "zstd"
+            elif lz4_frame is not None:
+                compression = "lz4"
+            else:
+                compression = "zlib"
+        if compression not in CODECS:
+            raise ValueError(f"Parameter 'compression' has a wrong value: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("Compression 'zstd' requires `zstandard`, please install it: `pip install zstandard`")
+        if compression == "lz4" and lz4_frame is None:
+            raise ImportError("Compression 'lz4' requires `lz4`, please install it: `pip install lz4`")
+        self.directory = directory
+        self.codec: int = CODECS[compression]
+        self.compression = compression
+        self.frame_size = frame_size
+        self.flush_interval = flush_interval
+        self.dropped: int = 0
+        self.recorded: int = 0
+        self.files: Dict[str, Tuple[BinaryIO, BinaryIO]] = {}
+        self.paths: Dict[str, str] = {}
+        self.pending: Dict[str, List[Tuple[int, float, bytes]]] = {}
+        self.pending_since: Dict[str, float] = {}
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.stop_request: bool = False
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _close_files(self, path: str = None) -> None:
+        """
+        Close the files of a recording.
+
+        :param path: Path of the recording
+        :type path: str
+        :return: None
+        """
+        files = self.files.pop(path, None)
+        if files is None:
+            return
+        for file in files:
+            try:
+                file.close()
+            except OSError as error_msg:
+                logger.error(f"DepthStreamRecorder._close_files() - Can not close {file.name}: {error_msg}")
+
+    def _flush(self, path: str = None) -> None:
+        """
+        Write the pending records of a recording as one frame.
+
+        If the frame can not be written, its records are dropped and the files are cut back to their former size, so
+        no broken frame is left behind if possible.
+
+        :param path: Path of the recording
+        :type path: str
+        :return: None
+        """
+        records = self.pending.pop(path)
+        self.pending_since.pop(path, None)
+        payload = _compress(codec=self.codec,
+                            data=b"".join(RECORD_HEADER.pack(kind, timestamp, len(data)) + data
+                                          for kind, timestamp, data in records))
+        offset = None
+        index_offset = None
+        try:
+            files = self.files.get(path)
+            if files is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                recording_file = open(path, "ab")
+                try:
+                    files = (recording_file, open(f"{path}.idx", "ab"))
+                except OSError:
+                    recording_file.close()
+                    raise
+                self.files[path] = files
+            recording_file, index_file = files
+            offset = recording_file.tell()
+            index_offset = index_file.tell()
+            recording_file.write(FRAME_HEADER.pack(FRAME_MAGIC, self.codec, len(records), len(payload),
+                                                   records[0][1], records[-1][1]) + payload)
+            recording_file.flush()
+            index_file.write(INDEX_ENTRY.pack(offset, records[0][1], records[-1][1], len(records)))
+            index_file.flush()
+        except OSError as error_msg:
+            logger.error(f"DepthStreamRecorder._flush() - Can not write {len(records)} records to {path}: "
+                         f"{error_msg}")
+            self.dropped += len(records)
+            self._close_files(path=path)
+            for file_path, size in ((path, offset), (f"{path}.idx", index_offset)):
+                if size is not None:
+                    try:
+                        os.truncate(file_path, size)
+                    except OSError:
+                        pass
+
+    def _flush_all(self) -> None:
+        """
+        Write the pending records of all recordings and close all files.
+
+        :return: None
+        """
+        for path in list(self.pending):
+            self._flush(path=path)
+        for path in list(self.files):
+            self._close_files(path=path)
+
+    def get_path(self, market: str = None, timestamp: Optional[float] = None) -> str:
+        """
+        Get the path of the recording of a market and a day.
+
+        :param market: The market
+        :type market: str
+        :param timestamp: A time of the day, default is now
+        :type timestamp: float or None
+        :return: str
+        """
+        day = time.strftime("%Y-%m-%d", time.gmtime(time.time() if timestamp is None else timestamp))
+        return os.path.join(self.directory, market, f"{day}.ubr")
+
+    def record(self, market: str = None, kind: str = "depth", data: dict = None,
+               timestamp: Optional[float] = None) -> bool:
+        """
+        Queue a depth update or a snapshot to get recorded. The data must not be changed afterwards!
+
+        :param market: The market
+        :type market: str
+        :param kind: 'depth' or 'snapshot'
+        :type kind: str
+        :param data: The `data` of the depth update or the snapshot
+        :type data: dict
+        :param timestamp: Time of receipt, default is now
+        :type timestamp: float or None
+        :return: bool (False if the record got dropped)
+        """
+        try:
+            self.queue.put_nowait((market, kind, time.time() if timestamp is None else timestamp, data))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def run(self) -> None:
+        """
+        Write the queued records until the recorder gets stopped.
+
+        :return: None
+        """
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is not None:
+                market, kind, timestamp, data = item
+                path = self.get_path(market=market, timestamp=timestamp)
+                former_path = self.paths.get(market)
+                if former_path != path:
+                    # A new day: the recording of the former day is finished
+                    if former_path in self.pending:
+                        self._flush(path=former_path)
+                    self._close_files(path=former_path)
+                    self.paths[market] = path
+                records = self.pending.setdefault(path, [])
+                if not records:
+                    self.pending_since[path] = time.time()
+                try:
+                    records.append((RECORD_KINDS.index(kind), timestamp,
+                                    json.dumps(data, separators=(",", ":")).encode("utf-8")))
+                    self.recorded += 1
+                except (TypeError, ValueError) as error_msg:
+                    logger.error(f"DepthStreamRecorder.run() - Can not record {kind} of market '{market}': "
+                                 f"{error_msg}")
+                    if not records:
+                        self.pending.pop(path)
+                        self.pending_since.pop(path)
+                    continue
+                if len(records) >= self.frame_size:
+                    self._flush(path=path)
+            now = time.time()
+            for path, pending_since in list(self.pending_since.items()):
+                if now - pending_since >= self.flush_interval:
+                    self._flush(path=path)
+            if item is None and self.stop_request is True and self.queue.empty():
+                break
+        self._flush_all()
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        Stop the recorder after all queued records are written.
+
+        :param timeout: Maximum time in seconds to wait for the writer thread
+        :type timeout: float or None
+        :return: None
+        """
+        self.stop_request = True
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+
+class DepthStreamReader(object):
+    """
+    Reads a recording of the `DepthStreamRecorder`.
+
+    :param path: Path of the recording, e.g. `DepthStreamRecorder.get_path(market, timestamp)`
+    :type path: str
+    """
+    def __init__(self, path: str = None):
+        if path is None:
+            raise ValueError("Parameter 'path' is missing!")
+        self.path = path
+        self.index: List[Tuple[int, float, float, int]] = []
+        try:
+            with open(f"{path}.idx", "rb") as index_file:
+                index_data = index_file.read()
+        except FileNotFoundError:
+            index_data = b""
+        for offset in range(0, len(index_data) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size):
+            self.index.append(INDEX_ENTRY.unpack_from(index_data, offset))
+
+    @staticmethod
+    def _decode_frame(codec: int = None,
+                      record_count: int = None,
+                      payload: bytes = None,
+                      start_time: Optional[float] = None,
+                      end_time: Optional[float] = None) -> Optional[List[dict]]:
+        """
+        Decode the records of a frame within a time range.
+
+        :param codec: The codec id of the frame
+        :type codec: int
+        :param record_count: Number of records in the frame
+        :type record_count: int
+        :param payload: The compressed payload of the frame
+        :type payload: bytes
+        :param start_time: Skip records before this time
+        :type start_time: float or None
+        :param end_time: Skip records after this time
+        :type end_time: float or None
+        :return: list or None if the frame is invalid
+        """
+        if codec not in CODECS.values():
+            return None
+        try:
+            payload = _decompress(codec=codec, data=payload)
+        except ImportError:
+            raise
+        except Exception:
+            return None
+        records = []
+        position = 0
+        try:
+            for _ in range(record_count):
+                kind, timestamp, size = RECORD_HEADER.unpack_from(payload, position)
+                position += RECORD_HEADER.size
+                if (start_time is None or timestamp >= start_time) and (end_time is None or timestamp <= end_time):
+                    records.append({'data': json.loads(payload[position:position + size]),
+                                    'kind': RECORD_KINDS[kind],
+                                    'timestamp': timestamp})
+                position += size
+        except (IndexError, struct.error, ValueError):
+            return None
+        if position != len(payload):
+            return None
+        return records
+
+    @staticmethod
+    def _find_frame(recording_file: BinaryIO = None, offset: int = 0) -> Optional[int]:
+        """
+        Find the next frame header at or after an offset.
+
+        :param recording_file: The recording
+        :type recording_file: BinaryIO
+        :param offset: Start of the search
+        :type offset: int
+        :return: int or None if there is no further frame
+        """
+        while True:
+            recording_file.seek(offset)
+            chunk = recording_file.read(65536)
+            if len(chunk) < len(FRAME_MAGIC):
+                return None
+            position = chunk.find(FRAME_MAGIC)
+            if position >= 0:
+                return offset + position
+            # The magic can start within the last bytes of the chunk
+            offset += len(chunk) - len(FRAME_MAGIC) + 1
+
+    def read(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> Iterator[dict]:
+        """
+        Get the records of the recording, optionally limited to a time range.
+
+        The index is used to seek to the first frame of the time range. Data that is not a valid frame, e.g. a frame
+        that has not been written completely because of a crash, is skipped up to the next frame.
+
+        :param start_time: Skip records before this time
+        :type start_time: float or None
+        :param end_time: Stop at records after this time
+        :type end_time: float or None
+        :return: Iterator of dicts `{'data': dict, 'kind': str, 'timestamp': float}`
+        """
+        offset = 0
+        if start_time is not None and self.index:
+            # The first frame whose last record is not before `start_time`
+            position = bisect_left([entry[2] for entry in self.index], start_time)
+            if position >= len(self.index):
+                return
+            offset = self.index[position][0]
+        with open(self.path, "rb") as recording_file:
+            while True:
+                recording_file.seek(offset)
+                header = recording_file.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    return
+                magic, codec, record_count, payload_size, first_timestamp, last_timestamp = \
+                    FRAME_HEADER.unpack(header)
+                records = None
+                if magic == FRAME_MAGIC:
+                    payload = recording_file.read(payload_size)
+                    if len(payload) == payload_size:
+                        if start_time is not None and last_timestamp < start_time:
+                            offset += FRAME_HEADER.size + payload_size
+                            continue
+                        records = self._decode_frame(codec=codec, record_count=record_count, payload=payload,
+                                                     start_time=start_time, end_time=end_time)
+                if records is None:
+                    next_offset = self._find_frame(recording_file=recording_file, offset=offset + 1)
+                    logger.warning(f"DepthStreamReader.read() - Skipping invalid data at offset {offset} of "
+                                   f"{self.path}")
+                    if next_offset is None:
+                        return
+                    offset = next_offset
+                    continue
+                if end_time is not None and first_timestamp > end_time:
+                    return
+                offset += FRAME_HEADER.size + payload_size
+                for record in records:
+                    yield record
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/sequence_lock.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+
+from typing import Any, Callable
+import threading
+import time
+
+
+class SequenceLock(object):
+    """
+    A sequence lock (seqlock) for one DepthCache.
+
+    Writers use the lock as context manager (`with lock: ...`). They are serialized among each other and increment
+    `sequence` before and after the write, so it is odd while a write is in progress.
+
+    Readers do not take a lock at all: `read()` runs the read function and repeats it if a write was in progress or
+    has happened in the meantime. This way any number of readers can run in parallel and the writer never waits for
+    a reader.
+    """
+    __slots__ = ('sequence', 'write_lock')
+
+    def __init__(self):
+        self.sequence: int = 0
+        self.write_lock = threading.Lock()
+
+    def __enter__(self) -> "SequenceLock":
+        self.write_lock.acquire()
+        self.sequence += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, error_traceback) -> None:
+        self.sequence += 1
+        self.write_lock.release()
+
+    def read(self, function: Callable, *args, **kwargs) -> Any:
+        """
+        Run `function` with a consistent view of the data protected by this lock and return its result.
+
+        Exceptions raised by `function` are passed through if no write has happened during the read, otherwise the
+        read is repeated.
+
+        :param function: The read function
+        :type function: Callable
+        :return: The result of `function`
+        """
+        while True:
+            sequence = self.sequence
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            try:
+                result = function(*args, **kwargs)
+            except Exception:
+                if self.sequence == sequence:
+                    raise
+                continue
+            if self.sequence == sequence:
+                return result
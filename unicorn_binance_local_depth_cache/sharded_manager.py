@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/sharded_manager.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+
+from .exceptions import DepthCacheAlreadyStopped, DepthCacheNotFound, DepthCacheOutOfSync, DepthCacheShardFailed
+from .manager import BinanceLocalDepthCacheManager
+from .shared_book import BookBuffer, SharedBookPublisher, create_shared_memory, unlink_shared_memory
+from .sync_strategies import get_sync_strategy
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Union
+import logging
+import multiprocessing
+import os
+import queue
+import time
+
+logger = logging.getLogger("unicorn_binance_local_depth_cache")
+
+
+def _run_shard(shard_id: int = None,
+               exchange: str = None,
+               depth: int = None,
+               name_prefix: str = None,
+               command_queue: multiprocessing.Queue = None,
+               status_queue: multiprocessing.Queue = None,
+               manager_kwargs: dict = None) -> None:
+    """
+    Run the `BinanceLocalDepthCacheManager` of one shard and execute the commands of the `ShardedDepthCacheManager`.
+
+    As soon as the manager is created or its creation failed, `(shard_id, None)` or `(shard_id, error message)` is
+    put into the `status_queue`.
+
+    :param shard_id: Number of the shard
+    :type shard_id: int
+    :param exchange: The exchange
+    :type exchange: str
+    :param depth: Number of levels per side that are published
+    :type depth: int
+    :param name_prefix: Prefix of the names of the shared memory segments
+    :type name_prefix: str
+    :param command_queue: Queue with `(method, kwargs)` commands, None stops the shard
+    :type command_queue: multiprocessing.Queue
+    :param status_queue: Queue to report the result of the start
+    :type status_queue: multiprocessing.Queue
+    :param manager_kwargs: Parameters of the `BinanceLocalDepthCacheManager`
+    :type manager_kwargs: dict
+    :return: None
+    """
+    logger.info(f"ShardedDepthCacheManager._run_shard(shard_id={shard_id}) - Starting shard in process {os.getpid()}")
+    book_publisher = SharedBookPublisher(depth=depth, name_prefix=name_prefix, shared_tracker=True)
+    try:
+        ubldc = BinanceLocalDepthCacheManager(exchange=exchange, book_publisher=book_publisher, **manager_kwargs)
+    except Exception as error_msg:
+        logger.critical(f"ShardedDepthCacheManager._run_shard(shard_id={shard_id}) - Can not start the "
+                        f"BinanceLocalDepthCacheManager: {error_msg}")
+        status_queue.put((shard_id, f"{type(error_msg).__name__}: {error_msg}"))
+        return
+    status_queue.put((shard_id, None))
+    while True:
+        command = command_queue.get()
+        if command is None:
+            break
+        method, kwargs = command
+        try:
+            getattr(ubldc, method)(**kwargs)
+        except Exception as error_msg:
+            logger.error(f"ShardedDepthCacheManager._run_shard(shard_id={shard_id}) - Command `{method}` failed: "
+                         f"{error_msg}")
+    ubldc.stop_manager()
+    logger.info(f"ShardedDepthCacheManager._run_shard(shard_id={shard_id}) - Shard stopped")
+
+
+class ShardedDepthCacheManager(object):
+    """
+    Spreads the DepthCaches over `shards` worker processes, each running its own `BinanceLocalDepthCacheManager`
+    with its own streams, snapshots and synchronization, so the DepthCaches are not limited to one CPU core.
+
+    The workers publish the best `depth` levels per side of their DepthCaches after every update into one shared
+    memory segment per market (see `BookBuffer` for the layout). This process reads them without any IPC round trip,
+    other local processes can attach to a segment with `SharedBookReader(name=get_shared_memory_name(market))`.
+
+    The segments are created and unlinked by this instance. The workers are started with the `spawn` method by
+    default, so the main module of the program must be guarded with `if __name__ == "__main__":`. The constructor
+    waits until every shard has created its manager and raises `DepthCacheShardFailed` if a shard could not be
+    started. A shard that stops unexpectedly later is detected when its DepthCaches are read.
+
+    All shards share the REST request weight of the IP, so `snapshot_weight_limit` and `max_concurrent_snapshots` are
+    the totals of all shards and get split evenly between them. By default they are the defaults of a single
+    `BinanceLocalDepthCacheManager`. Every shard needs at least one concurrent snapshot, so with more shards than
+    `max_concurrent_snapshots` the total number of concurrent snapshots is `shards` - the REST weight of all shards
+    together stays within `snapshot_weight_limit` anyway.
+
+    The read methods work on the published levels, so `limit_count` and `threshold_volume` can not reach beyond
+    `depth` levels per side.
+
+    :param exchange: The exchange, see `BinanceLocalDepthCacheManager`
+    :type exchange: str
+    :param shards: Number of worker processes, default is the number of CPU cores.
+    :type shards: int or None
+    :param depth: Number of levels per side that are published. Default is 100.
+    :type depth: int
+    :param start_method: The `multiprocessing` start method of the workers. Default is 'spawn'.
+    :type start_method: str
+    :param startup_timeout: Maximum time in seconds to wait for the start of the shards. Default is 60.
+    :type startup_timeout: float
+    :param manager_kwargs: Further parameters of the `BinanceLocalDepthCacheManager` of every shard, they must be
+                           picklable. `book_publisher` is not supported, the shards publish into shared memory.
+    """
+    def __init__(self,
+                 exchange: str = "binance.com",
+                 shards: Optional[int] = None,
+                 depth: int = 100,
+                 start_method: str = "spawn",
+                 startup_timeout: float = 60.0,
+                 **manager_kwargs):
+        if shards is None:
+            shards = os.cpu_count() or 1
+        if shards < 1:
+            raise ValueError(f"Parameter 'shards' has a wrong value: {shards}")
+        if depth < 1:
+            raise ValueError(f"Parameter 'depth' has a wrong value: {depth}")
+        if "book_publisher" in manager_kwargs:
+            raise ValueError("Parameter 'book_publisher' is not supported, the shards publish into shared memory!")
+        sync_strategy = get_sync_strategy(exchange=exchange)
+        if sync_strategy is None:
+            raise ValueError(f"Parameter 'exchange' has a wrong value: {exchange}")
+        manager_kwargs = dict(manager_kwargs)
+        snapshot_weight_limit = manager_kwargs.get("snapshot_weight_limit") or sync_strategy.weight_limit // 2
+        manager_kwargs['snapshot_weight_limit'] = max(1, snapshot_weight_limit // shards)
+        max_concurrent_snapshots = manager_kwargs.get("max_concurrent_snapshots", 8)
+        if shards > max_concurrent_snapshots:
+            logger.warning(f"ShardedDepthCacheManager() - {shards} shards need at least one concurrent snapshot each, "
+                           f"'max_concurrent_snapshots={max_concurrent_snapshots}' is exceeded")
+        manager_kwargs['max_concurrent_snapshots'] = max(1, max_concurrent_snapshots // shards)
+        self.exchange = exchange
+        self.depth = depth
+        self.name_prefix = f"ubldc{os.getpid()}_"
+        self.books: Dict[str, BookBuffer] = {}
+        self.segments: Dict[str, shared_memory.SharedMemory] = {}
+        self.shard_of_market: Dict[str, int] = {}
+        self.stop_request: bool = False
+        context = multiprocessing.get_context(start_method)
+        self.command_queues: List[multiprocessing.Queue] = []
+        self.processes: List[multiprocessing.Process] = []
+        status_queue = context.Queue()
+        # The shards must share the resource tracker that holds the registrations of the segments created by this
+        # process, a child started with `fork` starts its own tracker if none is running yet
+        resource_tracker.ensure_running()
+        for shard_id in range(shards):
+            command_queue = context.Queue()
+            process = context.Process(target=_run_shard,
+                                      name=f"ubldc_shard_{shard_id}",
+                                      kwargs={'shard_id': shard_id,
+                                              'exchange': exchange,
+                                              'depth': depth,
+                                              'name_prefix': self.name_prefix,
+                                              'command_queue': command_queue,
+                                              'status_queue': status_queue,
+                                              'manager_kwargs': manager_kwargs},
+                                      daemon=True)
+            process.start()
+            self.command_queues.append(command_queue)
+            self.processes.append(process)
+        try:
+            self._wait_for_shards(status_queue=status_queue, timeout=startup_timeout)
+        except DepthCacheShardFailed:
+            self.stop_manager()
+            raise
+        logger.info(f"ShardedDepthCacheManager() - Started {shards} shards for exchange {exchange}")
+
+    def __enter__(self) -> "ShardedDepthCacheManager":
+        return self
+
+    def __exit__(self, exc_type, exc_value, error_traceback) -> None:
+        self.stop_manager()
+
+    def _check_shard(self, shard_id: int = None) -> None:
+        """
+        Raise `DepthCacheShardFailed` if the process of a shard is not running anymore.
+
+        :param shard_id: Number of the shard
+        :type shard_id: int
+        :return: None
+        """
+        process = self.processes[shard_id]
+        if not process.is_alive():
+            logger.error(f"ShardedDepthCacheManager._check_shard() - {process.name} has stopped with exit code "
+                         f"{process.exitcode}")
+            raise DepthCacheShardFailed(shard_id=shard_id, reason=f"exit code {process.exitcode}")
+
+    def _get_free_shard(self) -> int:
+        """
+        Get the running shard with the fewest DepthCaches.
+
+        :return: int
+        """
+        markets_per_shard = [0] * len(self.processes)
+        for shard_id in self.shard_of_market.values():
+            markets_per_shard[shard_id] += 1
+        running_shards = [shard_id for shard_id, process in enumerate(self.processes) if process.is_alive()]
+        if not running_shards:
+            raise DepthCacheShardFailed()
+        return min(running_shards, key=lambda shard_id: markets_per_shard[shard_id])
+
+    def _read_book(self, market: str = None, limit_count: Optional[int] = None) -> dict:
+        """
+        Get a consistent copy of the published book of a market.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :param limit_count: List elements threshold to trim the result per side.
+        :type limit_count: int or None (None is everything)
+        :return: dict
+        """
+        if self.stop_request is True:
+            raise DepthCacheAlreadyStopped(market=market)
+        if market is None:
+            raise DepthCacheNotFound(market=market)
+        market = market.lower()
+        try:
+            book = self.books[market].read(limit_count=limit_count)
+        except KeyError:
+            raise DepthCacheNotFound(market=market)
+        # The book of a stopped shard is not updated anymore
+        self._check_shard(shard_id=self.shard_of_market[market])
+        if book is None or book['is_synchronized'] is False:
+            raise DepthCacheOutOfSync(market=market)
+        return book
+
+    @staticmethod
+    def _select_levels(levels: list = None,
+                       limit_count: Optional[int] = None,
+                       threshold_volume: Optional[float] = None) -> list:
+        """
+        Filter published levels by `limit_count` and/or `threshold_volume` like `OrderBookSide.select()`.
+
+        :param levels: asks or bids, best price first
+        :type levels: list
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (0 is nothing, None is everything)
+        :param threshold_volume: Volume threshold to trim the result, the best level is always included.
+        :type threshold_volume: float or None (None is everything)
+        :return: list
+        """
+        if threshold_volume is None:
+            return levels[:limit_count]
+        total_volume: float = 0.0
+        count: int = 0
+        for price, quantity in levels:
+            total_volume += price * quantity
+            if total_volume > threshold_volume and count > 0:
+                break
+            count += 1
+        return levels[:count][:limit_count]
+
+    def _wait_for_shards(self, status_queue: multiprocessing.Queue = None, timeout: float = 60.0) -> None:
+        """
+        Wait until every shard has reported its start.
+
+        :param status_queue: The queue the shards report to
+        :type status_queue: multiprocessing.Queue
+        :param timeout: Maximum time in seconds to wait
+        :type timeout: float
+        :return: None
+        :raises DepthCacheShardFailed: if a shard could not be started
+        """
+        pending_shards = set(range(len(self.processes)))
+        deadline = time.monotonic() + timeout
+        while pending_shards:
+            try:
+                shard_id, error_msg = status_queue.get(timeout=0.5)
+            except queue.Empty:
+                for shard_id in pending_shards:
+                    self._check_shard(shard_id=shard_id)
+                if time.monotonic() > deadline:
+                    raise DepthCacheShardFailed(shard_id=min(pending_shards),
+                                                reason=f"not started within {timeout} seconds")
+                continue
+            if error_msg is not None:
+                raise DepthCacheShardFailed(shard_id=shard_id, reason=error_msg)
+            pending_shards.discard(shard_id)
+
+    def create_depthcache(self,
+                          markets: Optional[Union[str, list]] = None,
+                          refresh_interval: int = None,
+                          priority: int = 0,
+                          desired_depth: Optional[int] = None) -> bool:
+        """
+        Create one or more DepthCaches, they are assigned to the shards with the fewest DepthCaches.
+
+        :param markets: Specify the market symbols for caches to be created
+        :type markets: str or list
+        :param refresh_interval: The refresh interval in seconds, default is the `default_refresh_interval` of the
+                                 shards.
+        :type refresh_interval: int
+        :param priority: Snapshots of DepthCaches with a higher priority are downloaded first.
+        :type priority: int
+        :param desired_depth: Number of levels per side the DepthCaches must provide, see
+                              `BinanceLocalDepthCacheManager.create_depthcache()`.
+        :type desired_depth: int or None
+        :return: bool
+        :raises DepthCacheShardFailed: if no shard is running
+        """
+        if markets is None:
+            logger.critical(f"ShardedDepthCacheManager.create_depthcache() - Please provide a market")
+            return False
+        if isinstance(markets, str):
+            markets = [markets, ]
+        markets_of_shard: Dict[int, list] = {}
+        try:
+            for market in markets:
+                market = market.lower()
+                if market in self.shard_of_market:
+                    logger.info(f"ShardedDepthCacheManager.create_depthcache() - DepthCache for market {market} "
+                                f"already exists!")
+                    continue
+                shard_id = self._get_free_shard()
+                segment = create_shared_memory(name=self.get_shared_memory_name(market=market),
+                                               size=BookBuffer.get_size(depth=self.depth))
+                book = BookBuffer(buffer=segment.buf, depth=self.depth)
+                book.write(market=market)
+                self.segments[market] = segment
+                self.books[market] = book
+                self.shard_of_market[market] = shard_id
+                markets_of_shard.setdefault(shard_id, []).append(market)
+        finally:
+            # The markets that have been assigned are created, even if no running shard is left for the others
+            for shard_id, shard_markets in markets_of_shard.items():
+                logger.info(f"ShardedDepthCacheManager.create_depthcache() - Creating DepthCaches on shard "
+                            f"{shard_id}: {shard_markets}")
+                self.command_queues[shard_id].put(("create_depthcache", {'markets': shard_markets,
+                                                                         'refresh_interval': refresh_interval,
+                                                                         'priority': priority,
+                                                                         'desired_depth': desired_depth}))
+        return True
+
+    def get_asks(self,
+                 market: str = None,
+                 limit_count: Optional[int] = None,
+                 threshold_volume: Optional[float] = None) -> list:
+        """
+        Get the published asks of a DepthCache.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (None is everything)
+        :param threshold_volume: Volume threshold to trim the result.
+        :type threshold_volume: float or None (None is everything)
+        :return: list
+        """
+        return self.get_book(market=market, limit_count=limit_count, threshold_volume=threshold_volume)['asks']
+
+    def get_best_bid_ask(self, market: str = None) -> dict:
+        """
+        Get the best ask, the best bid, the mid price and the spread of a DepthCache from one consistent view together
+        with the `last_update_id` they reflect.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :return: dict `{'best_ask': [price, quantity] or None, 'best_bid': [price, quantity] or None,
+                 'last_update_id': int, 'mid_price': float or None, 'spread': float or None}`
+        """
+        book = self._read_book(market=market, limit_count=1)
+        best_ask = book['asks'][0] if book['asks'] else None
+        best_bid = book['bids'][0] if book['bids'] else None
+        if best_ask is None or best_bid is None:
+            mid_price = None
+            spread = None
+        else:
+            mid_price = (best_ask[0] + best_bid[0]) / 2
+            spread = best_ask[0] - best_bid[0]
+        return {'best_ask': best_ask,
+                'best_bid': best_bid,
+                'last_update_id': book['last_update_id'],
+                'mid_price': mid_price,
+                'spread': spread}
+
+    def get_bids(self,
+                 market: str = None,
+                 limit_count: Optional[int] = None,
+                 threshold_volume: Optional[float] = None) -> list:
+        """
+        Get the published bids of a DepthCache.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :param limit_count: List elements threshold to trim the result.
+        :type limit_count: int or None (None is everything)
+        :param threshold_volume: Volume threshold to trim the result.
+        :type threshold_volume: float or None (None is everything)
+        :return: list
+        """
+        return self.get_book(market=market, limit_count=limit_count, threshold_volume=threshold_volume)['bids']
+
+    def get_book(self,
+                 market: str = None,
+                 limit_count: Optional[int] = None,
+                 threshold_volume: Optional[float] = None) -> dict:
+        """
+        Get the published asks and bids of a DepthCache from one consistent view together with the `last_update_id`
+        they reflect and the time they have been published.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :param limit_count: List elements threshold to trim the result per side.
+        :type limit_count: int or None (None is everything)
+        :param threshold_volume: Volume threshold to trim the result per side.
+        :type threshold_volume: float or None (None is everything)
+        :return: dict `{'asks': list, 'bids': list, 'last_update_id': int, 'timestamp': float}`
+        """
+        if threshold_volume is None:
+            book = self._read_book(market=market, limit_count=limit_count)
+        else:
+            book = self._read_book(market=market)
+        return {'asks': self._select_levels(book['asks'], limit_count=limit_count, threshold_volume=threshold_volume),
+                'bids': self._select_levels(book['bids'], limit_count=limit_count, threshold_volume=threshold_volume),
+                'last_update_id': book['last_update_id'],
+                'timestamp': book['timestamp']}
+
+    def get_list_of_depthcaches(self) -> list:
+        """
+        Get a list of all DepthCaches.
+
+        :return: list
+        """
+        return list(self.shard_of_market)
+
+    def get_shard(self, market: str = None) -> int:
+        """
+        Get the shard that maintains a DepthCache.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :return: int
+        """
+        try:
+            return self.shard_of_market[market.lower()]
+        except (AttributeError, KeyError):
+            raise DepthCacheNotFound(market=market)
+
+    def get_shared_memory_name(self, market: str = None) -> str:
+        """
+        Get the name of the shared memory segment of a DepthCache.
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :return: str
+        """
+        return f"{self.name_prefix}{market.lower()}"
+
+    def is_depth_cache_synchronized(self, market: str = None) -> bool:
+        """
+        Is a specific DepthCache synchronized?
+
+        :param market: Specify the market symbol for the used DepthCache
+        :type market: str
+        :return: bool
+        """
+        try:
+            book = self.books[market.lower()].read(limit_count=0)
+        except (AttributeError, KeyError):
+            raise DepthCacheNotFound(market=market)
+        return book is not None and book['is_synchronized']
+
+    def stop_depthcache(self, markets: Optional[Union[str, list]] = None) -> bool:
+        """
+        Stop and delete one or more DepthCaches!
+
+        :param markets: Specify the market symbols for the DepthCaches to be stopped and deleted
+        :type markets: str or list
+        :return: bool
+        """
+        if markets is None:
+            logger.critical(f"ShardedDepthCacheManager.stop_depthcache() - Please provide a market")
+            return False
+        if isinstance(markets, str):
+            markets = [markets, ]
+        for market in markets:
+            market = market.lower()
+            try:
+                shard_id = self.shard_of_market.pop(market)
+            except KeyError:
+                raise DepthCacheNotFound(market=market)
+            self.command_queues[shard_id].put(("stop_depthcache", {'markets': market}))
+            self.books.pop(market)
+            unlink_shared_memory(segment=self.segments.pop(market))
+        return True
+
+    def stop_manager(self, timeout: float = 10.0) -> bool:
+        """
+        Stop all shards and delete the shared memory segments.
+
+        :param timeout: Time in seconds to wait for every shard before it gets terminated
+        :type timeout: float
+        :return: bool
+        """
+        if self.stop_request is True:
+            return False
+        logger.debug(f"ShardedDepthCacheManager.stop_manager() - Stop initiated!")
+        self.stop_request = True
+        for command_queue in self.command_queues:
+            try:
+                command_queue.put(None)
+            except (OSError, ValueError, queue.Full):
+                pass
+        for process in self.processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                logger.error(f"ShardedDepthCacheManager.stop_manager() - Terminating {process.name}")
+                process.terminate()
+        self.books.clear()
+        for segment in self.segments.values():
+            unlink_shared_memory(segment=segment)
+        self.segments.clear()
+        return True
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/shared_book.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+
+from .exceptions import BookBufferStalled
+from abc import ABC, abstractmethod
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Set
+import logging
+import struct
+import sys
+import time
+
+logger = logging.getLogger("unicorn_binance_local_depth_cache")
+
+# Layout of a published book, all values little-endian:
+#   offset  0: magic b"UBLD" (4s), layout version (uint16), flags (uint16, bit 0: synchronized)
+#   offset  8: sequence (uint64, odd while the book is written)
+#   offset 16: last_update_id (int64, -1 if unknown)
+#   offset 24: timestamp of the write (float64, unix time)
+#   offset 32: depth (uint32), ask_count (uint32), bid_count (uint32), padding (4 bytes)
+#   offset 48: market (32 bytes, utf-8, zero padded)
+#   offset 80: ask prices, ask quantities, bid prices, bid quantities (each `depth` float64, best level first)
+BOOK_HEADER = struct.Struct("<4sHHQqdIII4x32s")
+BOOK_LAYOUT_VERSION = 1
+BOOK_MAGIC = b"UBLD"
+BOOK_SEQUENCE = struct.Struct("<Q")
+BOOK_SEQUENCE_OFFSET = 8
+FLAG_SYNCHRONIZED = 1
+
+# Names of the shared memory segments created by this process
+_created_segments: Set[str] = set()
+
+
+class BookBuffer(object):
+    """
+    A DepthCache with a fixed number of levels per side in a fixed binary layout on a writable buffer, e.g. the `buf`
+    of a `multiprocessing.shared_memory.SharedMemory` or an `mmap`.
+
+    The book is protected by a sequence counter in the header like the `SequenceLock` of a DepthCache: the only
+    writer increments it before and after a write, so it is odd while a write is in progress. `read()` takes no lock,
+    it copies the book and repeats the copy if the sequence was odd or has changed in the meantime. If the writer is
+    another process that died during a write, the sequence stays odd and `read()` raises `BookBufferStalled` after
+    its `timeout`.
+
+    :param buffer: The buffer, it must be at least `BookBuffer.get_size(depth)` bytes
+    :type buffer: memoryview or mmap
+    :param depth: Number of levels per side, None to read it from the header of an initialized buffer
+    :type depth: int or None
+    """
+    __slots__ = ('buffer', 'depth', 'sequence')
+
+    def __init__(self, buffer=None, depth: Optional[int] = None):
+        if buffer is None:
+            raise ValueError("Parameter 'buffer' is missing!")
+        self.buffer = buffer
+        if depth is None:
+            if bytes(buffer[0:4]) != BOOK_MAGIC:
+                raise ValueError("The buffer does not contain an initialized book!")
+            depth = BOOK_HEADER.unpack_from(buffer, 0)[6]
+        if len(buffer) < self.get_size(depth=depth):
+            raise ValueError(f"The buffer is too small for a depth of {depth} levels: {len(buffer)} bytes")
+        self.depth: int = depth
+        self.sequence: int = BOOK_SEQUENCE.unpack_from(buffer, BOOK_SEQUENCE_OFFSET)[0]
+        if self.sequence & 1:
+            # A former writer stopped during a write
+            self.sequence += 1
+
+    @staticmethod
+    def get_size(depth: int = 0) -> int:
+        """
+        Get the size in bytes of a book with `depth` levels per side.
+
+        :param depth: Number of levels per side
+        :type depth: int
+        :return: int
+        """
+        return BOOK_HEADER.size + depth * 4 * 8
+
+    def read(self, limit_count: Optional[int] = None, timeout: float = 1.0) -> Optional[dict]:
+        """
+        Get a consistent copy of the book.
+
+        :param limit_count: Number of levels per side, None is everything.
+        :type limit_count: int or None
+        :param timeout: Maximum time in seconds to wait for a consistent copy, a write takes only microseconds.
+        :type timeout: float
+        :return: dict `{'asks': list, 'bids': list, 'is_synchronized': bool, 'last_update_id': int or None, 'market':
+                 str, 'timestamp': float}` or None if the buffer has not been written yet
+        :raises BookBufferStalled: if no consistent copy could be made within `timeout`
+        """
+        buffer = self.buffer
+        depth = self.depth
+        deadline = None
+        while True:
+            sequence = BOOK_SEQUENCE.unpack_from(buffer, BOOK_SEQUENCE_OFFSET)[0]
+            if sequence & 1:
+                if deadline is None:
+                    deadline = time.monotonic() + timeout
+                elif time.monotonic() > deadline:
+                    raise BookBufferStalled(timeout=timeout)
+                time.sleep(0)
+                continue
+            magic, _, flags, _, last_update_id, timestamp, _, ask_count, bid_count, market = \
+                BOOK_HEADER.unpack_from(buffer, 0)
+            ask_count = min(ask_count, depth) if limit_count is None else min(ask_count, depth, limit_count)
+            bid_count = min(bid_count, depth) if limit_count is None else min(bid_count, depth, limit_count)
+            offset = BOOK_HEADER.size
+            ask_prices = struct.unpack_from(f"<{ask_count}d", buffer, offset)
+            ask_quantities = struct.unpack_from(f"<{ask_count}d", buffer, offset + depth * 8)
+            bid_prices = struct.unpack_from(f"<{bid_count}d", buffer, offset + depth * 16)
+            bid_quantities = struct.unpack_from(f"<{bid_count}d", buffer, offset + depth * 24)
+            if BOOK_SEQUENCE.unpack_from(buffer, BOOK_SEQUENCE_OFFSET)[0] == sequence:
+                break
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() > deadline:
+                raise BookBufferStalled(timeout=timeout)
+        if magic != BOOK_MAGIC:
+            return None
+        return {'asks': [[price, quantity] for price, quantity in zip(ask_prices, ask_quantities)],
+                'bids': [[price, quantity] for price, quantity in zip(bid_prices, bid_quantities)],
+                'is_synchronized': bool(flags & FLAG_SYNCHRONIZED),
+                'last_update_id': None if last_update_id < 0 else last_update_id,
+                'market': market.rstrip(b"\x00").decode("utf-8"),
+                'timestamp': timestamp}
+
+    def write(self,
+              market: str = None,
+              last_update_id: Optional[int] = None,
+              asks: list = None,
+              bids: list = None,
+              is_synchronized: bool = False,
+              timestamp: Optional[float] = None) -> None:
+        """
+        Write the book. Only one writer per buffer is allowed!
+
+        :param market: The market symbol
+        :type market: str
+        :param last_update_id: The `last_update_id` of the book
+        :type last_update_id: int or None
+        :param asks: The best asks as `[price, quantity]` lists, levels beyond `depth` are ignored
+        :type asks: list
+        :param bids: The best bids as `[price, quantity]` lists, levels beyond `depth` are ignored
+        :type bids: list
+        :param is_synchronized: Is the book synchronized?
+        :type is_synchronized: bool
+        :param timestamp: Time of the book, default is now
+        :type timestamp: float or None
+        :return: None
+        """
+        buffer = self.buffer
+        depth = self.depth
+        asks = asks[:depth] if asks else []
+        bids = bids[:depth] if bids else []
+        ask_count = len(asks)
+        bid_count = len(bids)
+        self.sequence += 1
+        BOOK_SEQUENCE.pack_into(buffer, BOOK_SEQUENCE_OFFSET, self.sequence)
+        BOOK_HEADER.pack_into(buffer, 0,
+                              BOOK_MAGIC,
+                              BOOK_LAYOUT_VERSION,
+                              FLAG_SYNCHRONIZED if is_synchronized is True else 0,
+                              self.sequence,
+                              -1 if last_update_id is None else last_update_id,
+                              time.time() if timestamp is None else timestamp,
+                              depth,
+                              ask_count,
+                              bid_count,
+                              market.encode("utf-8")[:32])
+        offset = BOOK_HEADER.size
+        struct.pack_into(f"<{ask_count}d", buffer, offset, *[level[0] for level in asks])
+        struct.pack_into(f"<{ask_count}d", buffer, offset + depth * 8, *[level[1] for level in asks])
+        struct.pack_into(f"<{bid_count}d", buffer, offset + depth * 16, *[level[0] for level in bids])
+        struct.pack_into(f"<{bid_count}d", buffer, offset + depth * 24, *[level[1] for level in bids])
+        self.sequence += 1
+        BOOK_SEQUENCE.pack_into(buffer, BOOK_SEQUENCE_OFFSET, self.sequence)
+
+
+def attach_shared_memory(name: str = None, shared_tracker: bool = False) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing shared memory segment without taking over its lifetime.
+
+    Before Python 3.13 the `resource_tracker` of a process unlinks every segment it has attached to when the process
+    ends, so the registration is removed again - unless the segment has been created by this process or the
+    `resource_tracker` is shared with the process that created it. Child processes started by `multiprocessing` use
+    the `resource_tracker` of their parent, removing the registration there would remove the one of the creator.
+
+    :param name: Name of the shared memory segment
+    :type name: str
+    :param shared_tracker: True if this process has been started by the creator of the segment with `multiprocessing`
+                           and shares its `resource_tracker`.
+    :type shared_tracker: bool
+    :return: multiprocessing.shared_memory.SharedMemory
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    segment = shared_memory.SharedMemory(name=name)
+    if name not in _created_segments and shared_tracker is False:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def create_shared_memory(name: str = None, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    Create a shared memory segment, it must be unlinked by this process.
+
+    :param name: Name of the shared memory segment
+    :type name: str
+    :param size: Size in bytes
+    :type size: int
+    :return: multiprocessing.shared_memory.SharedMemory
+    """
+    segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    _created_segments.add(name)
+    return segment
+
+
+def unlink_shared_memory(segment: shared_memory.SharedMemory = None) -> None:
+    """
+    Close and unlink a shared memory segment that has been created with `create_shared_memory()`.
+
+    :param segment: The shared memory segment
+    :type segment: multiprocessing.shared_memory.SharedMemory
+    :return: None
+    """
+    _created_segments.discard(segment.name)
+    segment.close()
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class BookPublisher(ABC):
+    """
+    Base class of the publishers that write the DepthCaches of a `BinanceLocalDepthCacheManager` into a `BookBuffer`
+    per market, use an instance as `book_publisher` of the manager.
+
+    Subclasses provide the buffer of a market with `_open_book()` and release it with `_close_book()`.
+
+    :param depth: Number of levels per side that are published
+    :type depth: int
+    """
+    def __init__(self, depth: int = 100):
+        if depth < 1:
+            raise ValueError(f"Parameter 'depth' has a wrong value: {depth}")
+        self.depth = depth
+        self.books: Dict[str, BookBuffer] = {}
+
+    @abstractmethod
+    def _close_book(self, market: str = None) -> None:
+        """
+        Release the buffer of a market.
+
+        :param market: The market
+        :type market: str
+        :return: None
+        """
+
+    @abstractmethod
+    def _open_book(self, market: str = None) -> BookBuffer:
+        """
+        Get the buffer of a market.
+
+        :param market: The market
+        :type market: str
+        :return: BookBuffer
+        """
+
+    def close(self) -> None:
+        """
+        Release the buffers of all markets.
+
+        :return: None
+        """
+        for market in list(self.books):
+            self.remove(market=market)
+
+    def publish(self, depth_cache=None) -> None:
+        """
+        Write a DepthCache into its buffer. Must be called within a write of the `SequenceLock` of the DepthCache.
+
+        :param depth_cache: The DepthCache
+        :type depth_cache: DepthCache
+        :return: None
+        """
+        book = self.books.get(depth_cache.market)
+        if book is None:
+            book = self._open_book(market=depth_cache.market)
+            self.books[depth_cache.market] = book
+        book.write(market=depth_cache.market,
+                   last_update_id=depth_cache.last_update_id,
+                   asks=depth_cache.asks.select(limit_count=self.depth),
+                   bids=depth_cache.bids.select(limit_count=self.depth),
+                   is_synchronized=depth_cache.is_synchronized)
+
+    def remove(self, market: str = None) -> None:
+        """
+        Stop publishing a market and release its buffer.
+
+        :param market: The market
+        :type market: str
+        :return: None
+        """
+        if self.books.pop(market, None) is not None:
+            self._close_book(market=market)
+
+
+class SharedBookPublisher(BookPublisher):
+    """
+    Publishes the DepthCaches of a `BinanceLocalDepthCacheManager` into shared memory segments, use it as
+    `book_publisher` of the manager.
+
+    The segment of a market is named `name_prefix` + market. It is created by the publisher, unless it already exists
+    (e.g. created by the `ShardedDepthCacheManager`), and unlinked by whoever created it.
+
+    :param depth: Number of levels per side that are published
+    :type depth: int
+    :param name_prefix: Prefix of the names of the shared memory segments
+    :type name_prefix: str
+    :param shared_tracker: True if the publisher runs in a child process of the creator of the segments and shares
+                           its `resource_tracker`, see `attach_shared_memory()`.
+    :type shared_tracker: bool
+    """
+    def __init__(self, depth: int = 100, name_prefix: str = "ubldc_", shared_tracker: bool = False):
+        super().__init__(depth=depth)
+        self.name_prefix = name_prefix
+        self.shared_tracker = shared_tracker
+        self.owned_segments: Dict[str, shared_memory.SharedMemory] = {}
+        self.segments: Dict[str, shared_memory.SharedMemory] = {}
+
+    def _close_book(self, market: str = None) -> None:
+        """
+        Close the segment of a market and unlink it if it has been created by this publisher.
+
+        :param market: The market
+        :type market: str
+        :return: None
+        """
+        segment = self.segments.pop(market)
+        if self.owned_segments.pop(market, None) is not None:
+            unlink_shared_memory(segment=segment)
+        else:
+            segment.close()
+
+    def _open_book(self, market: str = None) -> BookBuffer:
+        """
+        Attach to the segment of a market or create it.
+
+        :param market: The market
+        :type market: str
+        :return: BookBuffer
+        """
+        name = self.get_name(market=market)
+        try:
+            segment = attach_shared_memory(name=name, shared_tracker=self.shared_tracker)
+        except FileNotFoundError:
+            segment = create_shared_memory(name=name, size=BookBuffer.get_size(depth=self.depth))
+            self.owned_segments[market] = segment
+        self.segments[market] = segment
+        return BookBuffer(buffer=segment.buf, depth=self.depth)
+
+    def get_name(self, market: str = None) -> str:
+        """
+        Get the name of the shared memory segment of a market.
+
+        :param market: The market
+        :type market: str
+        :return: str
+        """
+        return f"{self.name_prefix}{market}"
+
+
+class SharedBookReader(object):
+    """
+    Reads a book that is published into shared memory by a `SharedBookPublisher` from any local process.
+
+    :param name: Name of the shared memory segment, e.g. `ShardedDepthCacheManager.get_shared_memory_name(market)`
+    :type name: str
+    :param shared_tracker: True if the reader runs in a child process of the creator of the segment and shares its
+                           `resource_tracker`, see `attach_shared_memory()`.
+    :type shared_tracker: bool
+    """
+    def __init__(self, name: str = None, shared_tracker: bool = False):
+        if name is None:
+            raise ValueError("Parameter 'name' is missing!")
+        self.name = name
+        self.segment = attach_shared_memory(name=name, shared_tracker=shared_tracker)
+        self.book = BookBuffer(buffer=self.segment.buf)
+
+    def __enter__(self) -> "SharedBookReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, error_traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Detach from the segment.
+
+        :return: None
+        """
+        self.book = None
+        self.segment.close()
+
+    def read(self, limit_count: Optional[int] = None) -> Optional[dict]:
+        """
+        Get a consistent copy of the book, see `BookBuffer.read()`.
+
+        :param limit_count: Number of levels per side, None is everything.
+        :type limit_count: int or None
+        :return: dict or None
+        """
+        return self.book.read(limit_count=limit_count)
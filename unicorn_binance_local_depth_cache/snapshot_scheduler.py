@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/snapshot_scheduler.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+import heapq
+import logging
+import threading
+import time
+
+logger = logging.getLogger("unicorn_binance_local_depth_cache")
+
+
+class SnapshotScheduler(threading.Thread):
+    """
+    Schedules the REST snapshot downloads of the DepthCaches.
+
+    Requested snapshots are queued by priority (higher first) and then by the time they have been requested, so the
+    DepthCache that is out of sync the longest is next. The snapshots run in a pool of `max_concurrent_snapshots`
+    worker threads, so a mass resync after a reconnect does not create a thread per DepthCache. A requested snapshot
+    that has not been started yet can be cancelled.
+
+    The REST request weight is managed by a token bucket that holds up to `weight_limit` weight and is refilled with
+    `weight_limit` per minute. A snapshot is only started if the bucket holds its weight and if the used weight of the
+    current minute leaves room for it. The used weight is reported by the REST API in the `X-MBX-USED-WEIGHT` header
+    of every response, so no additional request is needed to get it.
+
+    :param snapshot_function: The function that downloads and applies the snapshot of a market
+    :type snapshot_function: Callable
+    :param get_used_weight: Returns the used weight of the last REST response, e.g. `ubra.get_used_weight(cached=True)`
+    :type get_used_weight: Callable or None
+    :param weight_limit: Request weight per minute that is available for snapshots, None disables the weight control.
+    :type weight_limit: int or None
+    :param max_concurrent_snapshots: Maximum number of snapshots that are downloaded at the same time.
+    :type max_concurrent_snapshots: int
+    :param min_interval: Minimum time in seconds between the start of two snapshots.
+    :type min_interval: float
+    :param market_interval: Minimum time in seconds between the start of two snapshots of the same market.
+    :type market_interval: float
+    """
+    def __init__(self,
+                 snapshot_function: Callable[[str], object] = None,
+                 get_used_weight: Callable[[], Optional[dict]] = None,
+                 weight_limit: Optional[int] = None,
+                 max_concurrent_snapshots: int = 8,
+                 min_interval: float = 0.0,
+                 market_interval: float = 0.0):
+        super().__init__(name="SnapshotScheduler", daemon=True)
+        if snapshot_function is None:
+            raise ValueError("Parameter 'snapshot_function' is missing!")
+        if max_concurrent_snapshots < 1:
+            raise ValueError(f"Parameter 'max_concurrent_snapshots' has a wrong value: {max_concurrent_snapshots}")
+        self.snapshot_function = snapshot_function
+        self.get_used_weight = get_used_weight
+        self.weight_limit = weight_limit
+        self.max_concurrent_snapshots = max_concurrent_snapshots
+        self.min_interval = min_interval
+        self.market_interval = market_interval
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_snapshots,
+                                           thread_name_prefix="ubldc_snapshot")
+        self.metrics: Dict[str, float] = {'cancelled': 0,
+                                          'completed': 0,
+                                          'duration_max': 0.0,
+                                          'duration_total': 0.0,
+                                          'failed': 0,
+                                          'requested': 0,
+                                          'started': 0,
+                                          'weight_used': 0}
+        self.last_refill_time: float = time.time()
+        self.last_start_time: float = 0.0
+        self.last_start_times: Dict[str, float] = {}
+        self.pending: Dict[str, list] = {}
+        self.queue: List[list] = []
+        self.running: Set[str] = set()
+        self.sequence: int = 0
+        self.stop_request: bool = False
+        self.tokens: float = float(weight_limit or 0)
+
+    def _get_available_weight(self, now: float) -> float:
+        """
+        Refill the token bucket and get the weight that is available right now.
+
+        :param now: The current time
+        :type now: float
+        :return: float
+        """
+        self.tokens = min(float(self.weight_limit),
+                          self.tokens + (now - self.last_refill_time) * self.weight_limit / 60.0)
+        self.last_refill_time = now
+        available_weight = self.tokens
+        if self.get_used_weight is not None:
+            try:
+                used_weight = self.get_used_weight()
+            except Exception as error_msg:
+                logger.debug(f"SnapshotScheduler._get_available_weight() - Can not get the used weight: {error_msg}")
+                used_weight = None
+            # The used weight of the API is counted per minute
+            if used_weight is not None and used_weight.get('timestamp') is not None \
+                    and int(used_weight['timestamp'] // 60) == int(now // 60):
+                available_weight = min(available_weight, self.weight_limit - int(used_weight['weight']))
+        return available_weight
+
+    def _get_next(self, now: float) -> tuple:
+        """
+        Get the next snapshot that can be started and remove it from the queue.
+
+        Entries of markets whose snapshot is still running or that have to wait for their `market_interval` are
+        skipped, so they do not block the snapshots of other markets.
+
+        :param now: The current time
+        :type now: float
+        :return: tuple (entry or None, seconds to wait or None to wait for a notification)
+        """
+        if len(self.running) >= self.max_concurrent_snapshots:
+            return None, None
+        entry = None
+        skipped_entries = []
+        wait_time = None
+        while self.queue:
+            candidate = heapq.heappop(self.queue)
+            if candidate[3] is None:
+                # Cancelled
+                continue
+            if candidate[3] in self.running:
+                skipped_entries.append(candidate)
+            elif candidate[1] > now:
+                skipped_entries.append(candidate)
+                wait_time = candidate[1] - now if wait_time is None else min(wait_time, candidate[1] - now)
+            else:
+                entry = candidate
+                break
+        for skipped_entry in skipped_entries:
+            heapq.heappush(self.queue, skipped_entry)
+        if entry is None:
+            return None, wait_time
+        wait_time = self.last_start_time + self.min_interval - now
+        if self.weight_limit is not None:
+            missing_weight = min(entry[4], self.weight_limit) - self._get_available_weight(now=now)
+            if missing_weight > 0:
+                wait_time = max(wait_time, missing_weight * 60.0 / self.weight_limit)
+        if wait_time > 0:
+            heapq.heappush(self.queue, entry)
+            return None, wait_time
+        return entry, None
+
+    def _run_snapshot(self, market: str = None) -> None:
+        """
+        Run the snapshot function of a market and release its slot.
+
+        :param market: The market
+        :type market: str
+        :return: None
+        """
+        start_time = time.time()
+        result = False
+        try:
+            result = self.snapshot_function(market)
+        except Exception as error_msg:
+            logger.error(f"SnapshotScheduler._run_snapshot() - Snapshot of market '{market}' failed: {error_msg}")
+        finally:
+            duration = time.time() - start_time
+            with self.condition:
+                self.running.discard(market)
+                self.metrics['completed' if result is not False else 'failed'] += 1
+                self.metrics['duration_max'] = max(self.metrics['duration_max'], duration)
+                self.metrics['duration_total'] += duration
+                self.condition.notify_all()
+
+    def cancel(self, market: str = None) -> bool:
+        """
+        Remove a requested snapshot from the queue.
+
+        :param market: The market
+        :type market: str
+        :return: bool
+        """
+        with self.condition:
+            entry = self.pending.pop(market, None)
+            if entry is None:
+                return False
+            entry[3] = None
+            self.metrics['cancelled'] += 1
+            return True
+
+    def get_metrics(self) -> dict:
+        """
+        Get the metrics of the scheduler.
+
+        :return: dict
+        """
+        with self.condition:
+            metrics = dict(self.metrics)
+            metrics['pending'] = len(self.pending)
+            metrics['running'] = len(self.running)
+            if self.weight_limit is not None:
+                metrics['weight_available'] = self._get_available_weight(now=time.time())
+            else:
+                metrics['weight_available'] = None
+            metrics['weight_limit'] = self.weight_limit
+        finished = metrics['completed'] + metrics['failed']
+        metrics['duration_avg'] = metrics['duration_total'] / finished if finished > 0 else 0.0
+        return metrics
+
+    def request(self, market: str = None, weight: int = 0, priority: int = 0) -> bool:
+        """
+        Request a snapshot of a market.
+
+        :param market: The market
+        :type market: str
+        :param weight: The request weight of the snapshot
+        :type weight: int
+        :param priority: Snapshots with a higher priority are started first.
+        :type priority: int
+        :return: bool (False if a snapshot of the market is already requested)
+        """
+        with self.condition:
+            if market in self.pending:
+                return False
+            not_before = max(time.time(), self.last_start_times.get(market, 0.0) + self.market_interval)
+            self.sequence += 1
+            entry = [-priority, not_before, self.sequence, market, weight]
+            heapq.heappush(self.queue, entry)
+            self.pending[market] = entry
+            self.metrics['requested'] += 1
+            self.condition.notify_all()
+        return True
+
+    def run(self) -> None:
+        """
+        Start the requested snapshots as soon as a slot and enough weight are available.
+
+        :return: None
+        """
+        while self.stop_request is False:
+            with self.condition:
+                now = time.time()
+                entry, wait_time = self._get_next(now=now)
+                if entry is None:
+                    self.condition.wait(timeout=wait_time)
+                    continue
+                market, weight = entry[3], entry[4]
+                del self.pending[market]
+                self.running.add(market)
+                self.last_start_time = now
+                self.last_start_times[market] = now
+                if self.weight_limit is not None:
+                    self.tokens -= weight
+                self.metrics['started'] += 1
+                self.metrics['weight_used'] += weight
+            logger.debug(f"SnapshotScheduler.run() - Starting snapshot of market '{market}' (weight: {weight})")
+            try:
+                self.executor.submit(self._run_snapshot, market)
+            except RuntimeError as error_msg:
+                # The executor has been shut down
+                logger.debug(f"SnapshotScheduler.run() - Can not start snapshot of market '{market}': {error_msg}")
+                with self.condition:
+                    self.running.discard(market)
+
+    def stop(self) -> None:
+        """
+        Stop the scheduler and cancel all requested snapshots, running snapshots are not interrupted.
+
+        :return: None
+        """
+        with self.condition:
+            self.stop_request = True
+            for entry in self.pending.values():
+                entry[3] = None
+            self.metrics['cancelled'] += len(self.pending)
+            self.pending.clear()
+            self.condition.notify_all()
+        self.executor.shutdown(wait=False)
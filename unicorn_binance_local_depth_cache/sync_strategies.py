@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/sync_strategies.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+
+
+from typing import Optional, Type
+from unicorn_binance_rest_api import BinanceRestApiManager
+
+
+class SyncStrategy(object):
+    """
+    Exchange specific rules to synchronize a DepthCache with the diff depth stream and the REST API of an exchange.
+
+    The strategy of a `BinanceLocalDepthCacheManager` instance is chosen once by `get_sync_strategy()`, so the hot
+    path does not need to compare exchange strings per received message.
+
+    `weight_limit` is the request weight per minute of the REST API, `snapshot_limits` are the valid `limit` values of
+    an order book snapshot and `snapshot_weights` their weight per tier as `(max limit, weight)`.
+
+    Spot: https://binance-docs.github.io/apidocs/spot/en/#how-to-manage-a-local-order-book-correctly
+    """
+    name: str = "Spot"
+    snapshot_limits: tuple = (5, 10, 20, 50, 100, 500, 1000, 5000)
+    snapshot_weights: tuple = ((100, 5), (500, 25), (1000, 50), (5000, 250))
+    weight_limit: int = 6000
+
+    @staticmethod
+    def get_exchange_info(ubra: BinanceRestApiManager) -> dict:
+        """
+        Download the `exchangeInfo`.
+
+        :param ubra: The REST API manager
+        :type ubra: BinanceRestApiManager
+        :return: dict
+        """
+        return ubra.get_exchange_info()
+
+    @staticmethod
+    def get_order_book(ubra: BinanceRestApiManager, symbol: str, limit: int = 1000) -> dict:
+        """
+        Download an order book snapshot.
+
+        :param ubra: The REST API manager
+        :type ubra: BinanceRestApiManager
+        :param symbol: The symbol in upper case
+        :type symbol: str
+        :param limit: Number of levels per side
+        :type limit: int
+        :return: dict
+        """
+        return ubra.get_order_book(symbol=symbol, limit=limit)
+
+    @classmethod
+    def get_snapshot_limit(cls, desired_depth: Optional[int] = None) -> int:
+        """
+        Get the cheapest `limit` of an order book snapshot that covers `desired_depth` levels.
+
+        Of all limits with the lowest weight the largest is chosen, the additional levels are for free.
+
+        :param desired_depth: Number of levels per side the DepthCache needs, None for 1000
+        :type desired_depth: int or None
+        :return: int
+        """
+        if desired_depth is None:
+            return 1000
+        limits = [limit for limit in cls.snapshot_limits if limit >= desired_depth] or [cls.snapshot_limits[-1]]
+        weight = cls.get_snapshot_weight(limit=limits[0])
+        return max(limit for limit in limits if cls.get_snapshot_weight(limit=limit) == weight)
+
+    @classmethod
+    def get_snapshot_weight(cls, limit: int = 1000) -> int:
+        """
+        Get the request weight of an order book snapshot.
+
+        :param limit: Number of levels per side
+        :type limit: int
+        :return: int
+        """
+        for max_limit, weight in cls.snapshot_weights:
+            if limit <= max_limit:
+                return weight
+        return cls.snapshot_weights[-1][1]
+
+    @staticmethod
+    def has_gap(data: dict, last_update_id: int) -> bool:
+        """
+        Check if a depth update of a synchronized DepthCache does not follow the last applied update.
+
+        :param data: The `data` of the received depth update
+        :type data: dict
+        :param last_update_id: The last applied update ID
+        :type last_update_id: int
+        :return: bool
+        """
+        return data['U'] != last_update_id + 1
+
+    @staticmethod
+    def is_first_event(data: dict, last_update_id: int) -> bool:
+        """
+        Check if a depth update is the first one to apply on top of the snapshot.
+
+        :param data: The `data` of the received depth update
+        :type data: dict
+        :param last_update_id: The `lastUpdateId` of the snapshot
+        :type last_update_id: int
+        :return: bool
+        """
+        # The first processed event should have U <= lastUpdateId+1 AND u >= lastUpdateId+1.
+        return int(data['U']) <= last_update_id + 1 <= int(data['u'])
+
+    @staticmethod
+    def is_outdated(data: dict, last_update_id: int) -> bool:
+        """
+        Check if a depth update is already included in the snapshot.
+
+        :param data: The `data` of the received depth update
+        :type data: dict
+        :param last_update_id: The `lastUpdateId` of the snapshot
+        :type last_update_id: int
+        :return: bool
+        """
+        return int(data['u']) <= last_update_id
+
+
+class BinanceUsSyncStrategy(SyncStrategy):
+    """
+    Binance US: https://docs.binance.us/#rate-limits
+    """
+    weight_limit: int = 1200
+
+
+class FuturesSyncStrategy(SyncStrategy):
+    """
+    USDⓈ-M Futures: https://binance-docs.github.io/apidocs/futures/en/#how-to-manage-a-local-order-book-correctly
+    """
+    name: str = "Futures"
+    snapshot_limits: tuple = (5, 10, 20, 50, 100, 500, 1000)
+    snapshot_weights: tuple = ((50, 2), (100, 5), (500, 10), (1000, 20))
+    weight_limit: int = 2400
+
+    @staticmethod
+    def get_exchange_info(ubra: BinanceRestApiManager) -> dict:
+        return ubra.futures_exchange_info()
+
+    @staticmethod
+    def get_order_book(ubra: BinanceRestApiManager, symbol: str, limit: int = 1000) -> dict:
+        return ubra.futures_order_book(symbol=symbol, limit=limit)
+
+    @staticmethod
+    def has_gap(data: dict, last_update_id: int) -> bool:
+        return data['pu'] != last_update_id
+
+    @staticmethod
+    def is_first_event(data: dict, last_update_id: int) -> bool:
+        # The first processed event should have U <= lastUpdateId AND u >= lastUpdateId
+        return int(data['U']) <= last_update_id <= int(data['u'])
+
+    @staticmethod
+    def is_outdated(data: dict, last_update_id: int) -> bool:
+        return int(data['u']) < last_update_id
+
+
+class CoinFuturesSyncStrategy(FuturesSyncStrategy):
+    """
+    COIN-M Futures: https://binance-docs.github.io/apidocs/delivery/en/#how-to-manage-a-local-order-book-correctly
+    """
+    name: str = "Coin Futures"
+
+    @staticmethod
+    def get_exchange_info(ubra: BinanceRestApiManager) -> dict:
+        return ubra.futures_coin_exchange_info()
+
+    @staticmethod
+    def get_order_book(ubra: BinanceRestApiManager, symbol: str, limit: int = 1000) -> dict:
+        return ubra.futures_coin_order_book(symbol=symbol, limit=limit)
+
+
+SYNC_STRATEGIES = {"binance.com": SyncStrategy,
+                   "binance.com-testnet": SyncStrategy,
+                   "binance.us": BinanceUsSyncStrategy,
+                   "binance.com-futures": FuturesSyncStrategy,
+                   "binance.com-futures-testnet": FuturesSyncStrategy,
+                   "binance.com-coin_futures": CoinFuturesSyncStrategy}
+
+
+def get_sync_strategy(exchange: str = None) -> Optional[Type[SyncStrategy]]:
+    """
+    Get the `SyncStrategy` of an exchange.
+
+    :param exchange: The exchange name, e.g. 'binance.com-futures'
+    :type exchange: str
+    :return: SyncStrategy class or None (if the exchange is not supported)
+    """
+    return SYNC_STRATEGIES.get(exchange)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_binance_local_depth_cache/warm_start.py
+#
+# Part of ‘UNICORN Binance Local Depth Cache’
+# Project website: https://www.lucit.tech/unicorn-binance-local-depth-cache.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache
+# Documentation: https://unicorn-binance-local-depth-cache.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-binance-local-depth-cache
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-binance-local-depth-cache/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2022-2024, LUCIT Systems and Development - https://www.lucit.tech
+# All rights reserved.
+
+from typing import Optional
+import logging
+import os
+import struct
+import time
+
+logger = logging.getLogger("unicorn_binance_local_depth_cache")
+
+# Layout of a stored book, all values little-endian:
+#   magic b"UBWS" (4s), layout version (uint16), padding (2 bytes), last_update_id (int64), timestamp (float64),
+#   ask_count (uint32), bid_count (uint32), then the asks and the bids as float64 `price, quantity` pairs
+WARM_START_HEADER = struct.Struct("<4sH2xqdII")
+WARM_START_LAYOUT_VERSION = 1
+WARM_START_MAGIC = b"UBWS"
+
+
+class WarmStartStore(object):
+    """
+    Stores the books of DepthCaches in compact binary files, one `<market>.ubws` file per market, to initialize
+    them again after a restart without a REST snapshot.
+
+    Files are replaced atomically, so a crash during `save()` never leaves a broken file behind.
+
+    :param directory: The directory of the files, it gets created if it does not exist.
+    :type directory: str
+    """
+    def __init__(self, directory: str = None):
+        if directory is None:
+            raise ValueError("Parameter 'directory' is missing!")
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def delete(self, market: str = None) -> bool:
+        """
+        Delete the stored book of a market.
+
+        :param market: The market
+        :type market: str
+        :return: bool (False if there is no stored book)
+        """
+        try:
+            os.remove(self.get_path(market=market))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def get_markets(self) -> set:
+        """
+        Get the markets that have a stored book.
+
+        :return: set
+        """
+        return {filename[:-len(".ubws")] for filename in os.listdir(self.directory) if filename.endswith(".ubws")}
+
+    def get_path(self, market: str = None) -> str:
+        """
+        Get the path of the file of a market.
+
+        :param market: The market
+        :type market: str
+        :return: str
+        """
+        return os.path.join(self.directory, f"{market}.ubws")
+
+    def load(self, market: str = None) -> Optional[dict]:
+        """
+        Load the stored book of a market.
+
+        :param market: The market
+        :type market: str
+        :return: dict `{'asks': list, 'bids': list, 'last_update_id': int, 'timestamp': float}` or None if there is no
+                 valid stored book
+        """
+        try:
+            with open(self.get_path(market=market), "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            magic, layout_version, last_update_id, timestamp, ask_count, bid_count = \
+                WARM_START_HEADER.unpack_from(data, 0)
+            if magic != WARM_START_MAGIC or layout_version != WARM_START_LAYOUT_VERSION:
+                raise ValueError("unknown file format")
+            values = struct.unpack_from(f"<{(ask_count + bid_count) * 2}d", data, WARM_START_HEADER.size)
+        except (struct.error, ValueError) as error_msg:
+            logger.error(f"WarmStartStore.load() - Can not load the stored book of market '{market}': {error_msg}")
+            return None
+        levels = [[values[index], values[index + 1]] for index in range(0, len(values), 2)]
+        return {'asks': levels[:ask_count],
+                'bids': levels[ask_count:],
+                'last_update_id': last_update_id,
+                'timestamp': timestamp}
+
+    def save(self,
+             market: str = None,
+             last_update_id: int = None,
+             asks: list = None,
+             bids: list = None,
+             timestamp: Optional[float] = None) -> None:
+        """
+        Store the book of a market.
+
+        :param market: The market
+        :type market: str
+        :param last_update_id: The `last_update_id` of the book
+        :type last_update_id: int
+        :param asks: The asks as `[price, quantity]` lists
+        :type asks: list
+        :param bids: The bids as `[price, quantity]` lists
+        :type bids: list
+        :param timestamp: Time of the book, default is now
+        :type timestamp: float or None
+        :return: None
+        """
+        values = [value for level in asks for value in level[:2]] + [value for level in bids for value in level[:2]]
+        data = WARM_START_HEADER.pack(WARM_START_MAGIC,
+                                      WARM_START_LAYOUT_VERSION,
+                                      last_update_id,
+                                      time.time() if timestamp is None else timestamp,
+                                      len(asks),
+                                      len(bids)) + struct.pack(f"<{len(values)}d", *values)
+        path = self.get_path(market=market)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
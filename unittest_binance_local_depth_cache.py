@@ -20,12 +20,29 @@
 # All rights reserved.
 
 from unicorn_binance_local_depth_cache import *
+from unicorn_binance_local_depth_cache.depth_cache import DepthCache
 from unicorn_binance_local_depth_cache.licensing_manager import LucitLicensingManager, NoValidatedLucitLicense
+from unicorn_binance_local_depth_cache.mmap_book import MmapBookPublisher, MmapBookReader
+from unicorn_binance_local_depth_cache.order_book import OrderBookSide, numpy
+from unicorn_binance_local_depth_cache.recorder import DepthStreamReader, DepthStreamRecorder
+from unicorn_binance_local_depth_cache.sequence_lock import SequenceLock
+from unicorn_binance_local_depth_cache.shared_book import BookBuffer, BookPublisher, SharedBookPublisher, SharedBookReader
+from unicorn_binance_local_depth_cache.snapshot_scheduler import SnapshotScheduler
+from unicorn_binance_local_depth_cache.sync_strategies import get_sync_strategy
+from unicorn_binance_local_depth_cache.warm_start import WarmStartStore
+import asyncio
 import logging
+import multiprocessing
 import unittest
 import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
 import time
 import threading
+from unittest.mock import AsyncMock, Mock, call, patch
 
 import tracemalloc
 tracemalloc.start(25)
@@ -47,6 +64,21 @@ def shutdown(close_api_session=False):
     pass
 
 
+def get_offline_manager(exchange="binance.com", **kwargs):
+    """
+    Create a `BinanceLocalDepthCacheManager` with mocked licensing, REST and websocket APIs.
+
+    :return: BinanceLocalDepthCacheManager
+    """
+    with patch("unicorn_binance_local_depth_cache.manager.LucitLicensingManager") as llm, \
+            patch("unicorn_binance_local_depth_cache.manager.BinanceWebSocketApiManager"):
+        llm.return_value.get_license_exception.return_value = None
+        return BinanceLocalDepthCacheManager(exchange=exchange,
+                                             ubra_manager=Mock(**{'get_used_weight.return_value': 0}),
+                                             warn_on_update=False,
+                                             **kwargs)
+
+
 class TestUbldc(unittest.TestCase):
     @classmethod
     def setUp(cls):
@@ -602,6 +634,588 @@ class TestUbldc(unittest.TestCase):
     def test_sort_dict(self):
         self.assertListEqual(self.assert_list, self.__class__.ubldc._select_from_depthcache(self.items))
 
+    def test_order_book_side_asks(self):
+        asks = OrderBookSide(reverse=False)
+        for price, quantity in self.items.items():
+            asks[price] = quantity
+        self.assertListEqual(self.assert_list, asks.select())
+        self.assertListEqual(self.assert_list[:5], self.__class__.ubldc._select_from_depthcache(asks, limit_count=5))
+        del asks['0.00204980']
+        self.assertListEqual(self.assert_list[1:6], asks.select(limit_count=5))
+
+    def test_order_book_side_bids(self):
+        bids = OrderBookSide(reverse=True)
+        for price, quantity in self.items.items():
+            bids[price] = quantity
+        self.assertListEqual(self.assert_list[::-1], bids.select())
+        self.assertListEqual(self.assert_list[::-1][:3], bids.select(limit_count=3))
+        self.assertEqual(len(self.items), len(bids))
+        self.assertTrue(0.0020498 in bids)
+        self.assertListEqual(self.assert_list[-1], bids.get_best())
+        self.assertIsNone(OrderBookSide(reverse=True).get_best())
+
+    def test_order_book_side_tick_size(self):
+        asks = OrderBookSide(reverse=False, tick_size="0.00000010")
+        bids = OrderBookSide(reverse=True, tick_size="0.00000010")
+        for price, quantity in self.items.items():
+            asks[price] = quantity
+            bids[price] = quantity
+        self.assertListEqual(self.assert_list, asks.select())
+        self.assertListEqual(self.assert_list[::-1], bids.select())
+        self.assertEqual(20498, asks.keys[0])
+        self.assertEqual(39.05, asks['0.0020498'])
+        del bids['0.002049800']
+        self.assertEqual(len(self.items) - 1, len(bids))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_order_book_side_select_arrays(self):
+        bids = OrderBookSide(reverse=True, tick_size="0.00000010")
+        for price, quantity in self.items.items():
+            bids[price] = quantity
+        prices, quantities = bids.select_arrays(limit_count=5)
+        self.assertListEqual(self.assert_list[::-1][:5], [[p, q] for p, q in zip(prices.tolist(), quantities.tolist())])
+        prices, quantities = bids.select_arrays(threshold_volume=1.0, price_ticks=True)
+        self.assertEqual(numpy.int64, prices.dtype)
+        self.assertListEqual(bids.select(threshold_volume=1.0), [[p / 10**7, q] for p, q in zip(prices, quantities)])
+
+    def test_order_book_side_threshold_volume(self):
+        asks = OrderBookSide(reverse=False)
+        for price, quantity in self.items.items():
+            asks[price] = quantity
+        for threshold_volume in (0, 0.01, 0.5, 2.5, 1000000):
+            self.assertListEqual(self.__class__.ubldc._select_from_depthcache(self.items,
+                                                                              threshold_volume=threshold_volume),
+                                 asks.select(threshold_volume=threshold_volume))
+        asks['0.00204980'] = 1000.0
+        self.assertListEqual([[0.0020498, 1000.0]], asks.select(threshold_volume=0.5))
+
+    def test_order_book_side_cache(self):
+        asks = OrderBookSide(reverse=False, cache_size=2)
+        for price, quantity in self.items.items():
+            asks[price] = quantity
+        result = asks.select(limit_count=5)
+        self.assertIs(result, asks.select(limit_count=5))
+        asks.select(limit_count=6)
+        asks.select(limit_count=7)
+        self.assertEqual(2, len(asks.cache))
+        self.assertIsNot(result, asks.select(limit_count=5))
+        asks['0.00204970'] = 1.0
+        self.assertListEqual([[0.0020497, 1.0]], asks.select(limit_count=1))
+
+    def test_sequence_lock(self):
+        lock = SequenceLock()
+        calls = []
+
+        def read_during_write():
+            calls.append(lock.sequence)
+            if len(calls) == 1:
+                with lock:
+                    pass
+            return len(calls)
+
+        self.assertEqual(2, lock.read(read_during_write))
+        self.assertEqual([0, 2], calls)
+        with self.assertRaises(DepthCacheOutOfSync):
+            lock.read(self.__class__.raise_out_of_sync)
+
+    @staticmethod
+    def raise_out_of_sync():
+        raise DepthCacheOutOfSync(market="blah")
+
+    def test_sync_strategies(self):
+        spot = get_sync_strategy(exchange="binance.us")
+        futures = get_sync_strategy(exchange="binance.com-futures")
+        self.assertIsNone(get_sync_strategy(exchange="blah"))
+        self.assertFalse(spot.has_gap({'U': 101, 'u': 110}, 100))
+        self.assertTrue(spot.has_gap({'U': 102, 'u': 110}, 100))
+        self.assertTrue(spot.is_outdated({'U': 90, 'u': 100}, 100))
+        self.assertTrue(spot.is_first_event({'U': 95, 'u': 105}, 100))
+        self.assertFalse(futures.has_gap({'U': 102, 'u': 110, 'pu': 100}, 100))
+        self.assertFalse(futures.is_outdated({'U': 90, 'u': 100}, 100))
+        self.assertTrue(futures.is_first_event({'U': 90, 'u': 100}, 100))
+        self.assertEqual(50, spot.get_snapshot_weight(limit=1000))
+        self.assertEqual(20, futures.get_snapshot_weight(limit=1000))
+        self.assertListEqual([1000, 100, 500, 5000], [spot.get_snapshot_limit(desired_depth=desired_depth)
+                                                      for desired_depth in (None, 20, 200, 3000)])
+        self.assertListEqual([50, 100, 1000], [futures.get_snapshot_limit(desired_depth=desired_depth)
+                                               for desired_depth in (20, 60, 2000)])
+
+    def test_depth_cache(self):
+        depth_cache = DepthCache(market="btcusdt", refresh_interval=60, desired_depth=20, snapshot_limit=20)
+        self.assertFalse(depth_cache['is_synchronized'])
+        depth_cache['last_update_id'] = 100
+        self.assertEqual(100, depth_cache.last_update_id)
+        self.assertEqual(20, depth_cache.get('snapshot_limit'))
+        self.assertIsNone(depth_cache.get('unknown'))
+        self.assertTrue('asks' in depth_cache)
+        self.assertTrue('last_update_id' in depth_cache.keys())
+        with self.assertRaises(KeyError):
+            depth_cache['unknown'] = True
+        with self.assertRaises(AttributeError):
+            depth_cache.unknown = True
+        with depth_cache.sequence_lock:
+            depth_cache.asks["10.0"] = 1.0
+            depth_cache.best_ask = [10.0, 1.0]
+            depth_cache.reset(tick_size="0.01")
+        self.assertEqual(0, len(depth_cache.asks))
+        self.assertEqual(0.01, depth_cache.bids.tick_size)
+        self.assertIsNone(depth_cache.best_ask)
+
+    def test_replay_depth_updates(self):
+        market = "replaytest"
+        self.__class__.ubldc._add_depthcache(market=market)
+        self.__class__.ubldc._apply_updates(asks=[["10.0", "1.0"]], bids=[["9.0", "1.0"]], market=market,
+                                            last_update_id=100)
+        updates = [{'U': 90, 'u': 99, 'a': [["10.0", "5.0"]], 'b': []},
+                   {'U': 95, 'u': 101, 'a': [["10.0", "0"]], 'b': []},
+                   {'U': 102, 'u': 103, 'a': [["11.0", "2.0"]], 'b': [["9.5", "3.0"]]}]
+        self.assertTrue(self.__class__.ubldc._replay_depth_updates(market=market, updates=updates))
+        self.assertTrue(self.__class__.ubldc.depth_caches[market]['is_synchronized'])
+        self.assertEqual(103, self.__class__.ubldc.depth_caches[market]['last_update_id'])
+        self.assertListEqual([[11.0, 2.0]], self.__class__.ubldc.get_asks(market=market))
+        self.assertListEqual([[9.5, 3.0], [9.0, 1.0]], self.__class__.ubldc.get_bids(market=market))
+        self.assertFalse(self.__class__.ubldc._replay_depth_updates(market=market,
+                                                                    updates=[{'U': 105, 'u': 106, 'a': [], 'b': []}]))
+        del self.__class__.ubldc.depth_caches[market]
+
+    def test_desired_depth(self):
+        market = "depthtest"
+        self.__class__.ubldc._add_depthcache(market=market, desired_depth=5)
+        depth_cache = self.__class__.ubldc.depth_caches[market]
+        self.assertEqual(5, depth_cache.desired_depth)
+        snapshot_limit = self.__class__.ubldc.sync_strategy.get_snapshot_limit(desired_depth=5)
+        self.assertEqual(snapshot_limit, depth_cache.snapshot_limit)
+        self.assertGreaterEqual(snapshot_limit, 5)
+        depth_cache.is_synchronized = True
+        self.__class__.ubldc._apply_updates(asks=[[str(100 + i), "1.0"] for i in range(snapshot_limit + 10)],
+                                            bids=[[str(99 - i * 0.1), "1.0"] for i in range(snapshot_limit + 10)],
+                                            market=market, last_update_id=1)
+        self.assertEqual(snapshot_limit, len(depth_cache.asks))
+        self.assertEqual(snapshot_limit, len(depth_cache.bids))
+        # The levels beyond `desired_depth` refill the book if the best levels are removed
+        self.__class__.ubldc._apply_updates(asks=[[str(100 + i), "0"] for i in range(5)], bids=[], market=market,
+                                            last_update_id=2)
+        self.assertListEqual([[105.0, 1.0], [106.0, 1.0], [107.0, 1.0], [108.0, 1.0], [109.0, 1.0]],
+                             self.__class__.ubldc.get_asks(market=market, limit_count=5))
+        del self.__class__.ubldc.depth_caches[market]
+
+    def test_subscription_requests(self):
+        ubldc = get_offline_manager(init_interval=0.0)
+        self.addCleanup(ubldc.stop_manager)
+        ubldc.ubwa.get_limit_of_subscriptions_per_stream.return_value = 2
+        ubldc.ubwa.get_new_uuid_id.side_effect = ["dc_stream_1", "dc_stream_2"]
+        streams_created = threading.Event()
+
+        def create_stream(**kwargs):
+            if ubldc.ubwa.create_stream.call_count == 2:
+                streams_created.set()
+            return f"stream_{ubldc.ubwa.create_stream.call_count}"
+
+        ubldc.ubwa.create_stream.side_effect = create_stream
+        # The None sentinel wakes the idle thread so it can stop
+        ubldc.stop_request = True
+        ubldc.subscription_requests.put(None)
+        ubldc.thread_manage_depthcaches.join(5)
+        self.assertFalse(ubldc.thread_manage_depthcaches.is_alive())
+
+        # All requests that are queued when the thread wakes up are processed as one batch
+        ubldc.stop_request = False
+        ubldc.create_depthcache(markets=["btcusdt", "ethusdt", "bnbusdt"])
+        thread = threading.Thread(target=ubldc._manage_depthcaches)
+        thread.start()
+        self.assertTrue(streams_created.wait(5))
+        ubldc.stop_request = True
+        ubldc.subscription_requests.put(None)
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(2, ubldc.ubwa.create_stream.call_count)
+        self.assertListEqual(["btcusdt", "ethusdt"], ubldc.ubwa.create_stream.call_args_list[0].kwargs['markets'])
+        self.assertListEqual(["bnbusdt"], ubldc.ubwa.create_stream.call_args_list[1].kwargs['markets'])
+        ubldc.ubwa.subscribe_to_stream.assert_not_called()
+        ubldc.ubwa.unsubscribe_from_stream.assert_not_called()
+
+        # Resubscriptions are sent with one unsubscribe and one subscribe call per stream
+        ubldc.stop_request = False
+        ubldc.set_resync_request(market="btcusdt")
+        ubldc.set_resync_request(market="ethusdt")
+        ubldc.set_resync_request(market="bnbusdt")
+        self.assertSetEqual({"btcusdt", "ethusdt", "bnbusdt"}, ubldc.pending_resubscriptions)
+        subscription_batch = [None]
+        while not ubldc.subscription_requests.empty():
+            subscription_batch.append(ubldc.subscription_requests.get_nowait())
+        ubldc._process_subscription_requests(subscription_batch=subscription_batch)
+        self.assertListEqual([call(stream_id="stream_1", markets=["btcusdt", "ethusdt"]),
+                              call(stream_id="stream_2", markets=["bnbusdt"])],
+                             ubldc.ubwa.unsubscribe_from_stream.call_args_list)
+        self.assertListEqual([call(stream_id="stream_1", markets=["btcusdt", "ethusdt"]),
+                              call(stream_id="stream_2", markets=["bnbusdt"])],
+                             ubldc.ubwa.subscribe_to_stream.call_args_list)
+        self.assertEqual(2, ubldc.ubwa.create_stream.call_count)
+        self.assertSetEqual(set(), ubldc.pending_resubscriptions)
+
+        # A stopped market is only unsubscribed, a stream without stream_id is created instead of subscribed
+        ubldc.stop_depthcache(markets="ethusdt")
+        ubldc.dc_streams["dc_stream_2"]['stream_id'] = None
+        ubldc.dc_streams["dc_stream_2"]['subscribed_markets'] = set()
+        subscription_batch = [ubldc.subscription_requests.get_nowait(), ("subscribe", "dc_stream_2", "bnbusdt")]
+        ubldc._process_subscription_requests(subscription_batch=subscription_batch)
+        self.assertEqual(call(stream_id="stream_1", markets=["ethusdt"]),
+                         ubldc.ubwa.unsubscribe_from_stream.call_args)
+        self.assertEqual(2, ubldc.ubwa.subscribe_to_stream.call_count)
+        self.assertEqual(3, ubldc.ubwa.create_stream.call_count)
+        self.assertListEqual(["bnbusdt"], ubldc.ubwa.create_stream.call_args.kwargs['markets'])
+        self.assertEqual("stream_3", ubldc.dc_streams["dc_stream_2"]['stream_id'])
+        self.assertEqual(1, ubldc.dc_streams["dc_stream_2"]['restarts'])
+
+    def test_dc_stream_indexes(self):
+        ubldc = get_offline_manager(init_interval=0.0)
+        self.addCleanup(ubldc.stop_manager)
+        ubldc.stop_request = True
+        ubldc.subscription_requests.put(None)
+        ubldc.thread_manage_depthcaches.join(5)
+        ubldc.stop_request = False
+        ubldc.ubwa.get_limit_of_subscriptions_per_stream.return_value = 2
+        ubldc.ubwa.get_new_uuid_id.side_effect = ["dc_stream_1", "dc_stream_2"]
+        ubldc.ubwa.create_stream.side_effect = lambda **kwargs: f"stream_{ubldc.ubwa.create_stream.call_count}"
+
+        def process_subscription_requests():
+            subscription_batch = []
+            while not ubldc.subscription_requests.empty():
+                subscription_batch.append(ubldc.subscription_requests.get_nowait())
+            ubldc._process_subscription_requests(subscription_batch=subscription_batch)
+
+        def assert_indexes():
+            markets = {market: dc_stream for dc_stream in ubldc.dc_streams
+                       for market in ubldc.dc_streams[dc_stream]['markets']}
+            stream_ids = {ubldc.dc_streams[dc_stream]['stream_id']: dc_stream for dc_stream in ubldc.dc_streams
+                          if ubldc.dc_streams[dc_stream]['stream_id'] is not None}
+            self.assertDictEqual(markets, ubldc.dc_stream_of_market)
+            self.assertDictEqual(stream_ids, ubldc.dc_stream_of_stream_id)
+
+        ubldc.create_depthcache(markets=["btcusdt", "ethusdt", "bnbusdt"])
+        assert_indexes()
+        process_subscription_requests()
+        assert_indexes()
+        self.assertDictEqual({"stream_1": "dc_stream_1", "stream_2": "dc_stream_2"}, ubldc.dc_stream_of_stream_id)
+        self.assertEqual("dc_stream_2", ubldc.get_dc_stream_id(market="BNBUSDT"))
+
+        ubldc.set_resync_request(market="btcusdt")
+        process_subscription_requests()
+        assert_indexes()
+        self.assertEqual("dc_stream_1", ubldc.get_dc_stream_id(market="btcusdt"))
+
+        ubldc.stop_depthcache(markets="ethusdt")
+        assert_indexes()
+        self.assertIsNone(ubldc.get_dc_stream_id(market="ethusdt"))
+        process_subscription_requests()
+        assert_indexes()
+
+        # A new market takes the free slot of the stopped one
+        ubldc.create_depthcache(markets="xrpusdt")
+        process_subscription_requests()
+        assert_indexes()
+        self.assertEqual("dc_stream_1", ubldc.get_dc_stream_id(market="xrpusdt"))
+
+        ubldc._process_stream_signals(signal_type="DISCONNECT", stream_id="stream_1")
+        ubldc.ubwa.stop_stream.assert_called_once_with(stream_id="stream_1")
+        assert_indexes()
+        self.assertNotIn("stream_1", ubldc.dc_stream_of_stream_id)
+        self.assertFalse(ubldc.depth_caches["btcusdt"].is_synchronized)
+        # Signals of the replaced stream are ignored
+        ubldc._process_stream_signals(signal_type="DISCONNECT", stream_id="stream_1")
+        ubldc.ubwa.stop_stream.assert_called_once()
+        process_subscription_requests()
+        assert_indexes()
+        self.assertEqual("dc_stream_1", ubldc.dc_stream_of_stream_id["stream_3"])
+        self.assertSetEqual({"btcusdt", "xrpusdt"}, ubldc.dc_streams["dc_stream_1"]['subscribed_markets'])
+        ubldc._process_stream_signals(signal_type="FIRST_RECEIVED_DATA", stream_id="stream_3")
+        self.assertEqual("RUNNING", ubldc.dc_streams["dc_stream_1"]['status'])
+
+    def test_best_bid_ask(self):
+        market = "bestbidasktest"
+        ubldc = self.__class__.ubldc
+        ubldc._add_depthcache(market=market)
+        ubldc.depth_caches[market].is_synchronized = True
+        # Empty bids
+        ubldc._apply_updates(asks=[["10.0", "1.0"], ["10.5", "2.0"]], bids=[], market=market, last_update_id=1)
+        self.assertEqual({'best_ask': [10.0, 1.0], 'best_bid': None, 'last_update_id': 1, 'mid_price': None,
+                          'spread': None}, ubldc.get_best_bid_ask(market=market))
+        ubldc._apply_updates(asks=[], bids=[["9.0", "1.0"], ["8.0", "3.0"]], market=market, last_update_id=2)
+        self.assertEqual({'best_ask': [10.0, 1.0], 'best_bid': [9.0, 1.0], 'last_update_id': 2, 'mid_price': 9.5,
+                          'spread': 1.0}, ubldc.get_best_bid_ask(market=market))
+        # Removal of the best levels
+        ubldc._apply_updates(asks=[["10.0", "0"]], bids=[["9.0", "0.00000000"]], market=market, last_update_id=3)
+        self.assertEqual({'best_ask': [10.5, 2.0], 'best_bid': [8.0, 3.0], 'last_update_id': 3, 'mid_price': 9.25,
+                          'spread': 2.5}, ubldc.get_best_bid_ask(market=market))
+        # A crossed level is reported as it is
+        ubldc._apply_updates(asks=[], bids=[["11.0", "1.0"]], market=market, last_update_id=4)
+        best_bid_ask = ubldc.get_best_bid_ask(market=market)
+        self.assertEqual([11.0, 1.0], best_bid_ask['best_bid'])
+        self.assertEqual(-0.5, best_bid_ask['spread'])
+        self.assertEqual(best_bid_ask['best_bid'], ubldc.get_bids(market=market, limit_count=1)[0])
+        # Empty asks
+        ubldc._apply_updates(asks=[["10.5", "0"]], bids=[], market=market, last_update_id=5)
+        self.assertEqual({'best_ask': None, 'best_bid': [11.0, 1.0], 'last_update_id': 5, 'mid_price': None,
+                          'spread': None}, ubldc.get_best_bid_ask(market=market))
+        del ubldc.depth_caches[market]
+
+    def test_stream_message_classification(self):
+        ubldc = get_offline_manager(exchange="binance.com")
+        self.addCleanup(ubldc.stop_manager)
+        ubldc._add_depthcache(market="btcusdt")
+        depth_cache = ubldc.depth_caches["btcusdt"]
+        depth_cache.is_synchronized = True
+        depth_cache.refresh_request = False
+        depth_cache.last_update_id = 10
+        messages = [{'result': None, 'id': 1},
+                    {'error': {'code': 2, 'msg': "Invalid request"}, 'id': 2},
+                    "unexpected",
+                    {'stream': "btcusdt@depth", 'data': {'e': "depthUpdate", 'U': 11, 'u': 12, 'a': [["10.0", "1.0"]],
+                                                         'b': [["9.0", "2.0"]]}}]
+        ubldc.ubwa.is_stop_request.side_effect = [False] * len(messages) + [True]
+        ubldc.ubwa.get_stream_data_from_asyncio_queue = AsyncMock(side_effect=messages)
+        with patch("unicorn_binance_local_depth_cache.manager.logger") as logger:
+            logger.isEnabledFor.return_value = True
+            asyncio.run(ubldc._manage_depth_cache_async(stream_id="stream_1"))
+        self.assertEqual(len(messages), ubldc.ubwa.asyncio_queue_task_done.call_count)
+        errors = [error_call.args[0] for error_call in logger.error.call_args_list]
+        self.assertEqual(2, len(errors))
+        self.assertIn("Received system error message", errors[0])
+        self.assertIn("Received unexpected message", errors[1])
+        self.assertTrue(any("Received system result message" in debug_call.args[0]
+                            for debug_call in logger.debug.call_args_list))
+        self.assertEqual(12, depth_cache.last_update_id)
+        self.assertListEqual([[10.0, 1.0]], ubldc.get_asks(market="btcusdt"))
+        self.assertListEqual([[9.0, 2.0]], ubldc.get_bids(market="btcusdt"))
+
+    def test_stream_debug_guard(self):
+        ubldc = get_offline_manager(exchange="binance.com")
+        self.addCleanup(ubldc.stop_manager)
+        ubldc._add_depthcache(market="btcusdt")
+        depth_cache = ubldc.depth_caches["btcusdt"]
+        depth_cache.is_synchronized = True
+        depth_cache.refresh_request = False
+        depth_cache.last_update_id = 10
+        messages = [{'result': None, 'id': 1}] + \
+                   [{'stream': "btcusdt@depth", 'data': {'e': "depthUpdate", 'U': update_id, 'u': update_id,
+                                                         'a': [["10.0", str(update_id)]], 'b': []}}
+                    for update_id in range(11, 16)]
+        for debug in (False, True):
+            ubldc.ubwa.is_stop_request.side_effect = [False] * len(messages) + [True]
+            ubldc.ubwa.get_stream_data_from_asyncio_queue = AsyncMock(side_effect=messages)
+            depth_cache.last_update_id = 10
+            with patch("unicorn_binance_local_depth_cache.manager.logger") as logger:
+                logger.isEnabledFor.return_value = debug
+                asyncio.run(ubldc._manage_depth_cache_async(stream_id="stream_1"))
+            self.assertEqual(15, depth_cache.last_update_id)
+            logger.error.assert_not_called()
+            if debug is False:
+                # Only the start of the stream is logged, no message of the hot path
+                self.assertEqual(1, logger.debug.call_count)
+            else:
+                self.assertGreater(logger.debug.call_count, len(messages))
+
+    def test_shared_book(self):
+        book = BookBuffer(buffer=bytearray(BookBuffer.get_size(depth=2)), depth=2)
+        self.assertIsNone(book.read())
+        book.write(market="btcusdt", last_update_id=10, asks=[[10.0, 1.0], [11.0, 2.0], [12.0, 3.0]],
+                   bids=[[9.0, 1.5]], is_synchronized=True, timestamp=1.5)
+        self.assertEqual({'asks': [[10.0, 1.0], [11.0, 2.0]], 'bids': [[9.0, 1.5]], 'is_synchronized': True,
+                          'last_update_id': 10, 'market': "btcusdt", 'timestamp': 1.5}, book.read())
+        self.assertListEqual([[10.0, 1.0]], book.read(limit_count=1)['asks'])
+        self.assertEqual(2, BookBuffer(buffer=book.buffer).depth)
+        self.assertEqual(2, book.sequence)
+        # A writer that stopped during a write leaves an odd sequence behind
+        book.buffer[8] = 3
+        with self.assertRaises(BookBufferStalled):
+            book.read(timeout=0.1)
+        with self.assertRaises(TypeError):
+            BookPublisher()
+
+        depth_cache = DepthCache(market="sharedtest")
+        depth_cache.asks.apply_levels([["10.0", "1.0"], ["10.5", "2.0"]])
+        depth_cache.last_update_id = 20
+        publisher = SharedBookPublisher(depth=10, name_prefix=f"ubldc_test{os.getpid()}_")
+        publisher.publish(depth_cache)
+        with SharedBookReader(name=publisher.get_name(market="sharedtest")) as reader:
+            result = reader.read()
+            self.assertListEqual([[10.0, 1.0], [10.5, 2.0]], result['asks'])
+            self.assertEqual(20, result['last_update_id'])
+            self.assertFalse(result['is_synchronized'])
+        publisher.close()
+        with self.assertRaises(FileNotFoundError):
+            SharedBookReader(name=publisher.get_name(market="sharedtest"))
+
+    def test_shared_book_spawned_child(self):
+        # A child started with `spawn` shares the resource tracker of its parent, it must not remove the registration
+        # of the parent or the tracker fails with a KeyError when the parent unlinks the segment
+        script = ("import multiprocessing, sys\n"
+                  "from unicorn_binance_local_depth_cache.shared_book import SharedBookPublisher, "
+                  "create_shared_memory, unlink_shared_memory\n"
+                  "from unicorn_binance_local_depth_cache.depth_cache import DepthCache\n"
+                  "def publish(prefix):\n"
+                  "    publisher = SharedBookPublisher(depth=10, name_prefix=prefix, shared_tracker=True)\n"
+                  "    publisher.publish(DepthCache(market='child'))\n"
+                  "    publisher.close()\n"
+                  "if __name__ == '__main__':\n"
+                  "    segment = create_shared_memory(name=sys.argv[1] + 'child', size=4096)\n"
+                  "    process = multiprocessing.get_context('spawn').Process(target=publish, args=(sys.argv[1],))\n"
+                  "    process.start()\n"
+                  "    process.join()\n"
+                  "    unlink_shared_memory(segment=segment)\n"
+                  "    sys.exit(process.exitcode)\n")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spawn_child.py")
+            with open(path, "w") as file:
+                file.write(script)
+            env = dict(os.environ)
+            env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(os.path.abspath(__file__)),
+                                                 env.get('PYTHONPATH', "")])
+            result = subprocess.run([sys.executable, path, f"ubldc_spawn{os.getpid()}_"], capture_output=True,
+                                    text=True, env=env, timeout=60)
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertNotIn("KeyError", result.stderr)
+        self.assertNotIn("leaked", result.stderr)
+
+    def test_sharded_read_api(self):
+        book = BookBuffer(buffer=bytearray(BookBuffer.get_size(depth=5)), depth=5)
+        book.write(market="btcusdt", last_update_id=7, asks=[[10.0, 1.0], [11.0, 1.0], [12.0, 1.0]],
+                   bids=[[9.0, 1.0], [8.0, 1.0]], is_synchronized=True, timestamp=1.0)
+        sharded = ShardedDepthCacheManager.__new__(ShardedDepthCacheManager)
+        sharded.stop_request = False
+        sharded.books = {'btcusdt': book}
+        sharded.shard_of_market = {'btcusdt': 0}
+        sharded.processes = [multiprocessing.current_process()]
+        self.assertEqual({'best_ask': [10.0, 1.0], 'best_bid': [9.0, 1.0], 'last_update_id': 7, 'mid_price': 9.5,
+                          'spread': 1.0}, sharded.get_best_bid_ask(market="BTCUSDT"))
+        self.assertListEqual([[10.0, 1.0], [11.0, 1.0]], sharded.get_asks(market="btcusdt", threshold_volume=21.0))
+        self.assertListEqual([[10.0, 1.0]], sharded.get_asks(market="btcusdt", threshold_volume=5.0))
+        self.assertListEqual([[10.0, 1.0]], sharded.get_asks(market="btcusdt", limit_count=1,
+                                                             threshold_volume=100.0))
+        self.assertListEqual([[9.0, 1.0], [8.0, 1.0]], sharded.get_bids(market="btcusdt", threshold_volume=17.0))
+        book.write(market="btcusdt", last_update_id=8, asks=[], bids=[[9.0, 1.0]], is_synchronized=True,
+                   timestamp=2.0)
+        best_bid_ask = sharded.get_best_bid_ask(market="btcusdt")
+        self.assertIsNone(best_bid_ask['best_ask'])
+        self.assertIsNone(best_bid_ask['mid_price'])
+        book.write(market="btcusdt", last_update_id=9, asks=[], bids=[], is_synchronized=False, timestamp=3.0)
+        with self.assertRaises(DepthCacheOutOfSync):
+            sharded.get_best_bid_ask(market="btcusdt")
+
+    def test_snapshot_scheduler(self):
+        started = queue.Queue()
+        release = threading.Event()
+
+        def snapshot(market):
+            started.put(market)
+            release.wait(5)
+
+        def wait_until_idle(scheduler):
+            with scheduler.condition:
+                self.assertTrue(scheduler.condition.wait_for(lambda: len(scheduler.running) == 0, timeout=5))
+
+        scheduler = SnapshotScheduler(snapshot_function=snapshot, weight_limit=100, max_concurrent_snapshots=1)
+        self.assertTrue(scheduler.request(market="a", weight=50))
+        self.assertFalse(scheduler.request(market="a", weight=50))
+        self.assertTrue(scheduler.request(market="b", weight=50))
+        self.assertTrue(scheduler.request(market="c", weight=50, priority=1))
+        self.assertTrue(scheduler.request(market="d", weight=50, priority=2))
+        self.assertTrue(scheduler.cancel(market="d"))
+        scheduler.start()
+        self.assertEqual("c", started.get(timeout=5))
+        # The only slot is taken
+        with scheduler.condition:
+            self.assertEqual((None, None), scheduler._get_next(now=time.time()))
+        release.set()
+        self.assertEqual("a", started.get(timeout=5))
+        wait_until_idle(scheduler)
+        # The weight of `b` is available in 30 seconds
+        with scheduler.condition:
+            entry, wait_time = scheduler._get_next(now=time.time())
+        self.assertIsNone(entry)
+        self.assertGreater(wait_time, 20)
+        self.assertTrue(started.empty())
+        metrics = scheduler.get_metrics()
+        self.assertEqual((4, 1, 2, 2, 1, 0, 100), (metrics['requested'], metrics['cancelled'], metrics['started'],
+                                                   metrics['completed'], metrics['pending'], metrics['running'],
+                                                   metrics['weight_used']))
+        scheduler.stop()
+        self.assertEqual(2, scheduler.get_metrics()['cancelled'])
+
+        # The used weight of the current minute is respected
+        now = time.time()
+        scheduler = SnapshotScheduler(snapshot_function=snapshot, weight_limit=100,
+                                      get_used_weight=lambda: {'status_code': 200, 'timestamp': now, 'weight': 90})
+        scheduler.request(market="a", weight=50)
+        with scheduler.condition:
+            entry, wait_time = scheduler._get_next(now=now)
+        self.assertIsNone(entry)
+        self.assertGreater(wait_time, 0)
+        scheduler.stop()
+
+        # A requested snapshot of a market whose snapshot is still running does not block other markets
+        release.clear()
+        scheduler = SnapshotScheduler(snapshot_function=snapshot, max_concurrent_snapshots=2)
+        scheduler.request(market="a", priority=1)
+        scheduler.start()
+        self.assertEqual("a", started.get(timeout=5))
+        scheduler.request(market="a", priority=1)
+        scheduler.request(market="b")
+        self.assertEqual("b", started.get(timeout=5))
+        release.set()
+        self.assertEqual("a", started.get(timeout=5))
+        wait_until_idle(scheduler)
+        self.assertEqual(3, scheduler.get_metrics()['completed'])
+        scheduler.stop()
+
+    def test_mmap_book(self):
+        directory = tempfile.mkdtemp()
+        depth_cache = DepthCache(market="mmaptest")
+        depth_cache.bids.apply_levels([["9.0", "1.0"], ["9.5", "2.0"]])
+        depth_cache.last_update_id = 30
+        depth_cache.is_synchronized = True
+        publisher = MmapBookPublisher(directory=directory, depth=5)
+        publisher.publish(depth_cache)
+        with MmapBookReader(path=publisher.get_path(market="mmaptest")) as reader:
+            result = reader.read()
+            self.assertListEqual([[9.5, 2.0], [9.0, 1.0]], result['bids'])
+            self.assertEqual(30, result['last_update_id'])
+            self.assertTrue(result['is_synchronized'])
+            publisher.close()
+            self.assertFalse(reader.read()['is_synchronized'])
+        # A publisher with another depth replaces the file instead of resizing it under a mapped reader
+        former_publisher = MmapBookPublisher(directory=directory, depth=5)
+        former_publisher.publish(depth_cache)
+        publisher = MmapBookPublisher(directory=directory, depth=10)
+        with MmapBookReader(path=publisher.get_path(market="mmaptest")) as reader:
+            self.assertTrue(reader.read()['is_synchronized'])
+            publisher.publish(depth_cache)
+            self.assertFalse(reader.read()['is_synchronized'])
+            self.assertEqual(5, reader.book.depth)
+        with MmapBookReader(path=publisher.get_path(market="mmaptest")) as reader:
+            self.assertEqual(10, reader.book.depth)
+            self.assertTrue(reader.read()['is_synchronized'])
+        former_publisher.close()
+        publisher.close()
+        shutil.rmtree(directory)
+
+    def test_order_book_side_apply_levels(self):
+        bids = OrderBookSide(reverse=True, tick_size="0.01")
+        self.assertEqual(3, bids.apply_levels([["10.00", "1.5"], ["10.01", "2"], ["9.99", "0.00000000"]]))
+        self.assertEqual(1, bids.version)
+        self.assertEqual(2, bids.apply_levels([["10.010", "0"], ["10.00", "3"]]))
+        self.assertListEqual([[10.0, 3.0]], bids.select())
+        self.assertEqual(0, bids.apply_levels([]))
+        self.assertEqual(2, bids.version)
+
+    def test_order_book_side_trim(self):
+        asks = OrderBookSide(reverse=False)
+        for price, quantity in self.items.items():
+            asks[price] = quantity
+        self.assertEqual(len(self.items) - 10, asks.trim(limit_count=10))
+        self.assertEqual(0, asks.trim(limit_count=10))
+        self.assertListEqual(self.assert_list[:10], asks.select())
+
     def test_is_update_available_true(self):
         print(f"test_is_update_available():")
         result = self.__class__.ubldc.is_update_available()
@@ -620,6 +1234,12 @@ class TestUbldc(unittest.TestCase):
         with self.assertRaises(DepthCacheNotFound):
             self.__class__.ubldc.get_bids(market='TEST_INVALID_MARKET')
 
+    def test_invalid_market_get_book(self):
+        with self.assertRaises(DepthCacheNotFound):
+            self.__class__.ubldc.get_book(market='TEST_INVALID_MARKET')
+        with self.assertRaises(DepthCacheNotFound):
+            self.__class__.ubldc.get_best_bid_ask()
+
     def test_invalid_market_get_bids_without_params(self):
         with self.assertRaises(DepthCacheNotFound):
             self.__class__.ubldc.get_bids()
@@ -659,6 +1279,131 @@ class TestUbldc(unittest.TestCase):
         with self.assertRaises(NoValidatedLucitLicense):
             llm = LucitLicensingManager(license_token="blub", api_secret="blob", parent_shutdown_function=shutdown)
 
+    def test_warm_start_store(self):
+        directory = tempfile.mkdtemp()
+        store = WarmStartStore(directory=directory)
+        self.assertIsNone(store.load(market="btcusdt"))
+        store.save(market="btcusdt", last_update_id=1000, asks=[[10.0, 1.0], [10.5, 2.0]], bids=[[9.5, 3.0]],
+                   timestamp=1.0)
+        self.assertEqual({'asks': [[10.0, 1.0], [10.5, 2.0]], 'bids': [[9.5, 3.0]], 'last_update_id': 1000,
+                          'timestamp': 1.0}, store.load(market="btcusdt"))
+        self.assertEqual({"btcusdt"}, store.get_markets())
+        with open(store.get_path(market="btcusdt"), "r+b") as file:
+            file.truncate(40)
+        self.assertIsNone(store.load(market="btcusdt"))
+        self.assertTrue(store.delete(market="btcusdt"))
+        self.assertFalse(store.delete(market="btcusdt"))
+        shutil.rmtree(directory)
+
+    def test_warm_start(self):
+        directory = tempfile.mkdtemp()
+        # Runs after the managers have been stopped
+        self.addCleanup(shutil.rmtree, directory)
+        store = WarmStartStore(directory=directory)
+        store.save(market="btcusdt", last_update_id=100, asks=[[10.0, 1.0]], bids=[[9.0, 2.0]])
+        ubldc = get_offline_manager(exchange="binance.com", warm_start_directory=directory, use_price_ticks=True)
+        self.addCleanup(ubldc.stop_manager)
+        ubldc.ubra.get_exchange_info.return_value = {'symbols': [{'symbol': "BTCUSDT", 'filters': [
+            {'filterType': "PRICE_FILTER", 'tickSize': "0.01000000"}]}]}
+        ubldc.ubra.get_order_book.return_value = {'lastUpdateId': 300, 'asks': [["11.0", "1.0"]],
+                                                  'bids': [["8.0", "1.0"]]}
+        # The snapshots are started by this test
+        ubldc.snapshot_scheduler.stop()
+        self.assertSetEqual({"btcusdt"}, ubldc.warm_start_markets)
+
+        def stream(*update_ids):
+            messages = [{'stream': "btcusdt@depth", 'data': {'e': "depthUpdate", 'U': update_id, 'u': update_id,
+                                                             'a': [], 'b': [["9.5", "1.0"]]}}
+                        for update_id in update_ids]
+            ubldc.ubwa.is_stop_request.side_effect = [False] * len(messages) + [True]
+            ubldc.ubwa.get_stream_data_from_asyncio_queue = AsyncMock(side_effect=messages)
+            asyncio.run(ubldc._manage_depth_cache_async(stream_id="stream_1"))
+
+        def run_snapshot():
+            # Takes the requested snapshot from the stopped scheduler, returns its weight
+            weight = ubldc.snapshot_scheduler.pending["btcusdt"][4]
+            ubldc.snapshot_scheduler.cancel(market="btcusdt")
+            self.assertTrue(ubldc._init_depth_cache(market="btcusdt"))
+            return weight
+
+        # Neither the file nor the REST API is used by `create_depthcache()`
+        ubldc.create_depthcache(markets="btcusdt")
+        ubldc.ubra.get_exchange_info.assert_not_called()
+        stream(101)
+        self.assertEqual(1, len(ubldc.depth_caches["btcusdt"].init_buffer))
+        self.assertEqual(0, run_snapshot())
+        ubldc.ubra.get_order_book.assert_not_called()
+        self.assertEqual("0.01000000", ubldc.depth_caches["btcusdt"].tick_size)
+        self.assertSetEqual({"btcusdt"}, ubldc.warm_starts)
+        stream(102)
+        self.assertTrue(ubldc.depth_caches["btcusdt"].is_synchronized)
+        self.assertEqual(102, ubldc.depth_caches["btcusdt"].last_update_id)
+        self.assertListEqual([[9.5, 1.0], [9.0, 2.0]], ubldc.get_bids(market="btcusdt"))
+        self.assertSetEqual(set(), ubldc.warm_starts)
+        # The file is kept until it gets replaced
+        self.assertEqual(100, store.load(market="btcusdt")['last_update_id'])
+        self.assertEqual(1, ubldc.save_warm_start_books())
+        self.assertEqual(102, store.load(market="btcusdt")['last_update_id'])
+
+        # A stored book that is not continued by the depth updates is deleted before the REST snapshot
+        ubldc = get_offline_manager(exchange="binance.com", warm_start_directory=directory)
+        self.addCleanup(ubldc.stop_manager)
+        ubldc.ubra.get_order_book.return_value = {'lastUpdateId': 300, 'asks': [["11.0", "1.0"]],
+                                                  'bids': [["8.0", "1.0"]]}
+        ubldc.snapshot_scheduler.stop()
+        ubldc.create_depthcache(markets="btcusdt")
+        stream(200)
+        self.assertEqual(0, run_snapshot())
+        stream(201)
+        self.assertFalse(ubldc.depth_caches["btcusdt"].is_synchronized)
+        self.assertSetEqual({"btcusdt"}, store.get_markets())
+        ubldc.ubwa.unsubscribe_from_stream.assert_not_called()
+        stream(301)
+        self.assertGreater(run_snapshot(), 0)
+        ubldc.ubra.get_order_book.assert_called_once()
+        self.assertSetEqual(set(), store.get_markets())
+        self.assertSetEqual(set(), ubldc.warm_starts)
+
+    def test_depth_stream_recorder(self):
+        directory = tempfile.mkdtemp()
+        recorder = DepthStreamRecorder(directory=directory, compression="zlib", frame_size=2, flush_interval=0.1)
+        recorder.start()
+        timestamp = 1700000000.0
+        recorder.record(market="btcusdt", kind="snapshot", data={'lastUpdateId': 10, 'asks': [], 'bids': []},
+                        timestamp=timestamp)
+        for update_id in range(11, 16):
+            recorder.record(market="btcusdt", data={'U': update_id, 'u': update_id}, timestamp=timestamp + update_id)
+        recorder.stop()
+        self.assertFalse(recorder.is_alive())
+        self.assertEqual(6, recorder.recorded)
+        reader = DepthStreamReader(path=recorder.get_path(market="btcusdt", timestamp=timestamp))
+        self.assertEqual(3, len(reader.index))
+        records = list(reader.read())
+        self.assertEqual(["snapshot", "depth", "depth", "depth", "depth", "depth"], [rec['kind'] for rec in records])
+        self.assertEqual({'lastUpdateId': 10, 'asks': [], 'bids': []}, records[0]['data'])
+        self.assertEqual([13, 14], [rec['data']['u'] for rec in reader.read(start_time=timestamp + 13,
+                                                                            end_time=timestamp + 14)])
+        self.assertEqual([], list(reader.read(start_time=timestamp + 16)))
+        # A frame cut short by a crash is skipped, the frames appended afterwards are read
+        with open(reader.path, "rb") as recording_file:
+            frame = recording_file.read(reader.index[1][0])
+        with open(reader.path, "ab") as recording_file:
+            recording_file.write(frame[:-5])
+        recorder = DepthStreamRecorder(directory=directory, compression="zlib", flush_interval=0.1)
+        recorder.start()
+        recorder.record(market="btcusdt", data={'U': 16, 'u': 16}, timestamp=timestamp + 16)
+        # The recording of the former day is closed with the first record of the next day
+        recorder.record(market="btcusdt", data={'U': 17, 'u': 17}, timestamp=timestamp + 86400)
+        time.sleep(0.5)
+        self.assertListEqual([recorder.get_path(market="btcusdt", timestamp=timestamp + 86400)], list(recorder.files))
+        recorder.stop()
+        self.assertListEqual([], list(recorder.files))
+        self.assertEqual([11, 12, 13, 14, 15, 16],
+                         [rec['data']['u'] for rec in reader.read() if rec['kind'] == "depth"])
+        with self.assertRaises(ValueError):
+            DepthStreamRecorder(directory=directory, compression="blub")
+        shutil.rmtree(directory)
+
     def test_with(self):
         with BinanceLocalDepthCacheManager(exchange="binance.us") as ubldc:
             ubldc.get_latest_release_info()